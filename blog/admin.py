@@ -1,5 +1,13 @@
 from django.contrib import admin
-from .models import Post, PostBlock
+from django.utils import timezone
+from .models import Job, Post, PostBlock
+from .cache import invalidate_post
+from .images import queue_variants
+from .search import index_post, unindex_post
+from .counters import refresh_counters
+from .content import refresh_post_content
+from .geo import locate
+from .timeline import fan_out, retract
 
 class PostBlockInline(admin.TabularInline):
     model = PostBlock
@@ -11,4 +19,64 @@ class PostBlockInline(admin.TabularInline):
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'created_at', 'is_published')
     prepopulated_fields = {'slug': ('title',)} 
-    inlines = [PostBlockInline] 
\ No newline at end of file
+    inlines = [PostBlockInline]
+
+    def save_model(self, request, obj, form, change):
+        # Publishing, unpublishing or reassigning a post in the admin moves
+        # stories between authors, so both sides are recounted.
+        if not change or 'location_name' in form.changed_data:
+            locate(obj)
+        super().save_model(request, obj, form, change)
+        refresh_counters(obj.author_id)
+        if change and 'author' in form.changed_data:
+            refresh_counters(form.initial['author'])
+        # Followers' timelines follow the same changes
+        if not change or {'is_published', 'author'} & set(form.changed_data):
+            retract(obj)
+            fan_out(obj)
+
+    def save_related(self, request, form, formsets, change):
+        # Inline blocks are saved after the post itself, so the cached
+        # detail payload is dropped only once everything is written.
+        super().save_related(request, form, formsets, change)
+        refresh_post_content(form.instance)
+        queue_variants(form.instance, 'cover_image')
+        for block in form.instance.blocks.filter(type='image'):
+            queue_variants(block, 'image_content')
+        index_post(form.instance)
+        invalidate_post(form.instance.slug)
+        if change and 'slug' in form.changed_data:
+            invalidate_post(form.initial['slug'])
+
+    def delete_model(self, request, obj):
+        post_id = obj.id
+        super().delete_model(request, obj)
+        refresh_counters(obj.author_id)
+        unindex_post(post_id)
+        invalidate_post(obj.slug)
+
+    def delete_queryset(self, request, queryset):
+        posts = list(queryset.values_list('id', 'slug', 'author_id'))
+        super().delete_queryset(request, queryset)
+        for author_id in {author_id for _, _, author_id in posts}:
+            refresh_counters(author_id)
+        for post_id, slug, _ in posts:
+            unindex_post(post_id)
+            invalidate_post(slug)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'attempts', 'run_after', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('dedup_key',)
+    readonly_fields = ('locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at')
+    actions = ['retry']
+
+    @admin.action(description="Run selected failed jobs again")
+    def retry(self, request, queryset):
+        # Skipped when the same work is already queued again
+        queued = Job.objects.filter(status=Job.QUEUED, dedup_key__isnull=False).values('dedup_key')
+        queryset.filter(status=Job.FAILED).exclude(dedup_key__in=queued).update(
+            status=Job.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None,
+        )
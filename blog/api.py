@@ -4,10 +4,18 @@ from ninja_jwt.controller import NinjaJWTDefaultController
 from .routers.posts import router as posts_router
 from .routers.users import router as users_router
 from .routers.countries import router as countries_router
+from .routers.leaderboards import router as leaderboards_router
+from .routers.metrics import router as metrics_router
+from .routers.uploads import router as uploads_router
+from .routers.jobs import router as jobs_router
 
 api = NinjaExtraAPI()
 api.register_controllers(NinjaJWTDefaultController)
 
 api.add_router("/posts", posts_router)
 api.add_router("/", users_router)
-api.add_router("/countries", countries_router)
\ No newline at end of file
+api.add_router("/countries", countries_router)
+api.add_router("/leaderboards", leaderboards_router)
+api.add_router("/metrics", metrics_router)
+api.add_router("/uploads", uploads_router)
+api.add_router("/jobs", jobs_router)
\ No newline at end of file
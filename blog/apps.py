@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class BlogConfig(AppConfig):
     name = 'blog'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .auth import connect_signals
+        from .metrics import install_query_timer
+        connect_signals()
+        connection_created.connect(install_query_timer, dispatch_uid='blog.metrics.query_timer')
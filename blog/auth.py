@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.utils.translation import gettext_lazy as _
+from ninja_jwt.authentication import JWTAuth
+from ninja_jwt.exceptions import AuthenticationFailed, InvalidToken
+from ninja_jwt.settings import api_settings
+
+USER_CACHE_SIZE = getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024)
+USER_CACHE_TIMEOUT = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+class UserCache:
+    """
+    Thread-safe LRU of user rows keyed by the token's user id, each entry
+    expiring `timeout` seconds after it was loaded.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= now:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id, row):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.timeout, row)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TIMEOUT)
+
+
+def _user_fields(user_model):
+    return [field.attname for field in user_model._meta.concrete_fields]
+
+
+class CachedJWTAuth(JWTAuth):
+    """
+    Drop-in replacement for ninja_jwt's JWTAuth. The token is still verified
+    locally (signature, expiry, token type); only the user lookup goes
+    through `user_cache`, so a warm request does no query for auth.
+
+    The cache holds raw field values and every request gets its own User
+    instance, so nothing cached on one request's user leaks into another.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        fields = _user_fields(self.user_model)
+        row = user_cache.get(user_id)
+        if row is None:
+            row = (
+                self.user_model.objects
+                    .filter(**{api_settings.USER_ID_FIELD: user_id})
+                    .values_list(*fields)
+                    .first()
+            )
+            if row is None:
+                raise AuthenticationFailed(_("User not found"))
+            user_cache.set(user_id, row)
+
+        user = self.user_model.from_db(DEFAULT_DB_ALIAS, fields, row)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"))
+        return user
+
+
+def _evict_user(sender, instance, **kwargs):
+    # Any save may flip is_active or replace the password hash; evicting on
+    # every write is cheaper than diffing and can't miss a field.
+    user_cache.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+def connect_signals():
+    user_model = get_user_model()
+    post_save.connect(_evict_user, sender=user_model, dispatch_uid='blog.auth.evict_user_save')
+    post_delete.connect(_evict_user, sender=user_model, dispatch_uid='blog.auth.evict_user_delete')
@@ -0,0 +1,389 @@
+"""
+Endpoint benchmark harness behind `manage.py bench`: one scenario per API
+route, timed through the test client (with SQL query counts) or against a
+running server, with results stored as JSON for run-to-run comparison.
+"""
+import io
+import json
+import os
+import subprocess
+import time
+import urllib.error
+import urllib.request
+import uuid
+from typing import Callable, NamedTuple, Optional, Union
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from ninja_jwt.tokens import AccessToken, RefreshToken
+from PIL import Image
+
+from .api import api
+from .cache import invalidate_post
+from .models import CountryPopularity, Post, PostBlock, Profile, Upload
+from .timeline import follow, unfollow
+from .uploads import part_path
+
+BENCH_PASSWORD = 'bench-password-1'
+# Reused by every upload scenario, so repeated runs don't pile up uploads
+BENCH_UPLOAD_ID = uuid.UUID('00000000-0000-4000-8000-00000000be4c')
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: str
+    route: str
+    auth: bool = False
+    # Raw bytes are sent as the request body (upload chunks)
+    data: Optional[Union[dict, bytes]] = None
+    headers: Optional[dict] = None
+    json: bool = False
+    write: bool = False
+    expected: int = 200
+    before: Optional[Callable] = None
+    # Cap for inherently slow routes (password hashing)
+    max_iterations: Optional[int] = None
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted seconds, in milliseconds."""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return round(values[index] * 1000, 2)
+
+
+def _fixture():
+    """
+    Deterministic targets picked from the current data: the most prolific
+    author, their newest post, the runner-up author to follow, and the most
+    visited country.
+    """
+    profile = (
+        Profile.objects.select_related('user')
+            .order_by('-stories_count', 'user_id')
+            .first()
+    )
+    if profile is None:
+        raise ValueError("No users to benchmark against; run seed_bench first")
+    user = profile.user
+    post = Post.objects.filter(author=user).order_by('-created_at', '-id').first()
+    if post is None:
+        raise ValueError(f"{user.username} has no posts; run seed_bench first")
+    country = CountryPopularity.objects.order_by('-visitors', 'country_code').first()
+    followee = (
+        Profile.objects.select_related('user')
+            .exclude(user=user)
+            .order_by('-stories_count', 'user_id')
+            .first()
+    )
+    if followee is None:
+        raise ValueError("Need at least two users to benchmark following; run seed_bench first")
+    return {
+        "user": user,
+        "followee": followee.user,
+        "post": post,
+        "country": country.country_code if country else 'FRA',
+        "search": post.title.split()[0],
+        "blocks": list(post.blocks.order_by('position').values('id', 'type', 'text_content', 'image_caption')),
+    }
+
+
+def _bench_image() -> bytes:
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), 'teal').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def _reset_upload(user, content, offset):
+    """Puts the bench upload back to `offset` bytes of `content` received."""
+    upload, _ = Upload.objects.update_or_create(
+        pk=BENCH_UPLOAD_ID,
+        defaults={"owner": user, "filename": 'bench.png', "size": len(content),
+                  "offset": offset, "completed_at": None},
+    )
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as part:
+        part.write(content[:offset])
+
+
+def build_scenarios(fixture):
+    user, post, followee = fixture['user'], fixture['post'], fixture['followee']
+    blocks_data = json.dumps([
+        {"type": b['type'], "content": b['text_content'] or '', "caption": b['image_caption']}
+        for b in fixture['blocks'] if b['type'] == 'text'
+    ])
+    story = {
+        "title": post.title, "location_name": post.location_name,
+        "continent": post.continent, "blocks_data": blocks_data,
+    }
+    first_block, last_block = fixture['blocks'][0]['id'], fixture['blocks'][-1]['id']
+    block_route = '/api/posts/{slug}/blocks/{block_id}'
+    refresh = str(RefreshToken.for_user(user))
+    image = _bench_image()
+    half = len(image) // 2
+    upload_path = f'/api/uploads/{BENCH_UPLOAD_ID}'
+    return [
+        Scenario('feed', 'GET', '/api/posts', '/api/posts'),
+        Scenario('feed_page', 'GET', '/api/posts?limit=20', '/api/posts'),
+        Scenario('feed_continent', 'GET', f'/api/posts?continent={post.continent}&limit=20', '/api/posts'),
+        Scenario('post_detail', 'GET', f'/api/posts/{post.slug}', '/api/posts/{slug}'),
+        Scenario('post_detail_uncached', 'GET', f'/api/posts/{post.slug}', '/api/posts/{slug}',
+                 before=lambda: invalidate_post(post.slug)),
+        Scenario('search', 'GET', f"/api/posts/search?q={fixture['search']}", '/api/posts/search'),
+        Scenario('map_bbox', 'GET', '/api/posts/in-bbox?bbox=-25,34,45,72', '/api/posts/in-bbox'),
+        Scenario('nearby', 'GET', f'/api/posts/nearby?lat={post.latitude}&lon={post.longitude}&radius_km=500',
+                 '/api/posts/nearby'),
+        Scenario('my_posts', 'GET', '/api/posts/my-posts?limit=20', '/api/posts/my-posts', auth=True),
+        Scenario('cache_stats', 'GET', '/api/posts/cache-stats', '/api/posts/cache-stats',
+                 auth=True, expected=403),
+        Scenario('job_stats', 'GET', '/api/jobs/stats', '/api/jobs/stats', auth=True, expected=403),
+        Scenario('user_profile', 'GET', f'/api/users/{user.username}', '/api/users/{username}'),
+        Scenario('me', 'GET', '/api/me', '/api/me', auth=True),
+        Scenario('export', 'GET', '/api/me/export', '/api/me/export', auth=True),
+        Scenario('export_ndjson', 'GET', '/api/me/export?format=ndjson', '/api/me/export', auth=True),
+        Scenario('timeline', 'GET', '/api/timeline?limit=20', '/api/timeline', auth=True,
+                 before=lambda: follow(user, followee)),
+        Scenario('follow', 'POST', f'/api/users/{followee.username}/follow', '/api/users/{username}/follow',
+                 auth=True, write=True, before=lambda: unfollow(user, followee)),
+        Scenario('unfollow', 'DELETE', f'/api/users/{followee.username}/follow',
+                 '/api/users/{username}/follow', auth=True, write=True, before=lambda: follow(user, followee)),
+        Scenario('country_codes', 'GET', '/api/countries/codes', '/api/countries/codes'),
+        Scenario('top_travelers', 'GET', '/api/leaderboards/travelers', '/api/leaderboards/travelers'),
+        Scenario('traveler_rank', 'GET', f'/api/leaderboards/travelers/{user.username}',
+                 '/api/leaderboards/travelers/{username}'),
+        Scenario('top_countries', 'GET', '/api/leaderboards/countries', '/api/leaderboards/countries'),
+        Scenario('country_rank', 'GET', f"/api/leaderboards/countries/{fixture['country']}",
+                 '/api/leaderboards/countries/{country_code}'),
+        Scenario('token_pair', 'POST', '/api/token/pair', '/api/token/pair', json=True, write=True,
+                 data={"username": user.username, "password": BENCH_PASSWORD}, max_iterations=10),
+        Scenario('token_refresh', 'POST', '/api/token/refresh', '/api/token/refresh', json=True,
+                 write=True, data={"refresh": refresh}),
+        Scenario('token_verify', 'POST', '/api/token/verify', '/api/token/verify', json=True,
+                 write=True, data={"token": str(AccessToken.for_user(user))}),
+        Scenario('register', 'POST', '/api/register', '/api/register', json=True, write=True,
+                 data={"username": 'bench-register', "email": 'bench-register@example.com',
+                       "password": BENCH_PASSWORD}, max_iterations=10),
+        Scenario('profile_update', 'POST', '/api/me/update', '/api/me/update', auth=True, write=True,
+                 data={"bio": 'Benchmarking'}),
+        Scenario('country_toggle', 'POST', '/api/countries', '/api/countries', auth=True, json=True,
+                 write=True, data={"country_code": 'ATA'}),
+        Scenario('country_sync', 'PUT', '/api/countries', '/api/countries', auth=True, json=True,
+                 write=True, data={"add": ['ATA', 'ISL'], "remove": []}),
+        Scenario('post_create', 'POST', '/api/posts/create', '/api/posts/create', auth=True,
+                 write=True, data=story),
+        Scenario('post_update', 'POST', f'/api/posts/{post.slug}/update', '/api/posts/{slug}/update',
+                 auth=True, write=True, data=story),
+        Scenario('block_insert', 'POST', f'/api/posts/{post.slug}/blocks', '/api/posts/{slug}/blocks',
+                 auth=True, write=True, data={"type": 'text', "content": '<p>Benchmark</p>', "position": 0}),
+        Scenario('block_update', 'PATCH', f'/api/posts/{post.slug}/blocks/{first_block}', block_route,
+                 auth=True, json=True, write=True, data={"content": '<p>Benchmark edit</p>'}),
+        Scenario('block_move', 'PATCH', f'/api/posts/{post.slug}/blocks/{first_block}', block_route,
+                 auth=True, json=True, write=True, data={"position": len(fixture['blocks'])}),
+        Scenario('block_delete', 'DELETE', f'/api/posts/{post.slug}/blocks/{last_block}', block_route,
+                 auth=True, write=True),
+        Scenario('upload_start', 'POST', '/api/uploads', '/api/uploads', auth=True, json=True, write=True,
+                 data={"filename": 'bench.png', "size": len(image)}, expected=201),
+        Scenario('upload_status', 'GET', upload_path, '/api/uploads/{upload_id}', auth=True,
+                 before=lambda: _reset_upload(user, image, half)),
+        Scenario('upload_chunk', 'PATCH', upload_path, '/api/uploads/{upload_id}', auth=True, write=True,
+                 data=image[half:], headers={'HTTP_UPLOAD_OFFSET': str(half)},
+                 before=lambda: _reset_upload(user, image, half)),
+        Scenario('upload_finalize', 'POST', f'{upload_path}/finalize', '/api/uploads/{upload_id}/finalize',
+                 auth=True, write=True, before=lambda: _reset_upload(user, image, len(image))),
+        Scenario('upload_cancel', 'DELETE', upload_path, '/api/uploads/{upload_id}', auth=True, write=True,
+                 expected=204, before=lambda: _reset_upload(user, image, half)),
+        Scenario('post_delete', 'DELETE', f'/api/posts/{post.slug}', '/api/posts/{slug}',
+                 auth=True, write=True),
+    ]
+
+
+def uncovered_routes(scenarios):
+    """(method, route) pairs in the API schema that no scenario exercises."""
+    covered = {(s.method, s.route) for s in scenarios}
+    return sorted(
+        f"{method.upper()} {path}"
+        for path, operations in api.get_openapi_schema()['paths'].items()
+        for method in operations
+        if (method.upper(), path) not in covered
+    )
+
+
+class InProcessRunner:
+    """Drives the Django stack through the test client and counts queries."""
+
+    def __init__(self, token):
+        self.client = Client()
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def __call__(self, scenario):
+        kwargs = dict(self.headers) if scenario.auth else {}
+        kwargs.update(scenario.headers or {})
+        if scenario.data is not None:
+            if isinstance(scenario.data, bytes):
+                kwargs.update(data=scenario.data, content_type='application/offset+octet-stream')
+            elif scenario.json:
+                kwargs.update(data=json.dumps(scenario.data), content_type='application/json')
+            else:
+                kwargs['data'] = scenario.data
+        request = getattr(self.client, scenario.method.lower())
+
+        if not scenario.write:
+            return self._send(request, scenario.path, kwargs)
+        # Every write is rolled back so each iteration sees the same data; the
+        # savepoint itself stays outside the measurement
+        with transaction.atomic():
+            result = self._send(request, scenario.path, kwargs)
+            transaction.set_rollback(True)
+        return result
+
+    def _send(self, request, path, kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = request(path, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, len(queries)
+
+
+class ServerRunner:
+    """Sends real HTTP requests to a running deployment (reads only)."""
+
+    def __init__(self, base_url, token):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+
+    def __call__(self, scenario):
+        request = urllib.request.Request(self.base_url + scenario.path, method=scenario.method)
+        if scenario.auth:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+        return status, time.perf_counter() - started, None
+
+
+def _measure(runner, scenario, iterations, warmup):
+    latencies, queries, errors = [], [], 0
+    iterations = min(iterations, scenario.max_iterations or iterations)
+    for index in range(warmup + iterations):
+        if scenario.before:
+            scenario.before()
+        status, elapsed, count = runner(scenario)
+        if index < warmup:
+            continue
+        if status != scenario.expected:
+            errors += 1
+        latencies.append(elapsed)
+        if count is not None:
+            queries.append(count)
+
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "route": f"{scenario.method} {scenario.route}",
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / total, 1) if total else None,
+        "mean_ms": round(total / len(latencies) * 1000, 2) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_bench(iterations=100, warmup=5, base_url=None, only=None, include_writes=True):
+    """
+    Runs every scenario and returns the report. In-process runs happen in a
+    transaction that is rolled back at the end, so the database is left as
+    it was.
+    """
+    with transaction.atomic():
+        fixture = _fixture()
+        user = fixture['user']
+        User.objects.filter(pk=user.pk).update(password=make_password(BENCH_PASSWORD))
+        scenarios = build_scenarios(fixture)
+        token = str(AccessToken.for_user(user))
+        if base_url:
+            runner = ServerRunner(base_url, token)
+            include_writes = False
+        else:
+            runner = InProcessRunner(token)
+
+        selected = [
+            s for s in scenarios
+            if (include_writes or not s.write) and (not only or s.name in only)
+        ]
+        results = {}
+        with override_settings(ALLOWED_HOSTS=['testserver', *settings.ALLOWED_HOSTS]):
+            for scenario in selected:
+                results[scenario.name] = _measure(runner, scenario, iterations, warmup)
+
+        dataset = {
+            "users": User.objects.count(),
+            "posts": Post.objects.count(),
+            "blocks": PostBlock.objects.count(),
+            "image_blocks": PostBlock.objects.filter(type='image').count(),
+        }
+        transaction.set_rollback(True)
+
+    return {
+        "meta": {
+            "timestamp": timezone.now().isoformat(),
+            "commit": _git_commit(),
+            "mode": 'server' if base_url else 'in-process',
+            "target": base_url,
+            "database": connection.vendor,
+            "iterations": iterations,
+            "warmup": warmup,
+            "dataset": dataset,
+        },
+        "results": results,
+        "uncovered": uncovered_routes(scenarios),
+    }
+
+
+def compare(report, baseline, threshold=0.2, noise_ms=1.0):
+    """
+    Lists regressions against a baseline report: p95 slower by more than
+    `threshold` (and more than `noise_ms`), more queries per request, or
+    new errors.
+    """
+    regressions = []
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        old_p95, new_p95 = previous.get('p95_ms'), current.get('p95_ms')
+        if old_p95 and new_p95 and new_p95 > old_p95 * (1 + threshold) and new_p95 - old_p95 > noise_ms:
+            regressions.append(f"{name}: p95 {old_p95} ms -> {new_p95} ms")
+        old_q, new_q = previous.get('queries_mean'), current.get('queries_mean')
+        if old_q is not None and new_q is not None and new_q > old_q:
+            regressions.append(f"{name}: queries/request {old_q} -> {new_q}")
+        if current['errors'] > previous.get('errors', 0):
+            regressions.append(f"{name}: errors {previous.get('errors', 0)} -> {current['errors']}")
+    return regressions
@@ -0,0 +1,265 @@
+from collections import defaultdict
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.db import transaction
+
+from .images import queue_variants
+from .models import Post, PostBlock
+from .utils import render_quill_html
+
+UPDATE_FIELDS = ['type', 'text_content', 'image_content', 'image_caption', 'image_meta']
+
+
+def media_name(url: str):
+    """
+    Maps a media URL sent back by the editor (absolute or relative)
+    to the storage name of the file, or None if it is not a media URL.
+    """
+    path = unquote(urlparse(url).path)
+    if path.startswith(settings.MEDIA_URL):
+        return path[len(settings.MEDIA_URL):]
+    return None
+
+
+def _desired_block(index, block_info, files, stored_images):
+    b_type = block_info.get('type')
+    if b_type == 'text':
+        content = block_info.get('content')
+        if content:
+            html, text = render_quill_html(content)
+            return {'type': 'text', 'text_content': html, 'plain_text': text,
+                    'image_content': None, 'image_caption': '', 'image_meta': {}}
+    elif b_type == 'image':
+        image_file = files.get(f'block_image_{index}')
+        if image_file:
+            return {'type': 'image', 'text_content': None,
+                    'upload': image_file, 'image_caption': '', 'image_meta': {}}
+        existing_url = block_info.get('existing_url')
+        name = media_name(existing_url) if existing_url else None
+        if name in stored_images:
+            caption, meta = stored_images[name]
+            return {'type': 'image', 'text_content': None, 'image_content': name,
+                    'image_caption': caption, 'image_meta': meta}
+    return None
+
+
+def _is_unchanged(block, desired):
+    return (
+        'upload' not in desired
+        and block.type == desired['type']
+        and block.text_content == desired['text_content']
+        and (block.image_content.name or None) == desired['image_content']
+        and block.image_caption == desired['image_caption']
+        and block.image_meta == desired['image_meta']
+    )
+
+
+def _apply(block, desired):
+    block.type = desired['type']
+    block.text_content = desired['text_content']
+    block.image_caption = desired['image_caption']
+    block.image_meta = desired['image_meta']
+    if 'upload' in desired:
+        upload = desired['upload']
+        block.image_content.save(upload.name, upload, save=False)
+    else:
+        block.image_content = desired['image_content']
+
+
+def _content_key(block_type, text_content, image_name):
+    return block_type, text_content or None, image_name or None
+
+
+def save_blocks(post, blocks_list, files, existing_blocks=None):
+    """
+    Brings the post's blocks in line with the editor payload.
+
+    Incoming blocks are matched to stored ones by content first, so a
+    paragraph or photo that only moved keeps its row and gets a
+    position-only update. Whatever is left is matched by position: those
+    rows are rewritten through a single bulk_update, new positions go
+    through a single bulk_create and leftovers through a single delete,
+    all inside one transaction. Images sent back by URL reuse the stored
+    file (and rendered variants) of whichever block currently holds it;
+    fresh uploads are queued for variant rendering.
+
+    Returns the plain text of every text block, in order, for the post
+    summary.
+    """
+    if existing_blocks is None:
+        existing_blocks = list(post.blocks.all())
+    existing_blocks = sorted(existing_blocks, key=lambda block: (block.position, block.pk))
+    # Snapshot taken before any block is touched, so swapping two images
+    # still resolves each URL to the file it pointed at originally.
+    stored_images = {
+        block.image_content.name: (block.image_caption, block.image_meta)
+        for block in existing_blocks if block.image_content
+    }
+    by_content = defaultdict(list)
+    for block in existing_blocks:
+        by_content[_content_key(block.type, block.text_content, block.image_content.name)].append(block)
+
+    desired_blocks, texts = [], []
+    for index, block_info in enumerate(blocks_list):
+        desired = _desired_block(index, block_info, files, stored_images)
+        if desired is None:
+            continue
+        if desired['type'] == 'text':
+            texts.append(desired['plain_text'])
+        desired_blocks.append((index, desired))
+
+    matched = {}
+    for index, desired in desired_blocks:
+        key = _content_key(desired['type'], desired['text_content'], desired.get('image_content'))
+        if 'upload' not in desired and by_content[key]:
+            matched[index] = by_content[key].pop(0)
+    used = {block.pk for block in matched.values()}
+    free = [block for block in existing_blocks if block.pk not in used]
+
+    to_create, to_update, moved = [], [], []
+    for index, desired in desired_blocks:
+        block = matched.get(index)
+        if block is None and free:
+            # Rewrite the row that held this position if it is free,
+            # otherwise any free row, before inserting a new one
+            block = next((b for b in free if b.position == index), free[0])
+            free.remove(block)
+        if block is None:
+            block = PostBlock(post=post, position=index)
+            _apply(block, desired)
+            to_create.append(block)
+        elif not _is_unchanged(block, desired):
+            _apply(block, desired)
+            block.position = index
+            to_update.append(block)
+        elif block.position != index:
+            block.position = index
+            moved.append(block)
+
+    stale = [block.pk for block in free]
+    with transaction.atomic():
+        if stale:
+            PostBlock.objects.filter(pk__in=stale).delete()
+        if to_update:
+            PostBlock.objects.bulk_update(to_update, [*UPDATE_FIELDS, 'position'])
+        if moved:
+            PostBlock.objects.bulk_update(moved, ['position'])
+        if to_create:
+            PostBlock.objects.bulk_create(to_create)
+        for block in to_create + to_update:
+            if block.type == 'image':
+                queue_variants(block, 'image_content')
+    return texts
+
+
+# Block-level edits. Each touches only the block concerned; positions of the
+# others are renumbered in place to stay 0..n-1.
+
+def _renumber(ordered_ids, positions):
+    changed = [
+        PostBlock(pk=block_id, position=index)
+        for index, block_id in enumerate(ordered_ids)
+        if positions.get(block_id) != index
+    ]
+    if changed:
+        PostBlock.objects.bulk_update(changed, ['position'])
+    return changed
+
+
+def _lock_blocks(post):
+    # Edits to one post's blocks queue up on its row, so each renumbers
+    # from the ordering the previous one left behind
+    Post.objects.select_for_update().filter(pk=post.pk).values_list('pk', flat=True).first()
+
+
+def _ordering(post):
+    """({id: position}, [ids in display order]) from one narrow query."""
+    rows = list(post.blocks.order_by('position', 'id').values_list('id', 'position'))
+    return dict(rows), [block_id for block_id, _ in rows]
+
+
+def _clamp(position, size):
+    if position is None:
+        return size
+    return max(0, min(position, size))
+
+
+def post_texts(post):
+    """Plain text of the post's text blocks in order, as save_blocks returns it."""
+    stored = post.blocks.filter(type='text').order_by('position', 'id').values_list('text_content', flat=True)
+    return [render_quill_html(html)[1] for html in stored if html]
+
+
+def insert_block(post, block_type, position=None, content=None, caption='', upload=None):
+    """Adds one block at `position` (appended when omitted), shifting later ones down."""
+    if block_type == 'text':
+        html, _ = render_quill_html(content or '')
+        if not html:
+            raise ValueError("A text block needs content")
+        block = PostBlock(post=post, type='text', text_content=html)
+    elif block_type == 'image':
+        if upload is None:
+            raise ValueError("An image block needs an image")
+        block = PostBlock(post=post, type='image', image_caption=caption or '')
+        block.image_content.save(upload.name, upload, save=False)
+    else:
+        raise ValueError(f"Unknown block type: {block_type}")
+
+    with transaction.atomic():
+        _lock_blocks(post)
+        positions, ordered = _ordering(post)
+        index = _clamp(position, len(ordered))
+        block.position = index
+        block.save()
+        ordered.insert(index, block.pk)
+        positions[block.pk] = index
+        _renumber(ordered, positions)
+        if block.type == 'image':
+            queue_variants(block, 'image_content')
+    return block
+
+
+def update_block(block, content=None, caption=None):
+    """Rewrites a block's text or caption; returns the fields that changed."""
+    fields = []
+    if content is not None:
+        if block.type != 'text':
+            raise ValueError("Only text blocks have content")
+        html, _ = render_quill_html(content)
+        if not html:
+            raise ValueError("A text block needs content")
+        if html != block.text_content:
+            block.text_content = html
+            fields.append('text_content')
+    if caption is not None:
+        if block.type != 'image':
+            raise ValueError("Only image blocks have a caption")
+        if caption != block.image_caption:
+            block.image_caption = caption
+            fields.append('image_caption')
+    if fields:
+        block.save(update_fields=fields)
+    return fields
+
+
+def move_block(post, block, position):
+    """Moves a block to `position`, renumbering the blocks in between."""
+    with transaction.atomic():
+        _lock_blocks(post)
+        positions, ordered = _ordering(post)
+        if block.pk not in positions:
+            raise ValueError("The block was deleted")
+        ordered.remove(block.pk)
+        index = _clamp(position, len(ordered))
+        ordered.insert(index, block.pk)
+        _renumber(ordered, positions)
+        block.position = index
+
+
+def delete_block(post, block):
+    with transaction.atomic():
+        _lock_blocks(post)
+        block.delete()
+        positions, ordered = _ordering(post)
+        _renumber(ordered, positions)
@@ -0,0 +1,55 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+_route_budgets = None
+
+
+def query_budget(max_queries):
+    """
+    Declares the most SQL statements a single request to the decorated
+    route may run, however many rows it returns. The test suite checks
+    every route against its budget at several data sizes, and requests
+    that go over it are logged and counted in /api/metrics.
+
+    Budgets count a cold auth cache and the statements Django issues for
+    nested transactions in tests (savepoints), so they are upper bounds.
+
+    Pass None for a route that reads its rows in fixed-size batches, one
+    query per batch, so its count grows with the data by design. It is
+    never flagged, and the tests still require its count to stay
+    constant while the data fits in one batch.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def route_budgets():
+    """{(method, route template): budget} for every API operation that declares one."""
+    global _route_budgets
+    if _route_budgets is None:
+        from .api import api
+
+        budgets = {}
+        for prefix, router in api._routers:
+            prefix = '' if prefix == '/' else prefix
+            for path, path_view in router.path_operations.items():
+                for operation in path_view.operations:
+                    budget = getattr(operation.view_func, 'query_budget', None)
+                    if budget is None:
+                        continue  # undeclared, or batched by design
+                    for method in operation.methods:
+                        budgets[(method, f'/api{prefix}{path}')] = budget
+        _route_budgets = budgets
+    return _route_budgets
+
+
+def over_budget(method, route, count):
+    """Logs and returns the budget when a request ran more queries than declared."""
+    budget = route_budgets().get((method, route))
+    if budget is None or count <= budget:
+        return None
+    logger.warning("%s %s ran %d SQL queries, budget is %d", method, route, count, budget)
+    return budget
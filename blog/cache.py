@@ -0,0 +1,143 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+POST_DETAIL_TIMEOUT = getattr(settings, 'POST_DETAIL_CACHE_TIMEOUT', 60 * 60)
+# How long after a write a replica may still serve the old post
+SETTLE_TIMEOUT = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+
+# Bump when the PostDetailSchema output changes, so payloads cached in the
+# old shape are never served again
+DETAIL_FORMAT = 3
+
+HITS_KEY = 'post-detail:hits'
+MISSES_KEY = 'post-detail:misses'
+
+
+def _version_key(slug: str) -> str:
+    return f'post-detail:version:{slug}'
+
+
+def _settling_key(slug: str) -> str:
+    return f'post-detail:settling:{slug}'
+
+
+def _count(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_post_version(slug: str) -> int:
+    """
+    Returns the current cache version of a post. A missing (or evicted)
+    version is seeded from the clock, so it never falls back to a number
+    an older payload may still be stored under.
+    """
+    key = _version_key(slug)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def post_detail_key(slug: str) -> str:
+    return f'post-detail:{DETAIL_FORMAT}:{slug}:{get_post_version(slug)}'
+
+
+def get_post_detail(key: str):
+    payload = cache.get(key)
+    _count(HITS_KEY if payload is not None else MISSES_KEY)
+    return payload
+
+
+def set_post_detail(key: str, payload: bytes):
+    cache.set(key, payload, timeout=POST_DETAIL_TIMEOUT)
+
+
+# Async counterparts used by the async read views, so a network-backed cache
+# (Redis/Memcached) is awaited instead of blocking the event loop.
+
+async def _acount(key: str):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+async def aget_post_version(slug: str) -> int:
+    key = _version_key(slug)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+async def apost_detail_key(slug: str) -> str:
+    return f'post-detail:{DETAIL_FORMAT}:{slug}:{await aget_post_version(slug)}'
+
+
+async def aget_post_detail(key: str):
+    payload = await cache.aget(key)
+    await _acount(HITS_KEY if payload is not None else MISSES_KEY)
+    return payload
+
+
+async def aset_post_detail(key: str, payload: bytes):
+    await cache.aset(key, payload, timeout=POST_DETAIL_TIMEOUT)
+
+
+async def ais_settling(slug: str) -> bool:
+    """
+    True shortly after the post was invalidated, while a lagging replica may
+    still return the old row; payloads read from a replica then must not be
+    cached under the new version.
+    """
+    return await cache.aget(_settling_key(slug)) is not None
+
+
+def invalidate_post(slug: str):
+    """
+    Bumps the post's version so every cached payload for it becomes
+    unreachable; the stale entries age out through the backend's culling.
+    """
+    key = _version_key(slug)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    cache.set(_settling_key(slug), True, timeout=SETTLE_TIMEOUT)
+
+
+def invalidate_posts(slugs):
+    """
+    invalidate_post for many posts at once, for changes that show on every
+    post of an author (their avatar). Versions are reseeded from the clock,
+    which is past any version an older seed has been incremented to.
+    """
+    slugs = list(slugs)
+    if not slugs:
+        return
+    cache.set_many({_version_key(slug): time.time_ns() for slug in slugs}, timeout=None)
+    cache.set_many({_settling_key(slug): True for slug in slugs}, timeout=SETTLE_TIMEOUT)
+
+
+def get_cache_stats() -> dict:
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,121 @@
+import hashlib
+import inspect
+from functools import wraps
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from ninja.decorators import decorate_view
+
+from .cache import DETAIL_FORMAT
+from .models import Post, Profile
+
+
+def _etag(request, version):
+    digest = hashlib.md5(
+        repr((request.get_full_path(), version)).encode(), usedforsecurity=False
+    ).hexdigest()
+    return quote_etag(digest)
+
+
+def _tag(response, etag):
+    response.headers['ETag'] = etag
+    return response
+
+
+def conditional(version_func):
+    """
+    Ninja operation decorator for conditional GETs.
+
+    `version_func(request, **path_params)` returns the version data from a
+    cheap query, or None to skip conditional handling. The strong ETag is
+    derived from the version and the full request path, so a matching
+    If-None-Match is answered with a 304 before the view runs or anything is
+    serialized.
+
+    No Last-Modified is sent: counts and counters change without moving any
+    timestamp, and whole-second dates miss edits made within the same second,
+    so If-Modified-Since alone would be answered with stale 304s.
+
+    Works on sync and async operations alike; the version function may be
+    either and is adapted to the operation's side.
+    """
+    is_async_version = inspect.iscoroutinefunction(version_func)
+
+    def decorator(run):
+        if inspect.iscoroutinefunction(run):
+            get_version = version_func if is_async_version else sync_to_async(version_func)
+
+            @wraps(run)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await run(request, *args, **kwargs)
+                version = await get_version(request, **kwargs)
+                if version is None:
+                    return await run(request, *args, **kwargs)
+
+                etag = _etag(request, version)
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await run(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        return response
+                return _tag(response, etag)
+            return async_wrapper
+
+        get_version = async_to_sync(version_func) if is_async_version else version_func
+
+        @wraps(run)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return run(request, *args, **kwargs)
+            version = get_version(request, **kwargs)
+            if version is None:
+                return run(request, *args, **kwargs)
+
+            etag = _etag(request, version)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = run(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return _tag(response, etag)
+        return wrapper
+    return decorate_view(decorator)
+
+
+async def feed_version(request, **kwargs):
+    posts = Post.objects.filter(is_published=True)
+    continent = request.GET.get('continent')
+    author = request.GET.get('author')
+    if continent and continent != 'All':
+        posts = posts.filter(continent=continent)
+    if author:
+        posts = posts.filter(author__username=author)
+    stats = await posts.aaggregate(last=Max('updated_at'), total=Count('id'))
+    return stats['total'], stats['last']
+
+
+async def post_version(request, slug):
+    row = await (
+        Post.objects
+            .filter(slug=slug)
+            .values('id', 'is_published', 'updated_at', 'author__profile__updated_at')
+            .afirst()
+    )
+    if not row or not row['is_published']:
+        return None
+    return DETAIL_FORMAT, row['id'], row['updated_at'], row['author__profile__updated_at']
+
+
+async def profile_version(request, username):
+    row = await (
+        Profile.objects
+            .filter(user__username=username)
+            .values('updated_at', 'stories_count', 'countries_count', 'visited_bitmap')
+            .afirst()
+    )
+    if not row:
+        return None
+    return tuple(row.values())
@@ -0,0 +1,65 @@
+import math
+
+from django.utils import timezone
+
+from .models import PostBlock
+from .utils import render_quill_html
+
+# Bump whenever the sanitizer or the summary rules change; the
+# rerender_content command then re-renders every post below this version.
+CONTENT_VERSION = 1
+
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+SUMMARY_FIELDS = ['excerpt', 'word_count', 'reading_time', 'content_version']
+
+
+def summarize(texts) -> dict:
+    """Excerpt, word count and reading time for the plain text of a story."""
+    text = ' '.join(t for t in texts if t)
+    words = len(text.split())
+    excerpt = text
+    if len(text) > EXCERPT_LENGTH:
+        excerpt = text[:EXCERPT_LENGTH].rsplit(' ', 1)[0].rstrip(' ,.;:') + '…'
+    return {
+        "excerpt": excerpt,
+        "word_count": words,
+        "reading_time": math.ceil(words / WORDS_PER_MINUTE),
+        "content_version": CONTENT_VERSION,
+    }
+
+
+def apply_summary(post, texts):
+    for field, value in summarize(texts).items():
+        setattr(post, field, value)
+    post.save(update_fields=SUMMARY_FIELDS + ['updated_at'])
+
+
+def rerender_post(post, blocks):
+    """
+    Runs stored text blocks through the current sanitizer again and
+    refreshes the post summary in memory. Returns the blocks that changed.
+    """
+    changed, texts = [], []
+    for block in blocks:
+        if block.type != 'text' or not block.text_content:
+            continue
+        html, text = render_quill_html(block.text_content)
+        texts.append(text)
+        if html != block.text_content:
+            block.text_content = html
+            changed.append(block)
+    for field, value in summarize(texts).items():
+        setattr(post, field, value)
+    post.updated_at = timezone.now()
+    return changed
+
+
+def refresh_post_content(post):
+    """Re-renders one post in place, e.g. after its blocks were edited in the admin."""
+    blocks = list(post.blocks.all())
+    changed = rerender_post(post, blocks)
+    if changed:
+        PostBlock.objects.bulk_update(changed, ['text_content'])
+    post.save(update_fields=SUMMARY_FIELDS + ['updated_at'])
@@ -0,0 +1,169 @@
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .iso3166 import encode_bitmap
+from .leaderboards import record_visits
+from .models import Follow, Post, Profile, VisitedCountry
+
+
+def count_stories(user_id):
+    return Post.objects.filter(author_id=user_id, is_published=True).count()
+
+
+def count_countries(user_id):
+    return VisitedCountry.objects.filter(user_id=user_id).count()
+
+
+def count_followers(user_id):
+    return Follow.objects.filter(followee_id=user_id).count()
+
+
+def count_following(user_id):
+    return Follow.objects.filter(follower_id=user_id).count()
+
+
+def visited_bitmap(user_id):
+    return encode_bitmap(
+        VisitedCountry.objects.filter(user_id=user_id).values_list('country_code', flat=True)
+    )
+
+
+def get_profile(user):
+    """
+    Loads the user's profile, creating it with freshly counted stats for
+    accounts that predate profiles.
+    """
+    # Callable defaults only run on the create path, keeping the common
+    # case to a single SELECT
+    profile, created = Profile.objects.get_or_create(
+        user=user,
+        defaults={
+            "stories_count": lambda: count_stories(user.id),
+            "countries_count": lambda: count_countries(user.id),
+            "followers_count": lambda: count_followers(user.id),
+            "following_count": lambda: count_following(user.id),
+            "visited_bitmap": lambda: visited_bitmap(user.id),
+        },
+    )
+    if created:
+        record_visits(0, profile.countries_count)
+    return profile
+
+
+def adjust_counters(user_id, stories=0, countries=0, followers=0, following=0):
+    """
+    Applies a +/- delta to the stored counters with a single atomic UPDATE.
+    Call it after the post/country/follow change has been written.
+    """
+    updates = {}
+    profiles = Profile.objects.filter(user_id=user_id)
+    deltas = {
+        'stories_count': stories, 'countries_count': countries,
+        'followers_count': followers, 'following_count': following,
+    }
+    for field, delta in deltas.items():
+        if not delta:
+            continue
+        updates[field] = F(field) + delta
+        if delta < 0:
+            profiles = profiles.filter(**{f'{field}__gte': -delta})
+    if not updates:
+        return
+    if not profiles.update(**updates):
+        refresh_counters(user_id)
+
+
+def refresh_counters(user_id):
+    """
+    Recounts one user's stats from scratch, creating the profile if needed,
+    and moves the user to the matching traveler bucket.
+    """
+    with transaction.atomic():
+        old_count = (
+            Profile.objects
+                .select_for_update()
+                .filter(user_id=user_id)
+                .values_list('countries_count', flat=True)
+                .first()
+        ) or 0
+        counts = {
+            "stories_count": count_stories(user_id),
+            "countries_count": count_countries(user_id),
+            "followers_count": count_followers(user_id),
+            "following_count": count_following(user_id),
+            "visited_bitmap": visited_bitmap(user_id),
+        }
+        Profile.objects.update_or_create(user_id=user_id, defaults=counts)
+        record_visits(old_count, counts['countries_count'])
+
+
+def reconcile_counters():
+    """
+    Rewrites every profile's counters from the source tables in one
+    UPDATE and returns how many had drifted. Users without a profile
+    get one first.
+    """
+    missing = User.objects.filter(profile__isnull=True).values_list('id', flat=True)
+    Profile.objects.bulk_create(
+        [Profile(user_id=user_id) for user_id in missing], ignore_conflicts=True
+    )
+
+    stories = (
+        Post.objects
+            .filter(author_id=OuterRef('user_id'), is_published=True)
+            .values('author_id')
+            .annotate(total=Count('id'))
+            .values('total')
+    )
+    countries = (
+        VisitedCountry.objects
+            .filter(user_id=OuterRef('user_id'))
+            .values('user_id')
+            .annotate(total=Count('id'))
+            .values('total')
+    )
+    followers = (
+        Follow.objects
+            .filter(followee_id=OuterRef('user_id'))
+            .values('followee_id')
+            .annotate(total=Count('id'))
+            .values('total')
+    )
+    following = (
+        Follow.objects
+            .filter(follower_id=OuterRef('user_id'))
+            .values('follower_id')
+            .annotate(total=Count('id'))
+            .values('total')
+    )
+    counts = {
+        'stories_count': Coalesce(Subquery(stories), Value(0)),
+        'countries_count': Coalesce(Subquery(countries), Value(0)),
+        'followers_count': Coalesce(Subquery(followers), Value(0)),
+        'following_count': Coalesce(Subquery(following), Value(0)),
+    }
+    actual = Profile.objects.annotate(**{f'actual_{field}': value for field, value in counts.items()})
+    drifted = actual.exclude(**{field: F(f'actual_{field}') for field in counts}).count()
+    Profile.objects.update(**counts)
+    return drifted
+
+
+def reconcile_bitmaps(batch_size=500):
+    """Rebuilds visited_bitmap for every profile whose stored value is off."""
+    visited = defaultdict(set)
+    rows = VisitedCountry.objects.values_list('user_id', 'country_code').order_by('user_id')
+    for user_id, code in rows.iterator(chunk_size=batch_size * 10):
+        visited[user_id].add(code)
+
+    stale = []
+    for profile in Profile.objects.only('id', 'user_id', 'visited_bitmap').iterator(chunk_size=batch_size):
+        bitmap = encode_bitmap(visited.get(profile.user_id, ()))
+        if profile.visited_bitmap != bitmap:
+            profile.visited_bitmap = bitmap
+            stale.append(profile)
+    Profile.objects.bulk_update(stale, ['visited_bitmap'], batch_size=batch_size)
+    return len(stale)
@@ -0,0 +1,159 @@
+"""
+Full-archive export behind GET /api/me/export. Posts are read with a
+chunked iterator and their blocks prefetched per chunk, and the document is
+written out as it goes, so memory stays flat however large the archive is.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+
+from .counters import get_profile
+from .listing import media_url_builder
+from .models import Post, PostBlock, VisitedCountry
+
+try:
+    import orjson
+except ImportError:
+    # The stdlib encoder is C-accelerated too when called without `cls`
+    orjson = None
+
+FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+BATCH_SIZE = 500
+# Encoded posts are buffered up to this size before being sent
+FLUSH_BYTES = 64 * 1024
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _timestamp(value):
+    return value.isoformat() if value else None
+
+
+def _account(user):
+    """Profile and visited countries; run before the posts are streamed."""
+    profile = get_profile(user)
+    url = media_url_builder(profile.avatar.storage)
+    countries = list(
+        VisitedCountry.objects.filter(user=user).order_by('country_code').values_list('country_code', flat=True)
+    )
+    return {
+        "username": user.username,
+        "email": user.email,
+        "date_joined": _timestamp(user.date_joined),
+        "bio": profile.bio,
+        "location": profile.location,
+        "avatar_url": url(profile.avatar.name) if profile.avatar else None,
+        "stories_count": profile.stories_count,
+        "countries_count": profile.countries_count,
+    }, countries
+
+
+def _posts(user):
+    return (
+        Post.objects
+            .filter(author=user)
+            .order_by('created_at', 'id')
+            .prefetch_related(Prefetch('blocks', queryset=PostBlock.objects.order_by('position')))
+    )
+
+
+class ArchiveWriter:
+    """Encodes the archive piece by piece in either export format."""
+
+    def __init__(self, fmt):
+        self.fmt = fmt
+        self.url = media_url_builder(Post._meta.get_field('cover_image').storage)
+        self.buffer = []
+        self.buffered = 0
+        self.first = True
+
+    def begin(self, profile, countries) -> bytes:
+        if self.fmt == 'ndjson':
+            return (
+                dumps({"type": 'profile', "data": profile}) + b'\n'
+                + dumps({"type": 'countries', "data": countries}) + b'\n'
+            )
+        return (
+            b'{"profile":' + dumps(profile)
+            + b',"visited_countries":' + dumps(countries)
+            + b',"posts":['
+        )
+
+    def _post(self, post):
+        url = self.url
+        return {
+            "id": post.id,
+            "slug": post.slug,
+            "title": post.title,
+            "location_name": post.location_name,
+            "continent": post.continent,
+            "latitude": post.latitude,
+            "longitude": post.longitude,
+            "is_published": post.is_published,
+            "created_at": _timestamp(post.created_at),
+            "updated_at": _timestamp(post.updated_at),
+            "cover_image_url": url(post.cover_image.name) if post.cover_image else None,
+            "excerpt": post.excerpt,
+            "word_count": post.word_count,
+            "reading_time": post.reading_time,
+            "blocks": [
+                {
+                    "type": block.type,
+                    "position": block.position,
+                    "text_content": block.text_content,
+                    "image_url": url(block.image_content.name) if block.image_content else None,
+                    "image_caption": block.image_caption,
+                }
+                for block in post.blocks.all()
+            ],
+        }
+
+    def add(self, post):
+        """Buffers one post; returns a chunk to send once enough has built up."""
+        if self.fmt == 'ndjson':
+            encoded = dumps({"type": 'post', "data": self._post(post)}) + b'\n'
+        else:
+            encoded = (b'' if self.first else b',') + dumps(self._post(post))
+        self.first = False
+        self.buffer.append(encoded)
+        self.buffered += len(encoded)
+        if self.buffered >= FLUSH_BYTES:
+            return self.flush()
+        return None
+
+    def flush(self) -> bytes:
+        chunk = b''.join(self.buffer)
+        self.buffer, self.buffered = [], 0
+        return chunk
+
+    def end(self) -> bytes:
+        return self.flush() + (b'' if self.fmt == 'ndjson' else b']}')
+
+
+def archive_chunks(user, fmt):
+    writer = ArchiveWriter(fmt)
+    yield writer.begin(*_account(user))
+    for post in _posts(user).iterator(chunk_size=BATCH_SIZE):
+        chunk = writer.add(post)
+        if chunk:
+            yield chunk
+    yield writer.end()
+
+
+async def aarchive_chunks(user, fmt):
+    """archive_chunks for ASGI, which would otherwise buffer a sync iterator whole."""
+    writer = ArchiveWriter(fmt)
+    yield writer.begin(*await sync_to_async(_account)(user))
+    async for post in _posts(user).aiterator(chunk_size=BATCH_SIZE):
+        chunk = writer.add(post)
+        if chunk:
+            yield chunk
+    yield writer.end()
@@ -0,0 +1,329 @@
+# Offline gazetteer used to place posts on the map from their free-text
+# location_name ("Bali, Indonesia"), without calling a geocoding service.
+#
+# COUNTRIES gives an approximate centre for every country, keyed by the
+# ISO 3166-1 alpha-3 codes in iso3166.ALPHA3. PLACES lists popular cities,
+# islands and regions with their own coordinates. Coordinates are decimal
+# degrees (latitude, longitude); city-level precision is all the map needs.
+
+COUNTRIES = {
+    'AFG': ('Afghanistan', 33.94, 67.71), 'ALB': ('Albania', 41.15, 20.17),
+    'DZA': ('Algeria', 28.03, 1.66), 'AND': ('Andorra', 42.55, 1.60),
+    'AGO': ('Angola', -11.20, 17.87), 'ATG': ('Antigua and Barbuda', 17.06, -61.80),
+    'ARG': ('Argentina', -38.42, -63.62), 'ARM': ('Armenia', 40.07, 45.04),
+    'AUS': ('Australia', -25.27, 133.78), 'AUT': ('Austria', 47.52, 14.55),
+    'AZE': ('Azerbaijan', 40.14, 47.58), 'BHS': ('Bahamas', 25.03, -77.40),
+    'BHR': ('Bahrain', 26.07, 50.56), 'BGD': ('Bangladesh', 23.68, 90.36),
+    'BRB': ('Barbados', 13.19, -59.54), 'BLR': ('Belarus', 53.71, 27.95),
+    'BEL': ('Belgium', 50.50, 4.47), 'BLZ': ('Belize', 17.19, -88.50),
+    'BEN': ('Benin', 9.31, 2.32), 'BTN': ('Bhutan', 27.51, 90.43),
+    'BOL': ('Bolivia', -16.29, -63.59), 'BIH': ('Bosnia and Herzegovina', 43.92, 17.68),
+    'BWA': ('Botswana', -22.33, 24.68), 'BRA': ('Brazil', -14.24, -51.93),
+    'BRN': ('Brunei', 4.54, 114.73), 'BGR': ('Bulgaria', 42.73, 25.49),
+    'BFA': ('Burkina Faso', 12.24, -1.56), 'BDI': ('Burundi', -3.37, 29.92),
+    'CPV': ('Cape Verde', 16.00, -24.01), 'KHM': ('Cambodia', 12.57, 104.99),
+    'CMR': ('Cameroon', 7.37, 12.35), 'CAN': ('Canada', 56.13, -106.35),
+    'CAF': ('Central African Republic', 6.61, 20.94), 'TCD': ('Chad', 15.45, 18.73),
+    'CHL': ('Chile', -35.68, -71.54), 'CHN': ('China', 35.86, 104.20),
+    'COL': ('Colombia', 4.57, -74.30), 'COM': ('Comoros', -11.88, 43.87),
+    'COG': ('Republic of the Congo', -0.23, 15.83), 'COD': ('DR Congo', -4.04, 21.76),
+    'CRI': ('Costa Rica', 9.75, -83.75), 'CIV': ("Cote d'Ivoire", 7.54, -5.55),
+    'HRV': ('Croatia', 45.10, 15.20), 'CUB': ('Cuba', 21.52, -77.78),
+    'CYP': ('Cyprus', 35.13, 33.43), 'CZE': ('Czech Republic', 49.82, 15.47),
+    'DNK': ('Denmark', 56.26, 9.50), 'DJI': ('Djibouti', 11.83, 42.59),
+    'DMA': ('Dominica', 15.41, -61.37), 'DOM': ('Dominican Republic', 18.74, -70.16),
+    'ECU': ('Ecuador', -1.83, -78.18), 'EGY': ('Egypt', 26.82, 30.80),
+    'SLV': ('El Salvador', 13.79, -88.90), 'GNQ': ('Equatorial Guinea', 1.65, 10.27),
+    'ERI': ('Eritrea', 15.18, 39.78), 'EST': ('Estonia', 58.60, 25.01),
+    'SWZ': ('Eswatini', -26.52, 31.47), 'ETH': ('Ethiopia', 9.15, 40.49),
+    'FJI': ('Fiji', -17.71, 178.07), 'FIN': ('Finland', 61.92, 25.75),
+    'FRA': ('France', 46.23, 2.21), 'GAB': ('Gabon', -0.80, 11.61),
+    'GMB': ('Gambia', 13.44, -15.31), 'GEO': ('Georgia', 42.32, 43.36),
+    'DEU': ('Germany', 51.17, 10.45), 'GHA': ('Ghana', 7.95, -1.02),
+    'GRC': ('Greece', 39.07, 21.82), 'GRD': ('Grenada', 12.12, -61.68),
+    'GRL': ('Greenland', 71.71, -42.60), 'GTM': ('Guatemala', 15.78, -90.23),
+    'GIN': ('Guinea', 9.95, -9.70), 'GNB': ('Guinea-Bissau', 11.80, -15.18),
+    'GUY': ('Guyana', 4.86, -58.93), 'HTI': ('Haiti', 18.97, -72.29),
+    'HND': ('Honduras', 15.20, -86.24), 'HKG': ('Hong Kong', 22.32, 114.17),
+    'HUN': ('Hungary', 47.16, 19.50), 'ISL': ('Iceland', 64.96, -19.02),
+    'IND': ('India', 20.59, 78.96), 'IDN': ('Indonesia', -0.79, 113.92),
+    'IRN': ('Iran', 32.43, 53.69), 'IRQ': ('Iraq', 33.22, 43.68),
+    'IRL': ('Ireland', 53.41, -8.24), 'ISR': ('Israel', 31.05, 34.85),
+    'ITA': ('Italy', 41.87, 12.57), 'JAM': ('Jamaica', 18.11, -77.30),
+    'JPN': ('Japan', 36.20, 138.25), 'JOR': ('Jordan', 30.59, 36.24),
+    'KAZ': ('Kazakhstan', 48.02, 66.92), 'KEN': ('Kenya', -0.02, 37.91),
+    'KIR': ('Kiribati', 1.87, -157.36), 'KWT': ('Kuwait', 29.31, 47.48),
+    'KGZ': ('Kyrgyzstan', 41.20, 74.77), 'LAO': ('Laos', 19.86, 102.50),
+    'LVA': ('Latvia', 56.88, 24.60), 'LBN': ('Lebanon', 33.85, 35.86),
+    'LSO': ('Lesotho', -29.61, 28.23), 'LBR': ('Liberia', 6.43, -9.43),
+    'LBY': ('Libya', 26.34, 17.23), 'LIE': ('Liechtenstein', 47.17, 9.56),
+    'LTU': ('Lithuania', 55.17, 23.88), 'LUX': ('Luxembourg', 49.82, 6.13),
+    'MAC': ('Macau', 22.20, 113.54), 'MDG': ('Madagascar', -18.77, 46.87),
+    'MWI': ('Malawi', -13.25, 34.30), 'MYS': ('Malaysia', 4.21, 101.98),
+    'MDV': ('Maldives', 3.20, 73.22), 'MLI': ('Mali', 17.57, -4.00),
+    'MLT': ('Malta', 35.94, 14.38), 'MHL': ('Marshall Islands', 7.13, 171.18),
+    'MRT': ('Mauritania', 21.01, -10.94), 'MUS': ('Mauritius', -20.35, 57.55),
+    'MEX': ('Mexico', 23.63, -102.55), 'FSM': ('Micronesia', 7.43, 150.55),
+    'MDA': ('Moldova', 47.41, 28.37), 'MCO': ('Monaco', 43.74, 7.42),
+    'MNG': ('Mongolia', 46.86, 103.85), 'MNE': ('Montenegro', 42.71, 19.37),
+    'MAR': ('Morocco', 31.79, -7.09), 'MOZ': ('Mozambique', -18.67, 35.53),
+    'MMR': ('Myanmar', 21.91, 95.96), 'NAM': ('Namibia', -22.96, 18.49),
+    'NRU': ('Nauru', -0.52, 166.93), 'NPL': ('Nepal', 28.39, 84.12),
+    'NLD': ('Netherlands', 52.13, 5.29), 'NCL': ('New Caledonia', -20.90, 165.62),
+    'NZL': ('New Zealand', -40.90, 174.89), 'NIC': ('Nicaragua', 12.87, -85.21),
+    'NER': ('Niger', 17.61, 8.08), 'NGA': ('Nigeria', 9.08, 8.68),
+    'PRK': ('North Korea', 40.34, 127.51), 'MKD': ('North Macedonia', 41.61, 21.75),
+    'NOR': ('Norway', 60.47, 8.47), 'OMN': ('Oman', 21.51, 55.92),
+    'PAK': ('Pakistan', 30.38, 69.35), 'PLW': ('Palau', 7.51, 134.58),
+    'PSE': ('Palestine', 31.95, 35.23), 'PAN': ('Panama', 8.54, -80.78),
+    'PNG': ('Papua New Guinea', -6.31, 143.96), 'PRY': ('Paraguay', -23.44, -58.44),
+    'PER': ('Peru', -9.19, -75.02), 'PHL': ('Philippines', 12.88, 121.77),
+    'POL': ('Poland', 51.92, 19.15), 'PRT': ('Portugal', 39.40, -8.22),
+    'PRI': ('Puerto Rico', 18.22, -66.59), 'PYF': ('French Polynesia', -17.68, -149.41),
+    'QAT': ('Qatar', 25.35, 51.18), 'ROU': ('Romania', 45.94, 24.97),
+    'RUS': ('Russia', 61.52, 105.32), 'RWA': ('Rwanda', -1.94, 29.87),
+    'KNA': ('Saint Kitts and Nevis', 17.36, -62.78), 'LCA': ('Saint Lucia', 13.91, -60.98),
+    'VCT': ('Saint Vincent and the Grenadines', 12.98, -61.29), 'WSM': ('Samoa', -13.76, -172.10),
+    'SMR': ('San Marino', 43.94, 12.46), 'STP': ('Sao Tome and Principe', 0.19, 6.61),
+    'SAU': ('Saudi Arabia', 23.89, 45.08), 'SEN': ('Senegal', 14.50, -14.45),
+    'SRB': ('Serbia', 44.02, 21.01), 'SYC': ('Seychelles', -4.68, 55.49),
+    'SLE': ('Sierra Leone', 8.46, -11.78), 'SGP': ('Singapore', 1.35, 103.82),
+    'SVK': ('Slovakia', 48.67, 19.70), 'SVN': ('Slovenia', 46.15, 14.99),
+    'SLB': ('Solomon Islands', -9.65, 160.16), 'SOM': ('Somalia', 5.15, 46.20),
+    'ZAF': ('South Africa', -30.56, 22.94), 'KOR': ('South Korea', 35.91, 127.77),
+    'SSD': ('South Sudan', 6.88, 31.31), 'ESP': ('Spain', 40.46, -3.75),
+    'LKA': ('Sri Lanka', 7.87, 80.77), 'SDN': ('Sudan', 12.86, 30.22),
+    'SUR': ('Suriname', 3.92, -56.03), 'SWE': ('Sweden', 60.13, 18.64),
+    'CHE': ('Switzerland', 46.82, 8.23), 'SYR': ('Syria', 34.80, 38.99),
+    'TWN': ('Taiwan', 23.70, 120.96), 'TJK': ('Tajikistan', 38.86, 71.28),
+    'TZA': ('Tanzania', -6.37, 34.89), 'THA': ('Thailand', 15.87, 100.99),
+    'TLS': ('Timor-Leste', -8.87, 125.73), 'TGO': ('Togo', 8.62, 0.82),
+    'TON': ('Tonga', -21.18, -175.20), 'TTO': ('Trinidad and Tobago', 10.69, -61.22),
+    'TUN': ('Tunisia', 33.89, 9.54), 'TUR': ('Turkey', 38.96, 35.24),
+    'TKM': ('Turkmenistan', 38.97, 59.56), 'TUV': ('Tuvalu', -7.11, 177.65),
+    'UGA': ('Uganda', 1.37, 32.29), 'UKR': ('Ukraine', 48.38, 31.17),
+    'ARE': ('United Arab Emirates', 23.42, 53.85), 'GBR': ('United Kingdom', 55.38, -3.44),
+    'USA': ('United States', 37.09, -95.71), 'URY': ('Uruguay', -32.52, -55.77),
+    'UZB': ('Uzbekistan', 41.38, 64.59), 'VUT': ('Vanuatu', -15.38, 166.96),
+    'VAT': ('Vatican City', 41.90, 12.45), 'VEN': ('Venezuela', 6.42, -66.59),
+    'VNM': ('Vietnam', 14.06, 108.28), 'YEM': ('Yemen', 15.55, 48.52),
+    'ZMB': ('Zambia', -13.13, 27.85), 'ZWE': ('Zimbabwe', -19.02, 29.15),
+    'ATA': ('Antarctica', -75.25, -0.07), 'FRO': ('Faroe Islands', 61.89, -6.91),
+    'GIB': ('Gibraltar', 36.14, -5.35), 'IMN': ('Isle of Man', 54.24, -4.55),
+    'CUW': ('Curacao', 12.17, -68.99), 'ABW': ('Aruba', 12.52, -69.97),
+    'BMU': ('Bermuda', 32.32, -64.76), 'CYM': ('Cayman Islands', 19.31, -81.25),
+    'GUM': ('Guam', 13.44, 144.79), 'REU': ('Reunion', -21.12, 55.54),
+    'MTQ': ('Martinique', 14.64, -61.02), 'GLP': ('Guadeloupe', 16.27, -61.55),
+    'ESH': ('Western Sahara', 24.22, -12.89), 'COK': ('Cook Islands', -21.24, -159.78),
+}
+
+# Other names people write for a country
+COUNTRY_ALIASES = {
+    'usa': 'USA', 'us': 'USA', 'u.s.': 'USA', 'u.s.a.': 'USA', 'america': 'USA',
+    'united states of america': 'USA',
+    'uk': 'GBR', 'u.k.': 'GBR', 'great britain': 'GBR', 'britain': 'GBR',
+    'england': 'GBR', 'scotland': 'GBR', 'wales': 'GBR', 'northern ireland': 'GBR',
+    'uae': 'ARE', 'emirates': 'ARE',
+    'czechia': 'CZE', 'holland': 'NLD', 'the netherlands': 'NLD',
+    'korea': 'KOR', 'republic of korea': 'KOR',
+    'viet nam': 'VNM', 'burma': 'MMR', 'persia': 'IRN',
+    'turkiye': 'TUR', 'russian federation': 'RUS',
+    'ivory coast': 'CIV', 'swaziland': 'SWZ', 'macedonia': 'MKD',
+    'east timor': 'TLS', 'congo': 'COG', 'drc': 'COD',
+    'democratic republic of the congo': 'COD', 'cabo verde': 'CPV',
+    'bosnia': 'BIH', 'the bahamas': 'BHS', 'the gambia': 'GMB',
+    'vatican': 'VAT', 'tahiti': 'PYF',
+}
+
+# (name, country code, latitude, longitude)
+PLACES = (
+    # Europe
+    ('Lisbon', 'PRT', 38.7223, -9.1393), ('Porto', 'PRT', 41.1579, -8.6291),
+    ('Madeira', 'PRT', 32.7607, -16.9595), ('Azores', 'PRT', 37.7412, -25.6756),
+    ('Faro', 'PRT', 37.0194, -7.9304), ('Sintra', 'PRT', 38.8029, -9.3817),
+    ('Madrid', 'ESP', 40.4168, -3.7038), ('Barcelona', 'ESP', 41.3874, 2.1686),
+    ('Seville', 'ESP', 37.3891, -5.9845), ('Granada', 'ESP', 37.1773, -3.5986),
+    ('Valencia', 'ESP', 39.4699, -0.3763), ('Mallorca', 'ESP', 39.6953, 3.0176),
+    ('Ibiza', 'ESP', 38.9067, 1.4206), ('Tenerife', 'ESP', 28.2916, -16.6291),
+    ('San Sebastian', 'ESP', 43.3183, -1.9812), ('Bilbao', 'ESP', 43.2630, -2.9350),
+    ('Paris', 'FRA', 48.8566, 2.3522), ('Nice', 'FRA', 43.7102, 7.2620),
+    ('Lyon', 'FRA', 45.7640, 4.8357), ('Marseille', 'FRA', 43.2965, 5.3698),
+    ('Bordeaux', 'FRA', 44.8378, -0.5792), ('Chamonix', 'FRA', 45.9237, 6.8694),
+    ('Corsica', 'FRA', 42.0396, 9.0129), ('Provence', 'FRA', 43.9352, 6.0679),
+    ('London', 'GBR', 51.5074, -0.1278), ('Edinburgh', 'GBR', 55.9533, -3.1883),
+    ('Manchester', 'GBR', 53.4808, -2.2426), ('Liverpool', 'GBR', 53.4084, -2.9916),
+    ('Oxford', 'GBR', 51.7520, -1.2577), ('Isle of Skye', 'GBR', 57.2736, -6.2155),
+    ('Dublin', 'IRL', 53.3498, -6.2603), ('Galway', 'IRL', 53.2707, -9.0568),
+    ('Amsterdam', 'NLD', 52.3676, 4.9041), ('Rotterdam', 'NLD', 51.9244, 4.4777),
+    ('Brussels', 'BEL', 50.8503, 4.3517), ('Bruges', 'BEL', 51.2093, 3.2247),
+    ('Berlin', 'DEU', 52.5200, 13.4050), ('Munich', 'DEU', 48.1351, 11.5820),
+    ('Hamburg', 'DEU', 53.5511, 9.9937), ('Cologne', 'DEU', 50.9375, 6.9603),
+    ('Dresden', 'DEU', 51.0504, 13.7373), ('Vienna', 'AUT', 48.2082, 16.3738),
+    ('Salzburg', 'AUT', 47.8095, 13.0550), ('Hallstatt', 'AUT', 47.5622, 13.6493),
+    ('Innsbruck', 'AUT', 47.2692, 11.4041), ('Zurich', 'CHE', 47.3769, 8.5417),
+    ('Geneva', 'CHE', 46.2044, 6.1432), ('Lucerne', 'CHE', 47.0502, 8.3093),
+    ('Zermatt', 'CHE', 46.0207, 7.7491), ('Interlaken', 'CHE', 46.6863, 7.8632),
+    ('Rome', 'ITA', 41.9028, 12.4964), ('Florence', 'ITA', 43.7696, 11.2558),
+    ('Venice', 'ITA', 45.4408, 12.3155), ('Milan', 'ITA', 45.4642, 9.1900),
+    ('Naples', 'ITA', 40.8518, 14.2681), ('Amalfi', 'ITA', 40.6340, 14.6027),
+    ('Cinque Terre', 'ITA', 44.1461, 9.6439), ('Sicily', 'ITA', 37.5999, 14.0154),
+    ('Sardinia', 'ITA', 40.1209, 9.0129), ('Tuscany', 'ITA', 43.7711, 11.2486),
+    ('Dolomites', 'ITA', 46.4102, 11.8440), ('Lake Como', 'ITA', 46.0160, 9.2572),
+    ('Athens', 'GRC', 37.9838, 23.7275), ('Santorini', 'GRC', 36.3932, 25.4615),
+    ('Mykonos', 'GRC', 37.4467, 25.3289), ('Crete', 'GRC', 35.2401, 24.8093),
+    ('Thessaloniki', 'GRC', 40.6401, 22.9444), ('Corfu', 'GRC', 39.6243, 19.9217),
+    ('Dubrovnik', 'HRV', 42.6507, 18.0944), ('Split', 'HRV', 43.5081, 16.4402),
+    ('Zagreb', 'HRV', 45.8150, 15.9819), ('Ljubljana', 'SVN', 46.0569, 14.5058),
+    ('Lake Bled', 'SVN', 46.3683, 14.1146), ('Kotor', 'MNE', 42.4247, 18.7712),
+    ('Sarajevo', 'BIH', 43.8563, 18.4131), ('Mostar', 'BIH', 43.3438, 17.8078),
+    ('Belgrade', 'SRB', 44.7866, 20.4489), ('Budapest', 'HUN', 47.4979, 19.0402),
+    ('Prague', 'CZE', 50.0755, 14.4378), ('Cesky Krumlov', 'CZE', 48.8127, 14.3175),
+    ('Krakow', 'POL', 50.0647, 19.9450), ('Warsaw', 'POL', 52.2297, 21.0122),
+    ('Gdansk', 'POL', 54.3520, 18.6466), ('Bratislava', 'SVK', 48.1486, 17.1077),
+    ('Bucharest', 'ROU', 44.4268, 26.1025), ('Brasov', 'ROU', 45.6427, 25.5887),
+    ('Sofia', 'BGR', 42.6977, 23.3219), ('Tallinn', 'EST', 59.4370, 24.7536),
+    ('Riga', 'LVA', 56.9496, 24.1052), ('Vilnius', 'LTU', 54.6872, 25.2797),
+    ('Copenhagen', 'DNK', 55.6761, 12.5683), ('Stockholm', 'SWE', 59.3293, 18.0686),
+    ('Oslo', 'NOR', 59.9139, 10.7522), ('Bergen', 'NOR', 60.3913, 5.3221),
+    ('Tromso', 'NOR', 69.6492, 18.9553), ('Lofoten', 'NOR', 68.2090, 13.6180),
+    ('Helsinki', 'FIN', 60.1699, 24.9384), ('Rovaniemi', 'FIN', 66.5039, 25.7294),
+    ('Lapland', 'FIN', 67.9222, 26.5046), ('Reykjavik', 'ISL', 64.1466, -21.9426),
+    ('Valletta', 'MLT', 35.8989, 14.5146), ('Istanbul', 'TUR', 41.0082, 28.9784),
+    ('Cappadocia', 'TUR', 38.6431, 34.8289), ('Antalya', 'TUR', 36.8969, 30.7133),
+    ('Kyiv', 'UKR', 50.4501, 30.5234), ('Lviv', 'UKR', 49.8397, 24.0297),
+    ('Moscow', 'RUS', 55.7558, 37.6173), ('Saint Petersburg', 'RUS', 59.9311, 30.3609),
+    ('Lake Baikal', 'RUS', 53.5587, 108.1650),
+    # Caucasus, Middle East and Central Asia
+    ('Tbilisi', 'GEO', 41.7151, 44.8271), ('Batumi', 'GEO', 41.6168, 41.6367),
+    ('Kazbegi', 'GEO', 42.6567, 44.6433), ('Yerevan', 'ARM', 40.1792, 44.4991),
+    ('Baku', 'AZE', 40.4093, 49.8671), ('Dubai', 'ARE', 25.2048, 55.2708),
+    ('Abu Dhabi', 'ARE', 24.4539, 54.3773), ('Doha', 'QAT', 25.2854, 51.5310),
+    ('Muscat', 'OMN', 23.5880, 58.3829), ('Petra', 'JOR', 30.3285, 35.4444),
+    ('Amman', 'JOR', 31.9454, 35.9284), ('Wadi Rum', 'JOR', 29.5321, 35.4210),
+    ('Jerusalem', 'ISR', 31.7683, 35.2137), ('Tel Aviv', 'ISR', 32.0853, 34.7818),
+    ('Beirut', 'LBN', 33.8938, 35.5018), ('Tehran', 'IRN', 35.6892, 51.3890),
+    ('Isfahan', 'IRN', 32.6546, 51.6680), ('Samarkand', 'UZB', 39.6270, 66.9750),
+    ('Bukhara', 'UZB', 39.7681, 64.4556), ('Tashkent', 'UZB', 41.2995, 69.2401),
+    ('Almaty', 'KAZ', 43.2220, 76.8512), ('Bishkek', 'KGZ', 42.8746, 74.5698),
+    # Asia
+    ('Tokyo', 'JPN', 35.6762, 139.6503), ('Kyoto', 'JPN', 35.0116, 135.7681),
+    ('Osaka', 'JPN', 34.6937, 135.5023), ('Hiroshima', 'JPN', 34.3853, 132.4553),
+    ('Nara', 'JPN', 34.6851, 135.8048), ('Sapporo', 'JPN', 43.0618, 141.3545),
+    ('Hokkaido', 'JPN', 43.2203, 142.8635), ('Okinawa', 'JPN', 26.2124, 127.6809),
+    ('Mount Fuji', 'JPN', 35.3606, 138.7274), ('Seoul', 'KOR', 37.5665, 126.9780),
+    ('Busan', 'KOR', 35.1796, 129.0756), ('Jeju', 'KOR', 33.4996, 126.5312),
+    ('Beijing', 'CHN', 39.9042, 116.4074), ('Shanghai', 'CHN', 31.2304, 121.4737),
+    ('Xian', 'CHN', 34.3416, 108.9398), ('Chengdu', 'CHN', 30.5728, 104.0668),
+    ('Guilin', 'CHN', 25.2736, 110.2900), ('Lhasa', 'CHN', 29.6520, 91.1721),
+    ('Taipei', 'TWN', 25.0330, 121.5654), ('Ulaanbaatar', 'MNG', 47.8864, 106.9057),
+    ('Hanoi', 'VNM', 21.0278, 105.8342), ('Ho Chi Minh City', 'VNM', 10.8231, 106.6297),
+    ('Saigon', 'VNM', 10.8231, 106.6297), ('Hoi An', 'VNM', 15.8801, 108.3380),
+    ('Ha Long Bay', 'VNM', 20.9101, 107.1839), ('Da Nang', 'VNM', 16.0544, 108.2022),
+    ('Hue', 'VNM', 16.4637, 107.5909), ('Sapa', 'VNM', 22.3364, 103.8438),
+    ('Bangkok', 'THA', 13.7563, 100.5018), ('Chiang Mai', 'THA', 18.7883, 98.9853),
+    ('Phuket', 'THA', 7.8804, 98.3923), ('Krabi', 'THA', 8.0863, 98.9063),
+    ('Koh Samui', 'THA', 9.5120, 100.0136), ('Koh Phangan', 'THA', 9.7319, 100.0136),
+    ('Siem Reap', 'KHM', 13.3671, 103.8448), ('Angkor Wat', 'KHM', 13.4125, 103.8670),
+    ('Phnom Penh', 'KHM', 11.5564, 104.9282), ('Luang Prabang', 'LAO', 19.8856, 102.1347),
+    ('Vientiane', 'LAO', 17.9757, 102.6331), ('Yangon', 'MMR', 16.8409, 96.1735),
+    ('Bagan', 'MMR', 21.1717, 94.8585), ('Kuala Lumpur', 'MYS', 3.1390, 101.6869),
+    ('Penang', 'MYS', 5.4164, 100.3327), ('Langkawi', 'MYS', 6.3500, 99.8000),
+    ('Borneo', 'MYS', 0.9619, 114.5548), ('Singapore', 'SGP', 1.3521, 103.8198),
+    ('Bali', 'IDN', -8.3405, 115.0920), ('Ubud', 'IDN', -8.5069, 115.2625),
+    ('Jakarta', 'IDN', -6.2088, 106.8456), ('Yogyakarta', 'IDN', -7.7956, 110.3695),
+    ('Lombok', 'IDN', -8.6500, 116.3242), ('Komodo', 'IDN', -8.5500, 119.4833),
+    ('Manila', 'PHL', 14.5995, 120.9842), ('Palawan', 'PHL', 9.8349, 118.7384),
+    ('El Nido', 'PHL', 11.1956, 119.4075), ('Cebu', 'PHL', 10.3157, 123.8854),
+    ('Boracay', 'PHL', 11.9674, 121.9248), ('Siargao', 'PHL', 9.8482, 126.0458),
+    ('Delhi', 'IND', 28.7041, 77.1025), ('New Delhi', 'IND', 28.6139, 77.2090),
+    ('Mumbai', 'IND', 19.0760, 72.8777), ('Agra', 'IND', 27.1767, 78.0081),
+    ('Jaipur', 'IND', 26.9124, 75.7873), ('Udaipur', 'IND', 24.5854, 73.7125),
+    ('Varanasi', 'IND', 25.3176, 82.9739), ('Goa', 'IND', 15.2993, 74.1240),
+    ('Kerala', 'IND', 10.8505, 76.2711), ('Rishikesh', 'IND', 30.0869, 78.2676),
+    ('Leh', 'IND', 34.1526, 77.5771), ('Kolkata', 'IND', 22.5726, 88.3639),
+    ('Bangalore', 'IND', 12.9716, 77.5946), ('Kathmandu', 'NPL', 27.7172, 85.3240),
+    ('Pokhara', 'NPL', 28.2096, 83.9856), ('Everest Base Camp', 'NPL', 28.0026, 86.8528),
+    ('Thimphu', 'BTN', 27.4728, 89.6390), ('Colombo', 'LKA', 6.9271, 79.8612),
+    ('Kandy', 'LKA', 7.2906, 80.6337), ('Ella', 'LKA', 6.8667, 81.0466),
+    ('Male', 'MDV', 4.1755, 73.5093), ('Hong Kong', 'HKG', 22.3193, 114.1694),
+    # Africa
+    ('Marrakesh', 'MAR', 31.6295, -7.9811), ('Marrakech', 'MAR', 31.6295, -7.9811),
+    ('Fes', 'MAR', 34.0181, -5.0078), ('Chefchaouen', 'MAR', 35.1688, -5.2636),
+    ('Casablanca', 'MAR', 33.5731, -7.5898), ('Essaouira', 'MAR', 31.5085, -9.7595),
+    ('Sahara', 'MAR', 31.1450, -4.0120), ('Tunis', 'TUN', 36.8065, 10.1815),
+    ('Cairo', 'EGY', 30.0444, 31.2357), ('Luxor', 'EGY', 25.6872, 32.6396),
+    ('Aswan', 'EGY', 24.0889, 32.8998), ('Giza', 'EGY', 29.9773, 31.1325),
+    ('Dahab', 'EGY', 28.5091, 34.5136), ('Zanzibar', 'TZA', -6.1659, 39.2026),
+    ('Serengeti', 'TZA', -2.3333, 34.8333), ('Kilimanjaro', 'TZA', -3.0674, 37.3556),
+    ('Arusha', 'TZA', -3.3869, 36.6830), ('Dar es Salaam', 'TZA', -6.7924, 39.2083),
+    ('Nairobi', 'KEN', -1.2921, 36.8219), ('Masai Mara', 'KEN', -1.4061, 35.0089),
+    ('Mombasa', 'KEN', -4.0435, 39.6682), ('Kigali', 'RWA', -1.9441, 30.0619),
+    ('Kampala', 'UGA', 0.3476, 32.5825), ('Addis Ababa', 'ETH', 9.0320, 38.7469),
+    ('Lalibela', 'ETH', 12.0317, 39.0476), ('Cape Town', 'ZAF', -33.9249, 18.4241),
+    ('Johannesburg', 'ZAF', -26.2041, 28.0473), ('Kruger', 'ZAF', -23.9884, 31.5547),
+    ('Durban', 'ZAF', -29.8587, 31.0218), ('Garden Route', 'ZAF', -33.9500, 22.4600),
+    ('Victoria Falls', 'ZWE', -17.9243, 25.8572), ('Okavango Delta', 'BWA', -19.2833, 22.9000),
+    ('Windhoek', 'NAM', -22.5609, 17.0658), ('Sossusvlei', 'NAM', -24.7275, 15.3432),
+    ('Etosha', 'NAM', -18.8556, 16.3293), ('Dakar', 'SEN', 14.7167, -17.4677),
+    ('Accra', 'GHA', 5.6037, -0.1870), ('Lagos', 'NGA', 6.5244, 3.3792),
+    ('Antananarivo', 'MDG', -18.8792, 47.5079), ('Mauritius', 'MUS', -20.3484, 57.5522),
+    ('Seychelles', 'SYC', -4.6796, 55.4920), ('Cape Verde', 'CPV', 16.5388, -23.0418),
+    # North America and the Caribbean
+    ('New York', 'USA', 40.7128, -74.0060), ('New York City', 'USA', 40.7128, -74.0060),
+    ('NYC', 'USA', 40.7128, -74.0060), ('Los Angeles', 'USA', 34.0522, -118.2437),
+    ('San Francisco', 'USA', 37.7749, -122.4194), ('Chicago', 'USA', 41.8781, -87.6298),
+    ('Boston', 'USA', 42.3601, -71.0589), ('Washington', 'USA', 38.9072, -77.0369),
+    ('Miami', 'USA', 25.7617, -80.1918), ('New Orleans', 'USA', 29.9511, -90.0715),
+    ('Las Vegas', 'USA', 36.1699, -115.1398), ('Seattle', 'USA', 47.6062, -122.3321),
+    ('Portland', 'USA', 45.5152, -122.6784), ('Austin', 'USA', 30.2672, -97.7431),
+    ('Nashville', 'USA', 36.1627, -86.7816), ('San Diego', 'USA', 32.7157, -117.1611),
+    ('Denver', 'USA', 39.7392, -104.9903), ('Hawaii', 'USA', 19.8968, -155.5828),
+    ('Honolulu', 'USA', 21.3069, -157.8583), ('Maui', 'USA', 20.7984, -156.3319),
+    ('Alaska', 'USA', 64.2008, -149.4937), ('Anchorage', 'USA', 61.2181, -149.9003),
+    ('Grand Canyon', 'USA', 36.1069, -112.1129), ('Yosemite', 'USA', 37.8651, -119.5383),
+    ('Yellowstone', 'USA', 44.4280, -110.5885), ('Zion', 'USA', 37.2982, -113.0263),
+    ('Vancouver', 'CAN', 49.2827, -123.1207), ('Toronto', 'CAN', 43.6532, -79.3832),
+    ('Montreal', 'CAN', 45.5017, -73.5673), ('Quebec City', 'CAN', 46.8139, -71.2080),
+    ('Banff', 'CAN', 51.1784, -115.5708), ('Jasper', 'CAN', 52.8734, -118.0814),
+    ('Victoria', 'CAN', 48.4284, -123.3656), ('Calgary', 'CAN', 51.0447, -114.0719),
+    ('Mexico City', 'MEX', 19.4326, -99.1332), ('Oaxaca', 'MEX', 17.0732, -96.7266),
+    ('Cancun', 'MEX', 21.1619, -86.8515), ('Tulum', 'MEX', 20.2114, -87.4654),
+    ('Playa del Carmen', 'MEX', 20.6296, -87.0739), ('Guadalajara', 'MEX', 20.6597, -103.3496),
+    ('San Cristobal de las Casas', 'MEX', 16.7370, -92.6376), ('Merida', 'MEX', 20.9674, -89.5926),
+    ('Havana', 'CUB', 23.1136, -82.3666), ('Trinidad', 'CUB', 21.8022, -79.9847),
+    ('Antigua', 'GTM', 14.5586, -90.7295), ('Lake Atitlan', 'GTM', 14.6907, -91.2025),
+    ('Tikal', 'GTM', 17.2220, -89.6237), ('San Jose', 'CRI', 9.9281, -84.0907),
+    ('Monteverde', 'CRI', 10.3000, -84.8167), ('Panama City', 'PAN', 8.9824, -79.5199),
+    ('San Juan', 'PRI', 18.4655, -66.1057), ('Punta Cana', 'DOM', 18.5601, -68.3725),
+    # South America
+    ('Cusco', 'PER', -13.5320, -71.9675), ('Machu Picchu', 'PER', -13.1631, -72.5450),
+    ('Lima', 'PER', -12.0464, -77.0428), ('Arequipa', 'PER', -16.4090, -71.5375),
+    ('Lake Titicaca', 'PER', -15.8402, -69.3333), ('La Paz', 'BOL', -16.4897, -68.1193),
+    ('Uyuni', 'BOL', -20.4603, -66.8261), ('Quito', 'ECU', -0.1807, -78.4678),
+    ('Galapagos', 'ECU', -0.9538, -90.9656), ('Bogota', 'COL', 4.7110, -74.0721),
+    ('Medellin', 'COL', 6.2442, -75.5812), ('Cartagena', 'COL', 10.3910, -75.4794),
+    ('Rio de Janeiro', 'BRA', -22.9068, -43.1729), ('Sao Paulo', 'BRA', -23.5505, -46.6333),
+    ('Salvador', 'BRA', -12.9777, -38.5016), ('Florianopolis', 'BRA', -27.5954, -48.5480),
+    ('Manaus', 'BRA', -3.1190, -60.0217), ('Amazon', 'BRA', -3.4653, -62.2159),
+    ('Iguazu Falls', 'ARG', -25.6953, -54.4367), ('Buenos Aires', 'ARG', -34.6037, -58.3816),
+    ('Mendoza', 'ARG', -32.8895, -68.8458), ('Bariloche', 'ARG', -41.1335, -71.3103),
+    ('Ushuaia', 'ARG', -54.8019, -68.3030), ('El Chalten', 'ARG', -49.3315, -72.8863),
+    ('Patagonia', 'ARG', -41.8101, -68.9063), ('Santiago', 'CHL', -33.4489, -70.6693),
+    ('Valparaiso', 'CHL', -33.0472, -71.6127), ('Atacama', 'CHL', -22.9087, -68.1997),
+    ('Torres del Paine', 'CHL', -50.9423, -73.4068), ('Easter Island', 'CHL', -27.1127, -109.3497),
+    ('Montevideo', 'URY', -34.9011, -56.1645), ('Caracas', 'VEN', 10.4806, -66.9036),
+    # Oceania
+    ('Sydney', 'AUS', -33.8688, 151.2093), ('Melbourne', 'AUS', -37.8136, 144.9631),
+    ('Brisbane', 'AUS', -27.4698, 153.0251), ('Perth', 'AUS', -31.9505, 115.8605),
+    ('Adelaide', 'AUS', -34.9285, 138.6007), ('Hobart', 'AUS', -42.8821, 147.3272),
+    ('Tasmania', 'AUS', -41.4545, 145.9707), ('Cairns', 'AUS', -16.9186, 145.7781),
+    ('Great Barrier Reef', 'AUS', -18.2871, 147.6992), ('Uluru', 'AUS', -25.3444, 131.0369),
+    ('Darwin', 'AUS', -12.4634, 130.8456), ('Byron Bay', 'AUS', -28.6474, 153.6020),
+    ('Auckland', 'NZL', -36.8485, 174.7633), ('Wellington', 'NZL', -41.2865, 174.7762),
+    ('Queenstown', 'NZL', -45.0312, 168.6626), ('Christchurch', 'NZL', -43.5321, 172.6362),
+    ('Rotorua', 'NZL', -38.1368, 176.2497), ('Milford Sound', 'NZL', -44.6414, 167.8974),
+    ('Fiji', 'FJI', -17.7134, 178.0650), ('Bora Bora', 'PYF', -16.5004, -151.7415),
+    ('Tahiti', 'PYF', -17.6509, -149.4260), ('Samoa', 'WSM', -13.7590, -172.1046),
+    # Antarctica
+    ('Antarctic Peninsula', 'ATA', -64.0, -60.0),
+)
@@ -0,0 +1,257 @@
+"""
+Map placement for posts. location_name is resolved against the bundled
+gazetteer when a post is saved, and the point is stored with its geohash.
+Points that are close share a geohash prefix, so a map viewport or a
+"nearby" radius turns into a few indexed prefix lookups followed by an
+exact latitude/longitude filter. Viewports holding more posts than fit on
+a map are aggregated per geohash cell in the database.
+"""
+import math
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models.functions import Substr
+from ninja.errors import HttpError
+
+from .gazetteer import COUNTRIES, COUNTRY_ALIASES, PLACES
+from .listing import post_list_rows, serialize_post_list
+from .models import Post
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Stored geohash length: cells of about 5 x 5 metres
+GEOHASH_LENGTH = 9
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Prefix lookups per box; more, smaller cells hug the box tighter but make a
+# longer OR
+COVER_CELLS = 16
+# Upper bound on the clusters returned for one viewport
+CLUSTER_CELLS = 64
+NEARBY_RADIUS_KM = 50
+NEARBY_MAX_RADIUS_KM = 500
+NEARBY_LIMIT = 20
+NEARBY_MAX_LIMIT = 100
+# Points ranked by distance per request; the newest win when there are more
+NEARBY_CANDIDATES = 2000
+
+
+def max_markers() -> int:
+    return getattr(settings, 'MAP_MAX_MARKERS', 200)
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return ' '.join(text.casefold().replace('-', ' ').split())
+
+
+_COUNTRY_NAMES = {
+    **{_normalize(name): code for code, (name, _, _) in COUNTRIES.items()},
+    **{_normalize(alias): code for alias, code in COUNTRY_ALIASES.items()},
+}
+_PLACES = {}
+for _name, _code, _lat, _lon in PLACES:
+    _PLACES.setdefault(_normalize(_name), []).append((_code, _lat, _lon))
+
+
+@lru_cache(maxsize=4096)
+def geocode(location_name):
+    """
+    (latitude, longitude) for a "Place, Country" string, or None. A known
+    place wins (checked against the country when one is named), then the
+    country's centre.
+    """
+    parts = [_normalize(part) for part in location_name.split(',')]
+    parts = [part for part in parts if part]
+    country = next((_COUNTRY_NAMES[part] for part in reversed(parts) if part in _COUNTRY_NAMES), None)
+    for part in parts:
+        for code, latitude, longitude in _PLACES.get(part, ()):
+            if country is None or code == country:
+                return latitude, longitude
+    if country:
+        _, latitude, longitude = COUNTRIES[country]
+        return latitude, longitude
+    return None
+
+
+def locate(post) -> bool:
+    """Sets the post's coordinates and geohash from its location_name."""
+    point = geocode(post.location_name or '')
+    if point is None:
+        post.latitude = post.longitude = None
+        post.geohash = ''
+        return False
+    post.latitude, post.longitude = point
+    post.geohash = encode(*point)
+    return True
+
+
+def encode(latitude, longitude, length=GEOHASH_LENGTH) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, value, bits, even = [], 0, 0, True
+    while len(chars) < length:
+        # Bits alternate between longitude and latitude, longitude first
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if coordinate >= middle:
+            value = value * 2 + 1
+            interval[0] = middle
+        else:
+            value *= 2
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            value = bits = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180 / 2 ** lat_bits, 360 / 2 ** lon_bits
+
+
+def _grid(box, precision):
+    south, west, north, east = box
+    height, width = cell_size(precision)
+    rows = range(int((south + 90) // height), min(int((north + 90) // height), round(180 / height) - 1) + 1)
+    cols = range(int((west + 180) // width), min(int((east + 180) // width), round(360 / width) - 1) + 1)
+    return rows, cols
+
+
+def precision_for(box, max_cells) -> int:
+    """The longest geohash length whose cells cover `box` with at most max_cells of them."""
+    precision = 0
+    while precision < GEOHASH_LENGTH:
+        rows, cols = _grid(box, precision + 1)
+        if len(rows) * len(cols) > max_cells:
+            break
+        precision += 1
+    return precision
+
+
+def cover(box, max_cells=COVER_CELLS) -> list:
+    """Geohash prefixes whose cells contain `box`; empty when it spans most of the world."""
+    precision = precision_for(box, max_cells)
+    if not precision:
+        return []
+    height, width = cell_size(precision)
+    rows, cols = _grid(box, precision)
+    return [
+        encode(-90 + (row + 0.5) * height, -180 + (col + 0.5) * width, precision)
+        for row in rows for col in cols
+    ]
+
+
+def boxes(south, west, north, east) -> list:
+    """Splits a box crossing the antimeridian (west > east) in two."""
+    if west <= east:
+        return [(south, west, north, east)]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def parse_bbox(value):
+    """Leaflet's toBBoxString() order: west,south,east,north."""
+    try:
+        west, south, east, north = (float(part) for part in value.split(','))
+    except ValueError:
+        raise HttpError(400, "bbox must be west,south,east,north")
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise HttpError(400, "bbox is out of range")
+    return south, west, north, east
+
+
+def within(queryset, areas):
+    """Rows inside any of the boxes: prefix lookups first, then the exact bounds."""
+    match = Q()
+    for box in areas:
+        south, west, north, east = box
+        cells = Q()
+        for prefix in cover(box):
+            cells |= Q(geohash__startswith=prefix)
+        match |= cells & Q(latitude__range=(south, north), longitude__range=(west, east))
+    return queryset.filter(match)
+
+
+def haversine(lat1, lon1, lat2, lon2) -> float:
+    """Great-circle distance in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def viewport(bbox: str, limit: int = None) -> dict:
+    """
+    Published posts inside a map viewport, newest first. When more than
+    `limit` (MAP_MAX_MARKERS at most) fall inside, per-cell clusters come
+    back instead.
+    """
+    limit = max(1, min(limit or max_markers(), max_markers()))
+    areas = boxes(*parse_bbox(bbox))
+    posts = within(Post.objects.filter(is_published=True), areas)
+    rows = list(post_list_rows(posts).order_by('-created_at', '-id')[:limit + 1])
+    if len(rows) <= limit:
+        return {"clustered": False, "posts": serialize_post_list(rows), "clusters": []}
+
+    precision = max(1, min(precision_for(box, CLUSTER_CELLS) for box in areas))
+    cells = (
+        posts
+            .annotate(cell=Substr('geohash', 1, precision))
+            .values('cell')
+            .annotate(
+                count=Count('id'), lat=Avg('latitude'), lon=Avg('longitude'),
+                south=Min('latitude'), west=Min('longitude'), north=Max('latitude'), east=Max('longitude'),
+            )
+            .order_by('cell')
+    )
+    clusters = [
+        {
+            "geohash": cell['cell'],
+            "count": cell['count'],
+            "latitude": round(cell['lat'], 6),
+            "longitude": round(cell['lon'], 6),
+            "bounds": [cell['west'], cell['south'], cell['east'], cell['north']],
+        }
+        for cell in cells
+    ]
+    return {"clustered": True, "posts": [], "clusters": clusters}
+
+
+def nearby(latitude, longitude, radius_km=None, limit=None, exclude=None) -> list:
+    """Published posts within radius_km of a point, closest (then newest) first."""
+    radius_km = min(radius_km or NEARBY_RADIUS_KM, NEARBY_MAX_RADIUS_KM)
+    limit = max(1, min(limit or NEARBY_LIMIT, NEARBY_MAX_LIMIT))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius_km <= 0:
+        raise HttpError(400, "lat, lon or radius_km is out of range")
+
+    d_lat = radius_km / KM_PER_DEGREE
+    south, north = max(-90.0, latitude - d_lat), min(90.0, latitude + d_lat)
+    d_lon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    if d_lon >= 180 or north == 90 or south == -90:
+        areas = [(south, -180.0, north, 180.0)]
+    else:
+        west, east = ((value + 180) % 360 - 180 for value in (longitude - d_lon, longitude + d_lon))
+        areas = boxes(south, west, north, east)
+
+    posts = within(Post.objects.filter(is_published=True), areas)
+    if exclude:
+        posts = posts.exclude(pk=exclude)
+    candidates = posts.order_by('-created_at', '-id').values_list('id', 'latitude', 'longitude')
+    distances = {}
+    for post_id, lat, lon in candidates[:NEARBY_CANDIDATES]:
+        distance = haversine(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            distances[post_id] = distance
+    # sorted() is stable, so equal distances stay newest first
+    closest = sorted(distances, key=distances.get)[:limit]
+
+    rows = {row['id']: row for row in post_list_rows(Post.objects.filter(id__in=closest))}
+    items = serialize_post_list(rows[post_id] for post_id in closest if post_id in rows)
+    for item in items:
+        item['distance_km'] = round(distances[item['id']], 2)
+    return items
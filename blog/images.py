@@ -0,0 +1,198 @@
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, JpegImagePlugin, UnidentifiedImageError
+
+from .cache import invalidate_post
+from .jobs import enqueue
+from .models import Post, PostBlock
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = 'variants'
+
+# name -> longest edge in pixels
+VARIANT_SIZES = getattr(settings, 'IMAGE_VARIANT_SIZES', {
+    'thumb': 400,
+    'medium': 1024,
+    'large': 2048,
+})
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# image field -> JSON field holding its metadata and variants
+META_FIELDS = {
+    'cover_image': 'cover_image_meta',
+    'image_content': 'image_meta',
+    'avatar': 'avatar_meta',
+}
+
+def strip_metadata(content):
+    """
+    Returns a re-encoded copy of an uploaded image without its EXIF and XMP
+    (GPS position, camera, capture time), with the EXIF orientation applied
+    to the pixels, or None when there is nothing to strip or it isn't an
+    image Pillow can rewrite. JPEGs keep their quantization tables and
+    subsampling, and every format keeps its ICC profile.
+    """
+    try:
+        content.seek(0)
+        with Image.open(content) as image:
+            has_metadata = image.getexif() or 'xmp' in image.info or 'XML:com.adobe.xmp' in image.info
+            # Animated images would lose every frame but the first
+            if not has_metadata or (image.format != 'MPO' and getattr(image, 'n_frames', 1) > 1):
+                return None
+            fmt = 'JPEG' if image.format == 'MPO' else image.format
+            options = {}
+            if image.info.get('icc_profile'):
+                options['icc_profile'] = image.info['icc_profile']
+            if fmt == 'JPEG':
+                options['qtables'] = image.quantization
+                sampling = JpegImagePlugin.get_sampling(image)
+                if sampling != -1:
+                    options['subsampling'] = sampling
+            image = ImageOps.exif_transpose(image)
+            buffer = io.BytesIO()
+            image.save(buffer, fmt, **options)
+    except (UnidentifiedImageError, OSError, ValueError, SyntaxError):
+        return None
+    finally:
+        content.seek(0)
+    return ContentFile(buffer.getvalue())
+
+
+def build_variants(field_file) -> dict:
+    """
+    Renders every size in VARIANT_SIZES as WebP and JPEG next to the
+    original, with EXIF orientation applied and all metadata dropped.
+    Returns the dict stored in the model's *_meta field.
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as fh:
+        image = Image.open(fh)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    width, height = image.size
+    stem = os.path.splitext(field_file.name)[0]
+    variants = []
+    rendered = set()
+    for name, edge in VARIANT_SIZES.items():
+        scale = min(1.0, edge / max(width, height))
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if size in rendered:
+            continue
+        rendered.add(size)
+        resized = image.resize(size, Image.LANCZOS) if size != image.size else image
+        for ext, (fmt, options) in VARIANT_FORMATS.items():
+            frame = resized.convert('RGB') if fmt == 'JPEG' else resized
+            buffer = io.BytesIO()
+            frame.save(buffer, fmt, **options)
+            path = storage.save(f'{VARIANT_DIR}/{stem}/{name}.{ext}', ContentFile(buffer.getvalue()))
+            variants.append({
+                "name": name, "format": ext, "path": path,
+                "width": size[0], "height": size[1],
+            })
+
+    return {"source": field_file.name, "width": width, "height": height, "variants": variants}
+
+
+def render_image(model, pk, field_name):
+    """
+    Renders the variants of one image field and stores them, unless the
+    row has moved on to a different file in the meantime.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    field_file = getattr(instance, field_name, None) if instance else None
+    if not field_file:
+        return
+    meta = build_variants(field_file)
+    updates = {META_FIELDS[field_name]: meta}
+    if not isinstance(instance, PostBlock):
+        updates['updated_at'] = timezone.now()
+    if not model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**updates):
+        return
+    if isinstance(instance, PostBlock):
+        Post.objects.filter(pk=instance.post_id).update(updated_at=timezone.now())
+        invalidate_post(instance.post.slug)
+    elif isinstance(instance, Post):
+        invalidate_post(instance.slug)
+
+
+def strip_original(model, pk, field_name) -> bool:
+    """
+    Re-saves an original stored before uploads were stripped, so storage
+    drops its metadata. Returns True if the row now points at a new file;
+    its variants are then stale and get re-rendered.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    field_file = getattr(instance, field_name, None) if instance else None
+    if not field_file:
+        return False
+    with field_file.open('rb'):
+        name = field_file.storage.save(field_file.name, field_file)
+    if name == field_file.name:
+        return False
+    updates = {field_name: name}
+    if not isinstance(instance, PostBlock):
+        updates['updated_at'] = timezone.now()
+    return bool(model.objects.filter(pk=pk, **{field_name: field_file.name}).update(**updates))
+
+
+def process_image(model, pk, field_name):
+    """render_image that logs failures instead of raising them."""
+    try:
+        render_image(model, pk, field_name)
+    except Exception:
+        logger.exception("Could not build image variants for %s %s", model.__name__, pk)
+
+
+def render_image_job(model_label, pk, field_name):
+    """Job entry point; failures propagate so the worker retries them."""
+    render_image(apps.get_model(model_label), pk, field_name)
+
+
+def queue_variants(instance, field_name):
+    """
+    Queues variant rendering for a freshly saved image as a background job,
+    keeping Pillow work off the request path.
+    """
+    field_file = getattr(instance, field_name)
+    meta = getattr(instance, META_FIELDS[field_name]) or {}
+    if not field_file or meta.get('source') == field_file.name:
+        return
+    label = instance._meta.label
+    enqueue(
+        'blog.images.render_image_job', label, instance.pk, field_name,
+        dedup_key=f'variants:{label}:{instance.pk}:{field_name}',
+    )
+
+
+def variant_urls(meta, storage, url=None):
+    """
+    Turns stored variant paths into public URLs for the API schemas.
+    `url` replaces `storage.url` when the caller has a cheaper equivalent.
+    """
+    if not meta or not meta.get('variants'):
+        return None
+    url = url or storage.url
+    return {
+        "width": meta['width'],
+        "height": meta['height'],
+        "variants": [
+            {
+                "name": v['name'], "format": v['format'], "url": url(v['path']),
+                "width": v['width'], "height": v['height'],
+            }
+            for v in meta['variants']
+        ],
+    }
@@ -0,0 +1,133 @@
+"""
+Background jobs without a broker. A job is a row naming a function by its
+dotted path; it is inserted once the enqueuing transaction commits and run
+by `manage.py run_workers`. Workers claim ready rows with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can share the
+table. A failing job is retried with exponential backoff until it runs out
+of attempts, and a job whose worker died is picked up again after
+JOB_TIMEOUT seconds.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue(task, *args, dedup_key=None, delay=0, max_attempts=None):
+    """
+    Queues `task(*args)` to run once the current transaction commits, or
+    straight away outside one. `args` must be JSON-serialisable. Nothing is
+    added while a job with the same `dedup_key` is still waiting to run.
+    """
+    import_string(task)  # fail in the caller, not in a worker later
+    job = Job(
+        task=task, args=list(args), dedup_key=dedup_key,
+        max_attempts=max_attempts or _setting('JOB_MAX_ATTEMPTS', 5),
+    )
+
+    def insert():
+        job.run_after = timezone.now() + timedelta(seconds=delay)
+        # The partial unique index on queued dedup keys turns a duplicate
+        # into a no-op
+        Job.objects.bulk_create([job], ignore_conflicts=True)
+    transaction.on_commit(insert)
+
+
+def backoff(attempts) -> float:
+    """Seconds to wait before retry number `attempts`, with jitter."""
+    delay = min(
+        _setting('JOB_BACKOFF_SECONDS', 10) * 2 ** (attempts - 1),
+        _setting('JOB_BACKOFF_MAX_SECONDS', 3600),
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+def claim(worker, limit):
+    """Marks up to `limit` ready jobs as running on `worker` and returns them."""
+    now = timezone.now()
+    stale = Q(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=_setting('JOB_TIMEOUT', 600)))
+    # A job that keeps killing its worker doesn't get reclaimed forever
+    Job.objects.filter(stale, attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=now, last_error="Timed out",
+    )
+    with transaction.atomic():
+        ids = list(
+            Job.objects
+                .select_for_update(skip_locked=True)
+                .filter(Q(status=Job.QUEUED, run_after__lte=now) | stale)
+                .order_by('run_after', 'id')
+                .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(id__in=ids, locked_by=worker).order_by('run_after', 'id'))
+
+
+def run_job(job) -> bool:
+    """Runs one claimed job and records the outcome; True if it succeeded."""
+    # Only the claim that is still current may record the outcome
+    current = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by, locked_at=job.locked_at)
+    try:
+        import_string(job.task)(*job.args)
+    except Exception as error:
+        message = ''.join(traceback.format_exception(error))
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s %s failed for good: %s", job.pk, job.task, error)
+            current.update(status=Job.FAILED, finished_at=timezone.now(), last_error=message)
+            return False
+        delay = backoff(job.attempts)
+        logger.warning("Job %s %s failed (attempt %s), retrying in %.0fs: %s",
+                       job.pk, job.task, job.attempts, delay, error)
+        try:
+            with transaction.atomic():
+                current.update(
+                    status=Job.QUEUED, run_after=timezone.now() + timedelta(seconds=delay), last_error=message,
+                )
+        except IntegrityError:
+            # The same work was queued again meanwhile; that job covers it
+            current.delete()
+        return False
+    current.update(status=Job.DONE, finished_at=timezone.now(), last_error='')
+    return True
+
+
+def prune_jobs(days=None) -> int:
+    """Deletes finished jobs older than JOB_RETENTION_DAYS; failed ones are kept."""
+    cutoff = timezone.now() - timedelta(days=days or _setting('JOB_RETENTION_DAYS', 7))
+    deleted, _ = Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def job_stats() -> dict:
+    """Job counts per task and status, and how long the oldest ready job has waited."""
+    totals = dict.fromkeys((Job.QUEUED, Job.RUNNING, Job.DONE, Job.FAILED), 0)
+    tasks = {}
+    oldest = None
+    for row in Job.objects.values('task', 'status').annotate(count=Count('id'), oldest=Min('run_after')):
+        totals[row['status']] += row['count']
+        tasks.setdefault(row['task'], dict.fromkeys(totals, 0))[row['status']] = row['count']
+        if row['status'] == Job.QUEUED and (oldest is None or row['oldest'] < oldest):
+            oldest = row['oldest']
+    lag = (timezone.now() - oldest).total_seconds() if oldest else 0
+    return {
+        **totals,
+        "queue_lag_seconds": round(max(lag, 0), 3),
+        "tasks": tasks,
+    }
@@ -0,0 +1,134 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest
+
+from .iso3166 import ALPHA3
+from .models import CountryPopularity, Profile, TravelerBucket, VisitedCountry
+
+
+def record_visits(old_count, new_count, added=(), removed=()):
+    """
+    Applies one user's visited-country change to both ranking tables.
+    Must run in the same transaction (and under the same profile lock)
+    as the VisitedCountry write.
+    """
+    if old_count != new_count:
+        if old_count > 0:
+            TravelerBucket.objects.filter(countries_count=old_count).update(
+                users=Greatest(F('users') - 1, Value(0))
+            )
+        if new_count > 0:
+            TravelerBucket.objects.filter(countries_count=new_count).update(users=F('users') + 1)
+    if added:
+        CountryPopularity.objects.filter(country_code__in=added).update(visitors=F('visitors') + 1)
+    if removed:
+        CountryPopularity.objects.filter(country_code__in=removed).update(
+            visitors=Greatest(F('visitors') - 1, Value(0))
+        )
+
+
+def top_travelers(limit):
+    """Best-travelled users with their competition rank (ties share a rank)."""
+    profiles = list(
+        Profile.objects
+            .filter(countries_count__gt=0)
+            .select_related('user')
+            .order_by('-countries_count', 'user_id')[:limit]
+    )
+    ranks = _traveler_ranks()
+    return [
+        {"rank": ranks[p.countries_count], "username": p.user.username,
+         "countries_count": p.countries_count}
+        for p in profiles
+    ]
+
+
+def traveler_rank(countries_count):
+    """1 + number of users who have visited more countries."""
+    ahead = (
+        TravelerBucket.objects
+            .filter(countries_count__gt=countries_count)
+            .aggregate(total=Sum('users'))['total']
+    )
+    return (ahead or 0) + 1
+
+
+def _traveler_ranks():
+    # The histogram has at most one row per possible count (~250), so a
+    # single pass yields the rank of every count at once.
+    ranks, ahead = {}, 0
+    buckets = TravelerBucket.objects.filter(users__gt=0).order_by('-countries_count')
+    for count, users in buckets.values_list('countries_count', 'users'):
+        ranks[count] = ahead + 1
+        ahead += users
+    return ranks
+
+
+def top_countries(limit):
+    rows = (
+        CountryPopularity.objects
+            .filter(visitors__gt=0)
+            .order_by('-visitors', 'country_code')
+            .values_list('country_code', 'visitors')[:limit]
+    )
+    result, rank, previous = [], 0, None
+    for position, (code, visitors) in enumerate(rows, start=1):
+        if visitors != previous:
+            rank, previous = position, visitors
+        result.append({"rank": rank, "country_code": code, "visitors": visitors})
+    return result
+
+
+def country_rank(country_code):
+    popularity = CountryPopularity.objects.filter(country_code=country_code).first()
+    visitors = popularity.visitors if popularity else 0
+    ahead = CountryPopularity.objects.filter(visitors__gt=visitors).count()
+    return {"rank": ahead + 1, "country_code": country_code, "visitors": visitors}
+
+
+def rebuild_leaderboards():
+    """
+    Recomputes both ranking tables from VisitedCountry/Profile. Meant to run
+    periodically (see `manage.py rebuild_leaderboards`) to repair any drift
+    from the incremental updates.
+    """
+    with transaction.atomic():
+        _lock_rankings()
+        # Read under the lock: a visit committed before it is counted here,
+        # and one still in flight applies its delta on top of the rebuild
+        visitors = dict(
+            VisitedCountry.objects
+                .values('country_code')
+                .annotate(total=Count('id'))
+                .values_list('country_code', 'total')
+        )
+        buckets = dict(
+            Profile.objects
+                .filter(countries_count__gt=0)
+                .values('countries_count')
+                .annotate(total=Count('id'))
+                .values_list('countries_count', 'total')
+        )
+        CountryPopularity.objects.all().delete()
+        CountryPopularity.objects.bulk_create(
+            CountryPopularity(country_code=code, visitors=visitors.get(code, 0)) for code in ALPHA3
+        )
+        TravelerBucket.objects.all().delete()
+        TravelerBucket.objects.bulk_create(
+            TravelerBucket(countries_count=count, users=buckets.get(count, 0))
+            for count in range(1, max([len(ALPHA3), *buckets]) + 1)
+        )
+
+
+def _lock_rankings():
+    # EXCLUSIVE still lets readers through but makes record_visits wait
+    # until the rebuild commits. Locked in the order record_visits writes
+    # them, so a visit already holding a bucket row finishes first instead
+    # of deadlocking.
+    if connection.vendor != 'postgresql':
+        return
+    tables = ', '.join(
+        connection.ops.quote_name(model._meta.db_table) for model in (TravelerBucket, CountryPopularity)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {tables} IN EXCLUSIVE MODE')
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.bench import compare, run_bench
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks every API route (p50/p95/p99 latency, throughput, SQL queries) "
+        "and stores the report as JSON. Seed data first with seed_bench."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100, help="Measured requests per route.")
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--url', help="Benchmark a running server instead of the in-process client (reads only).")
+        parser.add_argument('--only', nargs='+', metavar='SCENARIO', help="Run just these scenarios.")
+        parser.add_argument('--reads-only', action='store_true', help="Skip the (rolled back) write routes.")
+        parser.add_argument('--output', default='bench-results.json', help="Where to write the JSON report.")
+        parser.add_argument('--compare', metavar='BASELINE', help="Earlier report to check for regressions.")
+        parser.add_argument('--threshold', type=float, default=0.2, help="Allowed p95 slowdown, as a fraction.")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_bench(
+                iterations=options['iterations'], warmup=options['warmup'], base_url=options['url'],
+                only=options['only'], include_writes=not options['reads_only'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{'scenario':24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'queries':>9}{'errors':>8}"
+        )
+        for name, r in report['results'].items():
+            self.stdout.write(
+                f"{name:24}{r['p50_ms']!s:>9}{r['p95_ms']!s:>9}{r['p99_ms']!s:>9}"
+                f"{r['throughput_rps']!s:>9}{r['queries_mean']!s:>9}{r['errors']:>8}"
+            )
+        if report['uncovered']:
+            self.stderr.write("No scenario for: " + ', '.join(report['uncovered']))
+
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"Report written to {options['output']}")
+
+        if options['compare']:
+            baseline = json.loads(Path(options['compare']).read_text())
+            regressions = compare(report, baseline, options['threshold'])
+            for line in regressions:
+                self.stderr.write(f"REGRESSION {line}")
+            if not regressions:
+                self.stdout.write(f"No regressions against {options['compare']}")
+            elif options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from ninja_jwt.authentication import JWTAuth
+from ninja_jwt.tokens import AccessToken
+
+from blog.auth import CachedJWTAuth, user_cache
+
+
+class Command(BaseCommand):
+    help = "Measures per-request authentication overhead of JWTAuth against CachedJWTAuth."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        # Runs against a throwaway user inside a transaction that is rolled back
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench-auth-user', password='unused')
+            token = str(AccessToken.for_user(user))
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+            user_cache.clear()
+
+            for name, auth in (('JWTAuth', JWTAuth()), ('CachedJWTAuth', CachedJWTAuth())):
+                auth(request)  # warm-up: token class import, first cache fill
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for _ in range(count):
+                        auth(request)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{name:14} {elapsed / count * 1e6:8.1f} us/request  "
+                    f"{len(queries) / count:5.2f} queries/request"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,52 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from ninja.responses import NinjaJSONEncoder
+
+from blog.listing import post_list_rows, serialize_post_list
+from blog.models import Post
+from blog.schemas import PostListSchema
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares serializing post lists through model instances and PostListSchema "
+        "against the .values() projection path. Run seed_bench first for enough rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=5, help="Best of this many runs is reported")
+
+    def handle(self, *args, **options):
+        posts = Post.objects.filter(is_published=True).order_by('-created_at', '-id')
+        available = posts.count()
+        for rows in options['rows']:
+            if rows > available:
+                raise CommandError(f"Only {available} published posts; run seed_bench --posts {rows}")
+
+            def schema_path():
+                instances = posts.select_related('author')[:rows]
+                return json.dumps([PostListSchema.from_orm(post).model_dump() for post in instances],
+                                  cls=NinjaJSONEncoder)
+
+            def projection_path():
+                return json.dumps(serialize_post_list(post_list_rows(posts)[:rows]), cls=NinjaJSONEncoder)
+
+            if schema_path() != projection_path():
+                raise CommandError("Projection output differs from PostListSchema")
+
+            timings = {}
+            for name, path in (('schema', schema_path), ('projection', projection_path)):
+                best = None
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    path()
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = best
+                self.stdout.write(
+                    f"{rows:6} rows  {name:10} {best * 1000:9.1f} ms  {best / rows * 1e6:7.1f} us/row"
+                )
+            self.stdout.write(f"{rows:6} rows  speedup    {timings['schema'] / timings['projection']:9.1f}x")
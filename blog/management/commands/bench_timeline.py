@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from blog.bench import percentile
+from blog.models import Follow, Post, Profile
+from blog.timeline import fan_out, timeline_page
+
+
+class Command(BaseCommand):
+    help = (
+        "Times publishing a post (timeline fan-out) and reading a follower's home "
+        "timeline for authors with different follower counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--followers', type=int, nargs='+', default=[10, 1000, 100000])
+        parser.add_argument('--posts', type=int, default=20, help="Posts published per author")
+        parser.add_argument('--reads', type=int, default=50)
+        parser.add_argument('--threshold', type=int, default=None,
+                            help="Override TIMELINE_CELEBRITY_FOLLOWERS for this run")
+
+    def handle(self, *args, **options):
+        threshold = options['threshold'] or settings.TIMELINE_CELEBRITY_FOLLOWERS
+        with override_settings(TIMELINE_CELEBRITY_FOLLOWERS=threshold):
+            for count in options['followers']:
+                self._run(count, options['posts'], options['reads'], threshold)
+
+    def _run(self, count, posts, reads, threshold):
+        # Everything is created in a transaction that is rolled back
+        with transaction.atomic():
+            password = make_password(None)
+            author = User.objects.create(username='bench-timeline-author', password=password)
+            Profile.objects.create(user=author, followers_count=count)
+            User.objects.bulk_create(
+                [User(username=f'bench-timeline-{n:06d}', password=password) for n in range(count)],
+                batch_size=5000,
+            )
+            followers = User.objects.filter(username__startswith='bench-timeline-0')
+            Follow.objects.bulk_create(
+                [Follow(follower_id=user_id, followee=author)
+                 for user_id in followers.values_list('id', flat=True).iterator(chunk_size=5000)],
+                batch_size=5000,
+            )
+
+            writes = []
+            for n in range(posts):
+                post = Post.objects.create(
+                    author=author, title=f'Timeline bench {n}', slug=f'bench-timeline-{n}',
+                    location_name='Lisbon, Portugal', is_published=True,
+                )
+                started = time.perf_counter()
+                fan_out(post)
+                writes.append(time.perf_counter() - started)
+
+            reader = followers.first()
+            latencies = []
+            for _ in range(reads):
+                started = time.perf_counter()
+                page = timeline_page(reader, limit=20)
+                latencies.append(time.perf_counter() - started)
+            assert len(page['items']) == min(posts, 20)
+            transaction.set_rollback(True)
+
+        writes.sort()
+        latencies.sort()
+        mode = 'on read' if count >= threshold else 'on write'
+        self.stdout.write(
+            f"{count:7} followers  fan-out {mode:8}  "
+            f"publish p50 {percentile(writes, 50):8.2f} ms  "
+            f"timeline p50 {percentile(latencies, 50):6.2f} ms  p95 {percentile(latencies, 95):6.2f} ms"
+        )
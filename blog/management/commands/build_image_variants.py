@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import META_FIELDS, process_image, strip_original
+from blog.models import Post, PostBlock, Profile
+
+
+class Command(BaseCommand):
+    help = "Renders missing or outdated image variants for covers, story photos and avatars."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Re-render every image, not only stale ones.")
+        parser.add_argument('--strip-originals', action='store_true',
+                            help="First remove EXIF/XMP from originals stored before uploads were stripped.")
+
+    def handle(self, *args, **options):
+        for model, field_name in ((Post, 'cover_image'), (PostBlock, 'image_content'), (Profile, 'avatar')):
+            meta_field = META_FIELDS[field_name]
+            rows = (
+                model.objects
+                    .exclude(**{f'{field_name}__isnull': True})
+                    .exclude(**{field_name: ''})
+                    .values_list('pk', field_name, meta_field)
+            )
+            rendered = stripped = 0
+            for pk, name, meta in rows.iterator():
+                if options['strip_originals'] and strip_original(model, pk, field_name):
+                    stripped += 1
+                    meta = None
+                if not options['force'] and (meta or {}).get('source') == name:
+                    continue
+                process_image(model, pk, field_name)
+                rendered += 1
+            self.stdout.write(f"{model.__name__}.{field_name}: {stripped} stripped, {rendered} rendered")
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.bench import percentile
+
+# Unauthenticated endpoint whose body is parsed, so the server has to wait
+# for the whole upload before it can answer
+SLOW_UPLOAD_PATH = '/api/register'
+SLOW_UPLOAD_SIZE = 64 * 1024
+
+
+async def _get(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def _slow_upload(host, port, delay, stop):
+    """
+    Sends a request body one small chunk at a time, like a phone on a bad
+    connection, and reconnects until the run is over.
+    """
+    while not stop.is_set():
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            await asyncio.sleep(delay)
+            continue
+        try:
+            writer.write(
+                f'POST {SLOW_UPLOAD_PATH} HTTP/1.1\r\nHost: {host}\r\n'
+                f'Content-Type: application/json\r\n'
+                f'Content-Length: {SLOW_UPLOAD_SIZE}\r\nConnection: close\r\n\r\n'.encode()
+            )
+            sent = 0
+            while sent < SLOW_UPLOAD_SIZE and not stop.is_set():
+                writer.write(b' ' * 64)
+                await writer.drain()
+                sent += 64
+                await asyncio.sleep(delay)
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _reader(host, port, path, timeout, stop, latencies, errors):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(_get(host, port, path), timeout)
+        except (OSError, asyncio.TimeoutError):
+            errors.append(None)
+            await asyncio.sleep(0.05)
+            continue
+        if status == 200:
+            latencies.append(time.perf_counter() - started)
+        else:
+            errors.append(status)
+
+
+async def _run(url, path, readers, slow_clients, delay, duration):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    stop = asyncio.Event()
+    latencies, errors = [], []
+    tasks = [
+        asyncio.create_task(_slow_upload(host, port, delay, stop)) for _ in range(slow_clients)
+    ]
+    # Let the slow uploads take their connections before measuring reads
+    await asyncio.sleep(min(1.0, duration / 4))
+    started = time.perf_counter()
+    tasks += [
+        asyncio.create_task(_reader(host, port, path, duration / 2, stop, latencies, errors))
+        for _ in range(readers)
+    ]
+    await asyncio.sleep(duration)
+    stop.set()
+    elapsed = time.perf_counter() - started
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares read throughput and tail latency of running deployments (e.g. the "
+        "WSGI and ASGI server profiles) while slow clients trickle uploads at them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', metavar='NAME=URL',
+            help="Deployment to measure; repeat per server. "
+                 "Defaults to wsgi=http://127.0.0.1:8001 and asgi=http://127.0.0.1:8002.",
+        )
+        parser.add_argument('--path', default='/api/posts', help="Read endpoint to hammer.")
+        parser.add_argument('--readers', type=int, default=20, help="Concurrent readers.")
+        parser.add_argument('--slow-clients', type=int, default=8, help="Concurrent slow uploads.")
+        parser.add_argument('--delay', type=float, default=0.5, help="Seconds between upload chunks.")
+        parser.add_argument('--duration', type=float, default=15.0, help="Measured seconds per target.")
+        parser.add_argument('--json', action='store_true', help="Print the results as JSON.")
+
+    def handle(self, *args, **options):
+        targets = options['target'] or [
+            'wsgi=http://127.0.0.1:8001', 'asgi=http://127.0.0.1:8002',
+        ]
+        results = {}
+        for target in targets:
+            name, sep, url = target.partition('=')
+            if not sep or not url:
+                raise CommandError(f"Expected NAME=URL, got {target!r}")
+            self.stderr.write(f"Measuring {name} at {url}...")
+            results[name] = asyncio.run(_run(
+                url, options['path'], options['readers'], options['slow_clients'],
+                options['delay'], options['duration'],
+            ))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        columns = ['requests', 'errors', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms']
+        self.stdout.write(f"{'':16}" + ''.join(f"{name:>14}" for name in results))
+        for column in columns:
+            self.stdout.write(
+                f"{column:16}" + ''.join(f"{str(r[column]):>14}" for r in results.values())
+            )
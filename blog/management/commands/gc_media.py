@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from blog.media_gc import sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes files under MEDIA_ROOT that no post, block or profile references, "
+        "resuming from where the previous run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100000,
+                            help="Files to examine in this run (0 for the whole tree)")
+        parser.add_argument('--grace', type=int, default=None,
+                            help="Leave files younger than this many seconds (default MEDIA_GC_GRACE_SECONDS)")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be deleted, delete nothing")
+        parser.add_argument('--restart', action='store_true', help="Start again from the top of MEDIA_ROOT")
+
+    def handle(self, *args, **options):
+        report = sweep(
+            limit=options['limit'] or None, grace=options['grace'],
+            dry_run=options['dry_run'], restart=options['restart'],
+        )
+        if options['verbosity'] > 1:
+            for path in report['orphans']:
+                self.stdout.write(f"  {path}")
+        for area, totals in sorted(report['areas'].items()):
+            self.stdout.write(f"{area:<12} {totals['files']:>8} files  {filesizeformat(totals['bytes']):>10}")
+        summary = (
+            f"Scanned {report['scanned']} files ({report['recent']} within the grace period): "
+            f"{len(report['orphans'])} orphaned, "
+        )
+        if report['dry_run']:
+            summary += f"{filesizeformat(report['bytes'])} reclaimable (dry run)"
+        else:
+            summary += f"{report['removed']} deleted, {filesizeformat(report['removed_bytes'])} reclaimed"
+        self.stdout.write(summary)
+        if not report['complete']:
+            self.stdout.write("Stopped at the file limit; the next run resumes from there")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import invalidate_post
+from blog.geo import locate
+from blog.models import Post
+
+GEO_FIELDS = ['latitude', 'longitude', 'geohash']
+
+
+class Command(BaseCommand):
+    help = "Resolves post coordinates and geohashes from location_name with the bundled gazetteer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--force', action='store_true', help="Re-geocode posts that already have a geohash.")
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('id').only('id', 'slug', 'location_name', *GEO_FIELDS)
+        if not options['force']:
+            posts = posts.filter(geohash='')
+
+        last_id, total, located = 0, 0, 0
+        while True:
+            batch = list(posts.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            changed = []
+            for post in batch:
+                before = (post.latitude, post.longitude, post.geohash)
+                located += locate(post)
+                if (post.latitude, post.longitude, post.geohash) != before:
+                    changed.append(post)
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, GEO_FIELDS)
+            for post in changed:
+                invalidate_post(post.slug)
+            last_id = batch[-1].id
+            total += len(batch)
+            self.stdout.write(f"Geocoded {total} posts...")
+        self.stdout.write(f"Done: {located} of {total} posts placed on the map")
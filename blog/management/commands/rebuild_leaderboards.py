@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Recomputes the traveler and country rankings. Schedule it from cron (e.g. nightly) to repair drift."
+
+    def handle(self, *args, **options):
+        rebuild_leaderboards()
+        self.stdout.write("Leaderboards rebuilt")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import index_post
+
+
+class Command(BaseCommand):
+    help = "Re-indexes every post for full-text search (e.g. after the first deploy)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        indexed = 0
+        for post in Post.objects.only('id', 'title', 'location_name').iterator(chunk_size=options['batch_size']):
+            index_post(post)
+            indexed += 1
+        self.stdout.write(f"Indexed {indexed} posts")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import reconcile_bitmaps, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes stories_count, countries_count and visited_bitmap on every profile to repair drift."
+
+    def handle(self, *args, **options):
+        drifted = reconcile_counters()
+        self.stdout.write(f"Reconciled profile counters ({drifted} had drifted)")
+        stale = reconcile_bitmaps()
+        self.stdout.write(f"Rebuilt {stale} visited-country bitmaps")
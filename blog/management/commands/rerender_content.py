@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import invalidate_post
+from blog.content import CONTENT_VERSION, SUMMARY_FIELDS, rerender_post
+from blog.models import Post, PostBlock
+
+
+class Command(BaseCommand):
+    help = "Re-sanitizes stored text blocks and recomputes post summaries rendered by an older pipeline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help="Re-render posts already at the current version.")
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('id').prefetch_related('blocks')
+        if not options['force']:
+            posts = posts.filter(content_version__lt=CONTENT_VERSION)
+
+        last_id, total = 0, 0
+        while True:
+            batch = list(posts.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            changed_blocks = []
+            for post in batch:
+                changed_blocks += rerender_post(post, post.blocks.all())
+            with transaction.atomic():
+                PostBlock.objects.bulk_update(changed_blocks, ['text_content'])
+                Post.objects.bulk_update(batch, SUMMARY_FIELDS + ['updated_at'])
+            for post in batch:
+                invalidate_post(post.slug)
+            last_id = batch[-1].id
+            total += len(batch)
+            self.stdout.write(f"Re-rendered {total} posts...")
+        self.stdout.write(f"Done: {total} posts at content version {CONTENT_VERSION}")
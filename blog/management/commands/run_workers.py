@@ -0,0 +1,89 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.jobs import claim, prune_jobs, run_job
+
+# Seconds between deletions of old finished jobs
+PRUNE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background jobs. Each process claims jobs from the database "
+        "and runs them on a thread pool; stop with SIGTERM to let running jobs finish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=None,
+                            help="Jobs run at once per process (default JOB_WORKERS)")
+        parser.add_argument('--processes', type=int, default=1,
+                            help="Worker processes to start, for CPU-bound jobs")
+        parser.add_argument('--poll', type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is ready to run")
+
+    def handle(self, *args, **options):
+        threads = options['threads'] or getattr(settings, 'JOB_WORKERS', 2)
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        if options['processes'] > 1:
+            return self._supervise(options['processes'], threads, options)
+        self._work(threads, options['poll'], options['burst'])
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _supervise(self, processes, threads, options):
+        command = [
+            sys.executable, sys.argv[0], 'run_workers',
+            '--threads', str(threads), '--poll', str(options['poll']),
+        ] + (['--burst'] if options['burst'] else [])
+        children = [subprocess.Popen(command) for _ in range(processes)]
+        self.stdout.write(f"Started {processes} worker processes with {threads} threads each")
+        while any(child.poll() is None for child in children):
+            if self.stopping:
+                for child in children:
+                    if child.poll() is None:
+                        child.send_signal(signal.SIGTERM)
+                for child in children:
+                    child.wait()
+                break
+            time.sleep(0.5)
+
+    def _work(self, threads, poll, burst):
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(f"Worker {worker} running up to {threads} jobs at once")
+        running = set()
+        pruned = 0
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='jobs') as executor:
+            while not self.stopping:
+                if time.monotonic() - pruned > PRUNE_INTERVAL:
+                    prune_jobs()
+                    pruned = time.monotonic()
+                close_old_connections()
+                jobs = claim(worker, threads - len(running)) if len(running) < threads else []
+                running |= {executor.submit(self._run, job) for job in jobs}
+                if jobs:
+                    continue
+                if running:
+                    running = wait(running, timeout=poll, return_when=FIRST_COMPLETED).not_done
+                elif burst:
+                    break
+                else:
+                    time.sleep(poll)
+            # Leaving the block waits for the running jobs
+
+    def _run(self, job):
+        try:
+            run_job(job)
+        finally:
+            close_old_connections()
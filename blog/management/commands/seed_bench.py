@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from blog.seed import flush_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = "Generates a deterministic synthetic dataset (users, posts, blocks, countries) for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--blocks', type=int, default=6, help="Average blocks per post.")
+        parser.add_argument('--image-ratio', type=float, default=0.3, help="Share of image blocks and covers.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--no-index', action='store_true', help="Skip building the search index.")
+        parser.add_argument('--flush', action='store_true', help="Delete previously seeded users and their data first.")
+
+    def handle(self, *args, **options):
+        if options['flush']:
+            self.stdout.write(f"Removed {flush_dataset()} seeded users")
+        result = seed_dataset(
+            users=options['users'], posts=options['posts'], seed=options['seed'],
+            blocks=options['blocks'], image_ratio=options['image_ratio'],
+            batch_size=options['batch_size'], index=not options['no_index'],
+        )
+        self.stdout.write(
+            f"Seeded {result['users']} users, {result['posts']} posts and {result['blocks']} blocks "
+            f"(seed {options['seed']})"
+        )
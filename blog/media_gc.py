@@ -0,0 +1,179 @@
+"""
+Orphaned media collection behind `manage.py gc_media`. A file under
+MEDIA_ROOT is garbage when no Post.cover_image, PostBlock.image_content or
+Profile.avatar names it and no image lists it among its rendered
+variants. Leftover temp files under .incoming/ and the part files of
+abandoned uploads are garbage too. MEDIA_ROOT is walked in path order from
+the cursor saved in MediaSweep, so a run can stop after `limit` files and
+the next one carries on. References are checked per batch of paths with
+IN lookups, never per file.
+"""
+import os
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .images import META_FIELDS
+from .models import MediaBlob, MediaSweep, Post, PostBlock, Profile, Upload
+from .storage import INCOMING_DIR
+from .uploads import UPLOAD_DIR
+
+REFERENCES = ((Post, 'cover_image'), (PostBlock, 'image_content'), (Profile, 'avatar'))
+LOOKUP_BATCH = 500
+SWEEP_NAME = 'media'
+
+
+def _parts(path):
+    # Compared as components so the order matches the sorted directory walk
+    return path.split('/')
+
+
+def walk_media(root, after=''):
+    """Yields (path, stat) for every file under `root` in path order, after `after`."""
+    after = _parts(after) if after else None
+
+    def walk(directory, prefix):
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            path = prefix + entry.name
+            parts = _parts(path)
+            if entry.is_dir(follow_symlinks=False):
+                # Skip whole subtrees that the cursor has already passed
+                if after and parts < after and after[:len(parts)] != parts:
+                    continue
+                yield from walk(entry.path, path + '/')
+            elif entry.is_file(follow_symlinks=False):
+                if after and parts <= after:
+                    continue
+                yield path, entry.stat(follow_symlinks=False)
+
+    yield from walk(root, '')
+
+
+def _referenced(paths):
+    """The paths a model's image field points at."""
+    found = set()
+    for start in range(0, len(paths), LOOKUP_BATCH):
+        batch = paths[start:start + LOOKUP_BATCH]
+        for model, field_name in REFERENCES:
+            found.update(model.objects.filter(**{f'{field_name}__in': batch}).values_list(field_name, flat=True))
+    return found
+
+
+def _variants(paths):
+    """
+    The paths listed as a rendered variant of some image. Variant paths
+    only live inside the *_meta JSON, so this is a single pass over the
+    rows that have variants, made once per run.
+    """
+    wanted, found = set(paths), set()
+    if not wanted:
+        return found
+    for model, field_name in REFERENCES:
+        meta_field = META_FIELDS[field_name]
+        rows = model.objects.filter(**{f'{meta_field}__has_key': 'variants'}).values_list(meta_field, flat=True)
+        for meta in rows.iterator(chunk_size=2000):
+            found.update(variant['path'] for variant in meta['variants'] if variant['path'] in wanted)
+    return found
+
+
+def _live_uploads(paths, expired_before):
+    """The upload part files whose upload is still in progress."""
+    owners = {}
+    for path in paths:
+        try:
+            owners[uuid.UUID(os.path.splitext(os.path.basename(path))[0])] = path
+        except ValueError:
+            continue
+    live = Upload.objects.filter(pk__in=list(owners), updated_at__gte=expired_before).values_list('pk', flat=True)
+    return {owners[pk] for pk in live}
+
+
+def _area(path):
+    return path.split('/', 1)[0] if '/' in path else '.'
+
+
+def sweep(limit=None, grace=None, dry_run=False, restart=False):
+    """
+    Examines up to `limit` files from the saved cursor and deletes the
+    unreferenced ones older than `grace` seconds (MEDIA_GC_GRACE_SECONDS).
+    With dry_run nothing is deleted and the cursor stays put. Returns a
+    report of what was (or would be) reclaimed.
+    """
+    if grace is None:
+        grace = getattr(settings, 'MEDIA_GC_GRACE_SECONDS', 24 * 3600)
+    expired_before = timezone.now() - timedelta(seconds=getattr(settings, 'UPLOAD_EXPIRY_SECONDS', 24 * 3600))
+    state, _ = MediaSweep.objects.get_or_create(name=SWEEP_NAME)
+    cursor = '' if restart else state.cursor
+    settled_before = time.time() - grace
+
+    scanned = recent = 0
+    sizes, stored, temporary, parts = {}, [], [], []
+    complete = True
+    for path, stat in walk_media(default_storage.location, cursor):
+        if limit is not None and scanned >= limit:
+            complete = False
+            break
+        scanned += 1
+        cursor = path
+        if stat.st_mtime > settled_before:
+            recent += 1
+            continue
+        sizes[path] = stat.st_size
+        if path.startswith(f'{INCOMING_DIR}/{UPLOAD_DIR}/'):
+            parts.append(path)
+        elif path.startswith(f'{INCOMING_DIR}/'):
+            temporary.append(path)
+        else:
+            stored.append(path)
+
+    referenced = _referenced(stored)
+    stored = [path for path in stored if path not in referenced]
+    live = _variants(stored) | _live_uploads(parts, expired_before)
+    orphans = [path for path in stored + parts if path not in live] + temporary
+
+    report = {
+        "scanned": scanned,
+        "recent": recent,
+        "orphans": sorted(orphans),
+        "bytes": sum(sizes[path] for path in orphans),
+        "areas": {},
+        "complete": complete,
+        "dry_run": dry_run,
+    }
+    for path in orphans:
+        area = report['areas'].setdefault(_area(path), {"files": 0, "bytes": 0})
+        area['files'] += 1
+        area['bytes'] += sizes[path]
+    if dry_run:
+        return report
+
+    removed = []
+    for path in orphans:
+        full_path = default_storage.path(path)
+        try:
+            # Re-saving the same content touches a blob; leave it if so
+            if os.stat(full_path).st_mtime > settled_before:
+                continue
+            os.unlink(full_path)
+        except FileNotFoundError:
+            continue
+        removed.append(path)
+    for start in range(0, len(removed), LOOKUP_BATCH):
+        MediaBlob.objects.filter(name__in=removed[start:start + LOOKUP_BATCH]).delete()
+    Upload.objects.filter(updated_at__lt=expired_before).delete()
+
+    report['removed'] = len(removed)
+    report['removed_bytes'] = sum(sizes[path] for path in removed)
+    state.cursor = '' if complete else cursor
+    state.passes += complete
+    state.reclaimed_bytes += report['removed_bytes']
+    state.save()
+    return report
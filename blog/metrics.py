@@ -0,0 +1,142 @@
+import inspect
+import os
+import re
+import time
+from contextvars import ContextVar
+
+from django.utils.decorators import sync_and_async_middleware
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest,
+    multiprocess,
+)
+
+from .budgets import over_budget
+
+ROUTE_PARAM_RE = re.compile(r'<(?:\w+:)?(\w+)>')
+
+REQUESTS = Counter(
+    'triptales_requests_total', "Requests served, by route template and status.",
+    ['method', 'route', 'status'],
+)
+LATENCY = Histogram(
+    'triptales_request_duration_seconds', "Time spent producing the response.",
+    ['method', 'route'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Histogram(
+    'triptales_request_db_queries', "SQL queries executed per request.",
+    ['method', 'route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_TIME = Histogram(
+    'triptales_request_db_seconds', "Total SQL time per request.",
+    ['method', 'route'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+BUDGET_EXCEEDED = Counter(
+    'triptales_query_budget_exceeded_total', "Requests that ran more SQL queries than their route's budget.",
+    ['method', 'route'],
+)
+RESPONSE_SIZE = Histogram(
+    'triptales_response_size_bytes', "Response body size.",
+    ['method', 'route'],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+
+
+class _QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# The request's timer travels with the context, so queries the async ORM
+# runs in worker threads are still charged to the request that made them.
+_current_timer = ContextVar('query_timer', default=None)
+
+
+def _timed_execute(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.count += 1
+        timer.seconds += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created receiver adding the timing wrapper to every connection."""
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+def route_template(request):
+    """
+    `/api/posts/{slug}` for a request to `/api/posts/lisbon-1a2b3c4d`, or
+    None for anything that isn't a resolved API route, so raw paths never
+    become labels.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.route.startswith('api/'):
+        return None
+    return '/' + ROUTE_PARAM_RE.sub(r'{\1}', match.route)
+
+
+def _record(request, response, timer, started):
+    route = route_template(request)
+    if route is None:
+        return response
+    method = request.method
+    REQUESTS.labels(method, route, str(response.status_code)).inc()
+    LATENCY.labels(method, route).observe(time.perf_counter() - started)
+    DB_QUERIES.labels(method, route).observe(timer.count)
+    DB_TIME.labels(method, route).observe(timer.seconds)
+    if over_budget(method, route, timer.count):
+        BUDGET_EXCEEDED.labels(method, route).inc()
+    if not response.streaming:
+        RESPONSE_SIZE.labels(method, route).observe(len(response.content))
+    return response
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Records latency, SQL query count and time, and response size for each
+    API request, labelled by route template.
+    """
+    if inspect.iscoroutinefunction(get_response):
+        async def middleware(request):
+            timer, started = _QueryTimer(), time.perf_counter()
+            token = _current_timer.set(timer)
+            try:
+                response = await get_response(request)
+            finally:
+                _current_timer.reset(token)
+            return _record(request, response, timer, started)
+    else:
+        def middleware(request):
+            timer, started = _QueryTimer(), time.perf_counter()
+            token = _current_timer.set(timer)
+            try:
+                response = get_response(request)
+            finally:
+                _current_timer.reset(token)
+            return _record(request, response, timer, started)
+    return middleware
+
+
+def render_metrics():
+    """
+    Prometheus text exposition. With PROMETHEUS_MULTIPROC_DIR set, samples
+    written by every gunicorn worker are merged; otherwise only this
+    process's are reported.
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.1 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='cover_image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Cover variants'),
+        ),
+        migrations.AddField(
+            model_name='postblock',
+            name='image_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Image variants'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_meta',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Profile = apps.get_model('blog', 'Profile')
+    VisitedCountry = apps.get_model('blog', 'VisitedCountry')
+    db = schema_editor.connection.alias
+
+    stories = (
+        Post.objects
+            .filter(author_id=OuterRef('user_id'), is_published=True)
+            .values('author_id')
+            .annotate(total=Count('id'))
+            .values('total')
+    )
+    countries = (
+        VisitedCountry.objects
+            .filter(user_id=OuterRef('user_id'))
+            .values('user_id')
+            .annotate(total=Count('id'))
+            .values('total')
+    )
+    Profile.objects.using(db).update(
+        stories_count=Coalesce(Subquery(stories), Value(0)),
+        countries_count=Coalesce(Subquery(countries), Value(0)),
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='countries_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='stories_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
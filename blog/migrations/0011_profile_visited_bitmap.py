@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:20
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from blog.iso3166 import encode_bitmap
+
+
+def backfill_bitmaps(apps, schema_editor):
+    Profile = apps.get_model('blog', 'Profile')
+    VisitedCountry = apps.get_model('blog', 'VisitedCountry')
+    db = schema_editor.connection.alias
+
+    visited = defaultdict(set)
+    for user_id, code in VisitedCountry.objects.using(db).values_list('user_id', 'country_code').iterator():
+        visited[user_id].add(code)
+    profiles = list(Profile.objects.using(db).filter(user_id__in=visited))
+    for profile in profiles:
+        profile.visited_bitmap = encode_bitmap(visited[profile.user_id])
+    Profile.objects.using(db).bulk_update(profiles, ['visited_bitmap'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_profile_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='visited_bitmap',
+            field=models.CharField(blank=True, default='', editable=False, max_length=128),
+        ),
+        migrations.RunPython(backfill_bitmaps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 6.0.1 on 2026-10-18 08:31
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+from blog.iso3166 import ALPHA3
+
+
+def seed_leaderboards(apps, schema_editor):
+    CountryPopularity = apps.get_model('blog', 'CountryPopularity')
+    TravelerBucket = apps.get_model('blog', 'TravelerBucket')
+    Profile = apps.get_model('blog', 'Profile')
+    VisitedCountry = apps.get_model('blog', 'VisitedCountry')
+    db = schema_editor.connection.alias
+
+    visitors = dict(
+        VisitedCountry.objects.using(db)
+            .values('country_code')
+            .annotate(total=Count('id'))
+            .values_list('country_code', 'total')
+    )
+    buckets = dict(
+        Profile.objects.using(db)
+            .filter(countries_count__gt=0)
+            .values('countries_count')
+            .annotate(total=Count('id'))
+            .values_list('countries_count', 'total')
+    )
+    CountryPopularity.objects.using(db).bulk_create(
+        CountryPopularity(country_code=code, visitors=visitors.get(code, 0)) for code in ALPHA3
+    )
+    TravelerBucket.objects.using(db).bulk_create(
+        TravelerBucket(countries_count=count, users=buckets.get(count, 0))
+        for count in range(1, max([len(ALPHA3), *buckets]) + 1)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_profile_visited_bitmap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CountryPopularity',
+            fields=[
+                ('country_code', models.CharField(max_length=3, primary_key=True, serialize=False)),
+                ('visitors', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TravelerBucket',
+            fields=[
+                ('countries_count', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('users', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['-countries_count', 'user'], name='profile_travelers_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='countrypopularity',
+            index=models.Index(fields=['-visitors', 'country_code'], name='country_popularity_idx'),
+        ),
+        migrations.RunPython(seed_leaderboards, migrations.RunPython.noop),
+    ]
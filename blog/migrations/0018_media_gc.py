@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaSweep',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('cursor', models.TextField(blank=True)),
+                ('passes', models.PositiveIntegerField(default=0)),
+                ('reclaimed_bytes', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='cover_image',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='covers/', verbose_name='Cover'),
+        ),
+        migrations.AlterField(
+            model_name='postblock',
+            name='image_content',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='post_images/', verbose_name='Image'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='avatar',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to='avatar/'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_location'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='mediablob',
+            name='refs',
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:30
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+from blog.iso3166 import ALPHA3, encode_bitmap, is_valid
+
+
+def normalize_country_codes(apps, schema_editor):
+    """
+    Rows written before codes were validated can hold Natural Earth's -99
+    placeholder or lowercase codes. They were counted in countries_count but
+    left out of visited_bitmap. Fixable codes are uppercased, the rest
+    dropped, and the affected users' stats and both rankings recomputed.
+    """
+    Profile = apps.get_model('blog', 'Profile')
+    VisitedCountry = apps.get_model('blog', 'VisitedCountry')
+    CountryPopularity = apps.get_model('blog', 'CountryPopularity')
+    TravelerBucket = apps.get_model('blog', 'TravelerBucket')
+    db = schema_editor.connection.alias
+
+    affected = set()
+    invalid = VisitedCountry.objects.using(db).exclude(country_code__in=ALPHA3)
+    for row_id, user_id, code in list(invalid.values_list('id', 'user_id', 'country_code')):
+        affected.add(user_id)
+        code = code.strip().upper()
+        rows = VisitedCountry.objects.using(db).filter(id=row_id)
+        if is_valid(code) and not VisitedCountry.objects.using(db).filter(user_id=user_id, country_code=code).exists():
+            rows.update(country_code=code)
+        else:
+            rows.delete()
+
+    visited = defaultdict(set)
+    rows = VisitedCountry.objects.using(db).filter(user_id__in=affected).values_list('user_id', 'country_code')
+    for user_id, code in rows:
+        visited[user_id].add(code)
+    profiles = list(Profile.objects.using(db).filter(user_id__in=affected))
+    for profile in profiles:
+        profile.countries_count = len(visited[profile.user_id])
+        profile.visited_bitmap = encode_bitmap(visited[profile.user_id])
+    Profile.objects.using(db).bulk_update(profiles, ['countries_count', 'visited_bitmap'], batch_size=500)
+
+    # Rebuilt in full, which also adds rows for codes appended to ALPHA3
+    visitors = dict(
+        VisitedCountry.objects.using(db)
+            .values('country_code')
+            .annotate(total=Count('id'))
+            .values_list('country_code', 'total')
+    )
+    buckets = dict(
+        Profile.objects.using(db)
+            .filter(countries_count__gt=0)
+            .values('countries_count')
+            .annotate(total=Count('id'))
+            .values_list('countries_count', 'total')
+    )
+    CountryPopularity.objects.using(db).all().delete()
+    CountryPopularity.objects.using(db).bulk_create(
+        CountryPopularity(country_code=code, visitors=visitors.get(code, 0)) for code in ALPHA3
+    )
+    TravelerBucket.objects.using(db).all().delete()
+    TravelerBucket.objects.using(db).bulk_create(
+        TravelerBucket(countries_count=count, users=buckets.get(count, 0))
+        for count in range(1, max([len(ALPHA3), *buckets]) + 1)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_remove_mediablob_refs'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_country_codes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def mark_fanned_out(apps, schema_editor):
+    # A post with timeline entries was fanned out; the rest are merged on
+    # read, which also covers a post fanned out to no followers
+    Post = apps.get_model('blog', 'Post')
+    TimelineEntry = apps.get_model('blog', 'TimelineEntry')
+    db = schema_editor.connection.alias
+    Post.objects.using(db).filter(
+        Exists(TimelineEntry.objects.filter(post_id=OuterRef('pk')))
+    ).update(fanned_out=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_normalize_country_codes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='fanned_out',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(mark_fanned_out, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('fanned_out', False), ('is_published', True)), fields=['author', '-created_at', '-id'], name='post_unfanned_idx'),
+        ),
+    ]
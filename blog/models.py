@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -17,8 +19,14 @@ class Post(models.Model):
     slug = models.SlugField(unique=True, max_length=300 ,help_text="Post URL (Example: bali-trip)")
     author = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Автор")
 
-    cover_image = models.ImageField("Cover", upload_to='covers/', blank=True, null=True)
+    # Indexed so gc_media can look referenced files up by name
+    cover_image = models.ImageField("Cover", upload_to='covers/', blank=True, null=True, db_index=True)
+    cover_image_meta = models.JSONField("Cover variants", default=dict, blank=True, editable=False)
     location_name = models.CharField("Location", max_length=100, help_text="Example: Bali, Indonesia")
+    # Resolved from location_name by blog.geo.locate; geohash backs map queries
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
 
     continent = models.CharField(
         "Continent",
@@ -28,8 +36,17 @@ class Post(models.Model):
     )
     
     created_at = models.DateTimeField("Created date", auto_now_add=True)
+    updated_at = models.DateTimeField("Updated date", auto_now=True)
     is_published = models.BooleanField("Published", default=False)
 
+    excerpt = models.CharField("Excerpt", max_length=300, blank=True, editable=False)
+    word_count = models.PositiveIntegerField("Words", default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField("Reading time (min)", default=0, editable=False)
+    content_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Set by blog.timeline.fan_out when the post was copied into followers'
+    # timelines; posts left unset are merged in when timelines are read
+    fanned_out = models.BooleanField(default=False, editable=False)
+
     def __str__(self):
         return self.title
 
@@ -37,6 +54,15 @@ class Post(models.Model):
         verbose_name = "Post"
         verbose_name_plural = "Posts"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_published', '-created_at', '-id'], name='post_feed_idx'),
+            models.Index(fields=['is_published', 'continent', '-created_at', '-id'], name='post_continent_feed_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_feed_idx'),
+            models.Index(
+                fields=['author', '-created_at', '-id'], name='post_unfanned_idx',
+                condition=models.Q(is_published=True, fanned_out=False),
+            ),
+        ]
 
 class PostBlock(models.Model):
 
@@ -51,7 +77,8 @@ class PostBlock(models.Model):
     position = models.PositiveIntegerField("Serial Number", default=0)
     
     text_content = models.TextField("Text", blank=True, null=True, help_text="Supports Markdown")
-    image_content = models.ImageField("Image", upload_to='post_images/', blank=True, null=True)
+    image_content = models.ImageField("Image", upload_to='post_images/', blank=True, null=True, db_index=True)
+    image_meta = models.JSONField("Image variants", default=dict, blank=True, editable=False)
     image_caption = models.CharField("Photo Caption", max_length=200, blank=True)
 
     class Meta:
@@ -68,9 +95,144 @@ class VisitedCountry(models.Model):
 
 class Profile(models.Model):
     user  = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
-    avatar = models.ImageField(upload_to='avatar/', blank=True, null=True)
+    avatar = models.ImageField(upload_to='avatar/', blank=True, null=True, db_index=True)
+    avatar_meta = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(max_length=500, blank=True)
     location = models.CharField(max_length=100, blank=True)
+    stories_count = models.PositiveIntegerField(default=0, editable=False)
+    countries_count = models.PositiveIntegerField(default=0, editable=False)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    # One bit per code in blog.iso3166.ALPHA3, hex-encoded
+    visited_bitmap = models.CharField(max_length=128, blank=True, default='', editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.user.username
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-countries_count', 'user'], name='profile_travelers_idx'),
+        ]
+
+
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class CountryPopularity(models.Model):
+    country_code = models.CharField(max_length=3, primary_key=True)
+    visitors = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-visitors', 'country_code'], name='country_popularity_idx'),
+        ]
+
+
+class TravelerBucket(models.Model):
+    """How many users have visited exactly `countries_count` countries."""
+    countries_count = models.PositiveIntegerField(primary_key=True)
+    users = models.PositiveIntegerField(default=0)
+
+
+class Follow(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    followee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('follower', 'followee')
+        indexes = [
+            models.Index(fields=['followee', 'follower'], name='follow_followee_idx'),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """
+    One post in a follower's precomputed home timeline, written when the
+    post is published. `created_at` is copied from the post so a page is a
+    range scan over this table's index alone.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-post'], name='timeline_user_idx'),
+        ]
+
+
+class Upload(models.Model):
+    """
+    A resumable upload in progress: bytes are appended to a part file under
+    MEDIA_ROOT/.incoming/uploads/ until `offset` reaches `size`, and the
+    finished file is copied into storage when a post references it.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class Job(models.Model):
+    """
+    A unit of background work run by `manage.py run_workers`. `task` is the
+    dotted path of a function called with `args`. While a job is queued,
+    another with the same `dedup_key` is not added.
+    """
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    dedup_key = models.CharField(max_length=200, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_ready_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'], condition=models.Q(status='queued'), name='job_queued_dedup',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
+
+
+class MediaSweep(models.Model):
+    """
+    Progress of `manage.py gc_media` through MEDIA_ROOT: the last path it
+    examined, so the next run resumes after it.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    cursor = models.TextField(blank=True)
+    passes = models.PositiveIntegerField(default=0)
+    reclaimed_bytes = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.user.username
\ No newline at end of file
+        return self.name
@@ -0,0 +1,75 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from ninja.errors import HttpError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(post) -> str:
+    """
+    Packs the (created_at, id) keyset of the last post on a page
+    into an opaque, URL-safe string. Accepts a Post or a .values() row.
+    """
+    if isinstance(post, dict):
+        created_at, post_id = post['created_at'], post['id']
+    else:
+        created_at, post_id = post.created_at, post.id
+    raw = json.dumps([created_at.isoformat(), post_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, TypeError):
+        raise HttpError(400, "Invalid cursor")
+
+
+def page_size(limit) -> int:
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def seek(queryset, cursor, id_field='id'):
+    """Orders newest first and skips everything up to and including the cursor."""
+    queryset = queryset.order_by('-created_at', f'-{id_field}')
+    if cursor:
+        created_at, post_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, **{f'{id_field}__lt': post_id})
+        )
+    return queryset
+
+
+def _keyset_slice(queryset, cursor, limit):
+    limit = page_size(limit)
+    return seek(queryset, cursor)[:limit + 1], limit
+
+
+def _page(items, limit) -> dict:
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1])
+    return {"items": items, "next": next_cursor}
+
+
+def paginate_keyset(queryset, cursor: str = None, limit: int = None) -> dict:
+    """
+    Returns one page of posts ordered newest first, seeking past the cursor
+    with a (created_at, id) comparison instead of an OFFSET, so every page
+    is a single index range scan no matter how deep the client scrolls.
+    """
+    queryset, limit = _keyset_slice(queryset, cursor, limit)
+    return _page(list(queryset), limit)
+
+
+async def apaginate_keyset(queryset, cursor: str = None, limit: int = None) -> dict:
+    """Async counterpart of paginate_keyset for async views."""
+    queryset, limit = _keyset_slice(queryset, cursor, limit)
+    return _page([item async for item in queryset], limit)
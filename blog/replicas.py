@@ -0,0 +1,102 @@
+import inspect
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+from ninja.decorators import decorate_view
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Set only while a @replica_reads operation runs; everything else, including
+# auth and any write path, reads from the primary.
+_replica_alias = ContextVar('replica_alias', default=None)
+
+
+def _replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _pick_replica(request):
+    replicas = _replicas()
+    if not replicas or request.COOKIES.get(PIN_COOKIE):
+        return None
+    return random.choice(replicas)
+
+
+def reading_from_replica() -> bool:
+    return _replica_alias.get() is not None
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes always go to `default`. Reads go to the replica chosen for the
+    current request by @replica_reads, and to `default` otherwise.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _replica_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+
+def replica_reads(func):
+    """
+    Ninja operation decorator that serves the operation's reads from a
+    replica, unless the client is pinned to the primary after a write.
+    Place it above @conditional so the version probe uses the replica too.
+    """
+    def decorator(run):
+        if inspect.iscoroutinefunction(run):
+            @wraps(run)
+            async def async_wrapper(request, *args, **kwargs):
+                token = _replica_alias.set(_pick_replica(request))
+                try:
+                    return await run(request, *args, **kwargs)
+                finally:
+                    _replica_alias.reset(token)
+            return async_wrapper
+
+        @wraps(run)
+        def wrapper(request, *args, **kwargs):
+            token = _replica_alias.set(_pick_replica(request))
+            try:
+                return run(request, *args, **kwargs)
+            finally:
+                _replica_alias.reset(token)
+        return wrapper
+    return decorate_view(decorator)(func)
+
+
+def _pin(request, response):
+    if (request.method not in SAFE_METHODS and response.status_code < 400
+            and _replicas()):
+        response.set_cookie(
+            PIN_COOKIE, '1',
+            max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+            httponly=True, samesite='Lax',
+        )
+    return response
+
+
+@sync_and_async_middleware
+def pin_primary_middleware(get_response):
+    """
+    After a successful write, pins the client to the primary for
+    REPLICA_PIN_SECONDS so its next reads see its own changes despite
+    replication lag.
+    """
+    if inspect.iscoroutinefunction(get_response):
+        async def middleware(request):
+            return _pin(request, await get_response(request))
+    else:
+        def middleware(request):
+            return _pin(request, get_response(request))
+    return middleware
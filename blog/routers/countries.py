@@ -1,20 +1,105 @@
 from ninja import Router
-from ninja_jwt.authentication import JWTAuth
+from ninja.errors import HttpError
+from ..auth import CachedJWTAuth
+from django.db import transaction
+from typing import List
 
-from ..models import VisitedCountry
-from ..schemas import CountrySchema
+from ..models import VisitedCountry, Profile
+from ..counters import get_profile
+from ..leaderboards import record_visits
+from ..iso3166 import ALPHA3, decode_bitmap, encode_bitmap, is_valid, set_bit
+from ..schemas import CountrySchema, CountrySyncSchema, CountrySyncResultSchema
+from ..budgets import query_budget
 
 router = Router()
 
 
-@router.post("", auth=JWTAuth())
+def _validate(codes):
+    codes = {code.upper() for code in codes}
+    unknown = sorted(code for code in codes if not is_valid(code))
+    if unknown:
+        raise HttpError(400, f"Unknown country codes: {', '.join(unknown)}")
+    return codes
+
+
+def _locked_profile(user):
+    get_profile(user)
+    return Profile.objects.select_for_update().get(user=user)
+
+
+@router.get("/codes", response=List[str])
+@query_budget(0)
+def country_codes(request):
+    # Bit order of visited_bitmap; static, so clients can cache it forever.
+    return list(ALPHA3)
+
+
+@router.post("", auth=CachedJWTAuth())
+@query_budget(13)
 def toggle_country(request, payload: CountrySchema):
     user = request.auth
-    country, created = VisitedCountry.objects.get_or_create(
-        user=user,
-        country_code=payload.country_code
-    )
+    code, = _validate([payload.country_code])
+    with transaction.atomic():
+        profile = _locked_profile(user)
+        country, created = VisitedCountry.objects.get_or_create(
+            user=user,
+            country_code=code
+        )
+        if not created:
+            country.delete()
+        new_count = max(0, profile.countries_count + (1 if created else -1))
+        Profile.objects.filter(pk=profile.pk).update(
+            visited_bitmap=set_bit(profile.visited_bitmap, code, created),
+            countries_count=new_count,
+        )
+        record_visits(
+            profile.countries_count, new_count,
+            added=[code] if created else (), removed=() if created else [code],
+        )
     if not created:
-        country.delete()
-        return {"status": "removed", "code": payload.country_code}
-    return {"status": "added", "code": payload.country_code}
\ No newline at end of file
+        return {"status": "removed", "code": code}
+    return {"status": "added", "code": code}
+
+
+@router.put("", response=CountrySyncResultSchema, auth=CachedJWTAuth())
+@query_budget(11)
+def sync_countries(request, payload: CountrySyncSchema):
+    """
+    Replaces the visited set in one transaction: either the full desired
+    list in `countries`, or `add`/`remove` diffs against the current set.
+    """
+    user = request.auth
+    add, remove = _validate(payload.add), _validate(payload.remove)
+    with transaction.atomic():
+        profile = _locked_profile(user)
+        current = set(
+            VisitedCountry.objects
+                .filter(user=user)
+                .values_list('country_code', flat=True)
+        )
+        if payload.countries is not None:
+            desired = _validate(payload.countries)
+        else:
+            desired = (current | add) - remove
+
+        added, removed = desired - current, current - desired
+        if removed:
+            VisitedCountry.objects.filter(user=user, country_code__in=removed).delete()
+        if added:
+            VisitedCountry.objects.bulk_create(
+                [VisitedCountry(user=user, country_code=code) for code in added],
+                ignore_conflicts=True,
+            )
+        bitmap = encode_bitmap(desired)
+        Profile.objects.filter(pk=profile.pk).update(
+            visited_bitmap=bitmap,
+            countries_count=len(desired),
+        )
+        record_visits(profile.countries_count, len(desired), added=added, removed=removed)
+    return {
+        "added": sorted(added),
+        "removed": sorted(removed),
+        "countries_count": len(desired),
+        "visited_countries": decode_bitmap(bitmap),
+        "visited_bitmap": bitmap,
+    }
@@ -0,0 +1,16 @@
+from ninja import Router
+from ninja.errors import HttpError
+
+from ..auth import CachedJWTAuth
+from ..jobs import job_stats
+from ..budgets import query_budget
+
+router = Router()
+
+
+@router.get("/stats", auth=CachedJWTAuth())
+@query_budget(2)
+def stats(request):
+    if not request.auth.is_staff:
+        raise HttpError(403, "Forbidden")
+    return job_stats()
@@ -0,0 +1,48 @@
+from ninja import Router
+from ninja.errors import HttpError
+from django.shortcuts import get_object_or_404
+from django.contrib.auth.models import User
+from typing import List
+
+from ..counters import get_profile
+from ..iso3166 import is_valid
+from ..leaderboards import country_rank, top_countries, top_travelers, traveler_rank
+from ..schemas import CountryRankSchema, TravelerRankSchema
+from ..budgets import query_budget
+
+router = Router()
+
+MAX_LIMIT = 100
+
+
+@router.get("/travelers", response=List[TravelerRankSchema])
+@query_budget(2)
+def most_travelled(request, limit: int = 10):
+    return top_travelers(max(1, min(limit, MAX_LIMIT)))
+
+
+@router.get("/travelers/{username}", response=TravelerRankSchema)
+@query_budget(2)
+def traveler_position(request, username: str):
+    user = get_object_or_404(User.objects.select_related('profile'), username=username)
+    profile = getattr(user, 'profile', None) or get_profile(user)
+    return {
+        "rank": traveler_rank(profile.countries_count),
+        "username": user.username,
+        "countries_count": profile.countries_count,
+    }
+
+
+@router.get("/countries", response=List[CountryRankSchema])
+@query_budget(1)
+def most_visited(request, limit: int = 10):
+    return top_countries(max(1, min(limit, MAX_LIMIT)))
+
+
+@router.get("/countries/{country_code}", response=CountryRankSchema)
+@query_budget(2)
+def country_position(request, country_code: str):
+    country_code = country_code.upper()
+    if not is_valid(country_code):
+        raise HttpError(404, "Unknown country code")
+    return country_rank(country_code)
@@ -0,0 +1,31 @@
+from ninja import Router
+from ninja.errors import HttpError
+from ninja.security import HttpBearer
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from ..auth import CachedJWTAuth
+from ..metrics import render_metrics
+from ..budgets import query_budget
+
+router = Router()
+
+
+class MetricsTokenAuth(HttpBearer):
+    """Static bearer token for the Prometheus scraper (METRICS_TOKEN)."""
+
+    def authenticate(self, request, token):
+        expected = getattr(settings, 'METRICS_TOKEN', '')
+        if expected and constant_time_compare(token, expected):
+            return 'scraper'
+
+
+@router.get("", auth=[MetricsTokenAuth(), CachedJWTAuth()], include_in_schema=False)
+@query_budget(1)
+def metrics(request):
+    # Either the scraper's token or a staff user's JWT
+    if request.auth != 'scraper' and not request.auth.is_staff:
+        raise HttpError(403, "Forbidden")
+    payload, content_type = render_metrics()
+    return HttpResponse(payload, content_type=content_type)
@@ -1,29 +1,56 @@
 from ninja import Router, File, Form, UploadedFile
-from ninja_jwt.authentication import JWTAuth
-from django.shortcuts import get_object_or_404
-from typing import List, Optional
+from ninja.errors import HttpError
+from ninja.responses import NinjaJSONEncoder
+from ..auth import CachedJWTAuth
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.http import HttpResponse
+from django.db import transaction
+from typing import List, Optional, Union
 from django.utils.text import slugify
-import logging
 import uuid
 import json
 
 from ..models import Post, PostBlock
-from ..schemas import PostCreateSchema, PostDetailSchema, PostListSchema
-from ..utils import clean_quill_html
-
-logger = logging.getLogger(__name__)
+from ..schemas import (
+    BlockCreateSchema, BlockUpdateSchema, MapViewSchema, NearbyPostSchema, PostBlockSchema,
+    PostCreateSchema, PostDetailSchema, PostListSchema, PostPageSchema,
+)
+from ..pagination import apaginate_keyset, paginate_keyset
+from ..listing import json_response, post_list_rows, serialize_post_list
+from ..cache import (
+    aget_post_detail, ais_settling, apost_detail_key, aset_post_detail, get_cache_stats,
+    invalidate_post,
+)
+from ..blocks import delete_block, insert_block, move_block, post_texts, save_blocks, update_block
+from ..content import apply_summary
+from ..geo import locate, nearby, viewport
+from ..images import queue_variants
+from ..search import index_post, search_page, unindex_post
+from ..counters import adjust_counters
+from ..timeline import fan_out
+from ..uploads import claim_uploads, release_uploads
+from ..conditional import conditional, feed_version, post_version
+from ..replicas import reading_from_replica, replica_reads
+from ..budgets import query_budget
 
 router = Router()
 
-@router.post("/create", auth=JWTAuth())
+@router.post("/create", auth=CachedJWTAuth())
+@query_budget(14)
 def create_post(request, payload: PostCreateSchema = Form(...),
                 blocks_data: str = Form(...),
-                cover: UploadedFile = File(None)):
+                cover: UploadedFile = File(None),
+                cover_upload: str = Form(None)):
     user = request.auth
     base_slug = slugify(payload.title)
     unique_slug = f"{base_slug}-{str(uuid.uuid4())[:8]}"
 
-    post = Post.objects.create(
+    try:
+        blocks_list = json.loads(blocks_data)
+    except json.JSONDecodeError:
+        return {"error": "Invalid blocks data JSON"}
+
+    post = Post(
         author=user,
         title=payload.title,
         slug=unique_slug,
@@ -31,84 +58,139 @@ def create_post(request, payload: PostCreateSchema = Form(...),
         continent=payload.continent,
         is_published=True
     )
-    if cover:
-        post.cover_image.save(cover.name, cover)
+    locate(post)
+
+    with transaction.atomic():
+        # Images sent earlier through /api/uploads, referenced by upload_id
+        claimed, claimed_cover, uploads = claim_uploads(user, blocks_list, cover_upload)
+        files = {**request.FILES.dict(), **claimed}
+        cover = cover or claimed_cover
+        if cover:
+            post.cover_image.save(cover.name, cover, save=False)
         post.save()
+        queue_variants(post, 'cover_image')
+        texts = save_blocks(post, blocks_list, files, existing_blocks=[])
+        apply_summary(post, texts)
+        index_post(post)
+        adjust_counters(user.id, stories=1)
+        fan_out(post)
+        release_uploads(uploads, [*claimed.values(), claimed_cover])
+    return {"slug": post.slug, "message": "Story published!"}
 
-    try:
-        blocks_list = json.loads(blocks_data)
-    except json.JSONDecodeError:
-        return {"error": "Invalid blocks data JSON"}
 
-    for index, block_info in enumerate(blocks_list):
-        b_type = block_info.get('type')
-        if b_type == 'text':
-            content = block_info.get('content')
-            if content:
-                PostBlock.objects.create(
-                    post=post,
-                    type='text',
-                    position=index,
-                    text_content=clean_quill_html(content)
-                )
-        elif b_type == 'image':
-            image_file = request.FILES.get(f'block_image_{index}')
-            if image_file:
-                PostBlock.objects.create(
-                    post=post,
-                    type='image',
-                    position=index,
-                    image_content=image_file
-                )
-    return {"slug": post.slug, "message": "Story published!"}
+@router.get("/my-posts", response=Union[PostPageSchema, List[PostListSchema]], auth=CachedJWTAuth())
+@query_budget(2)
+def my_posts(request, limit: int = None, cursor: str = None):
+    posts = post_list_rows(Post.objects.filter(author=request.auth))
+    if limit or cursor:
+        page = paginate_keyset(posts, cursor, limit)
+        return json_response({"items": serialize_post_list(page['items']), "next": page['next']})
+    return json_response(serialize_post_list(posts.order_by('-created_at')))
+
+
+@router.get("/search", response=PostPageSchema)
+@query_budget(2)
+def search_posts(request, q: str, limit: int = None, cursor: str = None):
+    return search_page(q, cursor, limit)
+
+
+@router.get("/cache-stats", auth=CachedJWTAuth())
+@query_budget(1)
+def post_cache_stats(request):
+    if not request.auth.is_staff:
+        raise HttpError(403, "Forbidden")
+    return get_cache_stats()
+
 
+@router.get("/in-bbox", response=MapViewSchema)
+@replica_reads
+@query_budget(2)
+def posts_in_bbox(request, bbox: str, limit: int = None):
+    return json_response(viewport(bbox, limit))
 
-@router.get("/my-posts", response=List[PostListSchema], auth=JWTAuth())
-def my_posts(request):
-    return Post.objects.filter(author=request.auth).order_by('-created_at')
+
+@router.get("/nearby", response=List[NearbyPostSchema])
+@replica_reads
+@query_budget(3)
+def posts_nearby(request, lat: float = None, lon: float = None, slug: str = None,
+                 radius_km: float = None, limit: int = None):
+    exclude = None
+    if slug:
+        post = get_object_or_404(Post.objects.only('id', 'latitude', 'longitude'), slug=slug, is_published=True)
+        lat, lon, exclude = post.latitude, post.longitude, post.id
+    if lat is None or lon is None:
+        raise HttpError(400, "Pass lat and lon, or the slug of a located post")
+    return json_response(nearby(lat, lon, radius_km, limit, exclude))
 
 
 @router.get("/{slug}", response=PostDetailSchema)
-def get_post(request, slug: str):
-    post = get_object_or_404(
+@replica_reads
+@conditional(post_version)
+@query_budget(3)
+async def get_post(request, slug: str):
+    cache_key = await apost_detail_key(slug)
+    payload = await aget_post_detail(cache_key)
+    if payload is not None:
+        return HttpResponse(payload, content_type='application/json; charset=utf-8')
+
+    post = await aget_object_or_404(
         Post.objects
             .select_related('author', 'author__profile')
             .prefetch_related('blocks'),
         slug=slug
     )
     if not post.is_published:
-        if not request.user.is_authenticated or post.author != request.user:
+        user = await request.auser()
+        if not user.is_authenticated or post.author_id != user.id:
             return {"error": "Not found"}
-    return post
+        return post
 
+    payload = json.dumps(PostDetailSchema.from_orm(post).model_dump(), cls=NinjaJSONEncoder)
+    if not (reading_from_replica() and await ais_settling(slug)):
+        await aset_post_detail(cache_key, payload.encode())
+    return HttpResponse(payload, content_type='application/json; charset=utf-8')
 
-@router.get("", response=List[PostListSchema])
-def list_posts(request, continent: str = None, author: str = None):
-    posts = (
-        Post.objects
-            .filter(is_published=True)
-            .select_related('author')
-    )
+
+@router.get("", response=Union[PostPageSchema, List[PostListSchema]])
+@replica_reads
+@conditional(feed_version)
+@query_budget(2)
+async def list_posts(request, continent: str = None, author: str = None,
+                     limit: int = None, cursor: str = None):
+    posts = Post.objects.filter(is_published=True)
     if continent and continent != 'All':
         posts = posts.filter(continent=continent)
     if author:
         posts = posts.filter(author__username=author)
-    return posts.order_by('-created_at')
+    posts = post_list_rows(posts)
+    if limit or cursor:
+        page = await apaginate_keyset(posts, cursor, limit)
+        return json_response({"items": serialize_post_list(page['items']), "next": page['next']})
+    return json_response(serialize_post_list([row async for row in posts.order_by('-created_at')]))
 
 
-@router.delete("/{slug}", auth=JWTAuth())
+@router.delete("/{slug}", auth=CachedJWTAuth())
+@query_budget(9)
 def delete_post(request, slug: str):
     post = get_object_or_404(Post.objects.select_related('author'), slug=slug)
     if post.author != request.auth:
         return {"error": "Forbidden"}
-    post.delete()
+    post_id = post.id
+    with transaction.atomic():
+        post.delete()
+        if post.is_published:
+            adjust_counters(post.author_id, stories=-1)
+    unindex_post(post_id)
+    invalidate_post(slug)
     return {"success": True}
 
 
-@router.post("/{slug}/update", auth=JWTAuth())
+@router.post("/{slug}/update", auth=CachedJWTAuth())
+@query_budget(14)
 def update_post(request, slug: str, payload: PostCreateSchema = Form(...),
                 blocks_data: str = Form(...),
-                cover: UploadedFile = File(None)):
+                cover: UploadedFile = File(None),
+                cover_upload: str = Form(None)):
     post = get_object_or_404(
         Post.objects.select_related('author').prefetch_related('blocks'),
         slug=slug
@@ -116,58 +198,87 @@ def update_post(request, slug: str, payload: PostCreateSchema = Form(...),
     if post.author != request.auth:
         return {"error": "Forbidden"}
 
+    try:
+        blocks_list = json.loads(blocks_data)
+    except json.JSONDecodeError:
+        return {"error": "Invalid blocks data"}
+
     post.title = payload.title
     post.location_name = payload.location_name
+    locate(post)
     post.continent = payload.continent
-    if cover:
-        post.cover_image.save(cover.name, cover)
-    post.save()
 
-    existing_images = {}
-    for block in post.blocks.filter(type='image'):
-        if block.image_content:
-            try:
-                existing_images[block.image_content.url] = block.image_content
-            except Exception as e:
-                logger.warning(f"Could not get image URL for block {block.id}: {e}")
+    with transaction.atomic():
+        claimed, claimed_cover, uploads = claim_uploads(request.auth, blocks_list, cover_upload)
+        files = {**request.FILES.dict(), **claimed}
+        cover = cover or claimed_cover
+        if cover:
+            post.cover_image.save(cover.name, cover, save=False)
+        post.save()
+        queue_variants(post, 'cover_image')
+        texts = save_blocks(post, blocks_list, files, existing_blocks=list(post.blocks.all()))
+        apply_summary(post, texts)
+        index_post(post)
+        release_uploads(uploads, [*claimed.values(), claimed_cover])
+
+    invalidate_post(post.slug)
+    return {"slug": post.slug, "message": "Story updated!"}
+
+
+def _own_post(request, slug):
+    post = get_object_or_404(Post, slug=slug)
+    if post.author_id != request.auth.id:
+        raise HttpError(403, "Forbidden")
+    return post
+
+
+def _blocks_changed(post):
+    apply_summary(post, post_texts(post))
+    index_post(post)
 
-    PostBlock.objects.filter(post=post).delete()
 
+@router.post("/{slug}/blocks", response=PostBlockSchema, auth=CachedJWTAuth())
+@query_budget(16)
+def insert_post_block(request, slug: str, payload: BlockCreateSchema = Form(...),
+                      image: UploadedFile = File(None)):
+    post = _own_post(request, slug)
     try:
-        blocks_list = json.loads(blocks_data)
-    except json.JSONDecodeError:
-        return {"error": "Invalid blocks data"}
+        with transaction.atomic():
+            block = insert_block(post, payload.type, payload.position, payload.content, payload.caption, image)
+            _blocks_changed(post)
+    except ValueError as error:
+        raise HttpError(400, str(error))
+    invalidate_post(post.slug)
+    return block
 
-    for index, block_info in enumerate(blocks_list):
-        b_type = block_info.get('type')
-        if b_type == 'text':
-            content = block_info.get('content')
-            if content:
-                PostBlock.objects.create(
-                    post=post,
-                    type='text',
-                    position=index,
-                    text_content=clean_quill_html(content)
-                )
-        elif b_type == 'image':
-            image_file = request.FILES.get(f'block_image_{index}')
-            existing_url = block_info.get('existing_url')
-            if image_file:
-                PostBlock.objects.create(
-                    post=post,
-                    type='image',
-                    position=index,
-                    image_content=image_file
-                )
-            elif existing_url:
-                matched_file = None
-                for url_key, file_obj in existing_images.items():
-                    if url_key in existing_url or existing_url in url_key:
-                        matched_file = file_obj
-                        break
-                if matched_file:
-                    new_block = PostBlock(post=post, type='image', position=index)
-                    new_block.image_content = matched_file
-                    new_block.save()
-
-    return {"slug": post.slug, "message": "Story updated!"}
\ No newline at end of file
+
+@router.patch("/{slug}/blocks/{block_id}", response=PostBlockSchema, auth=CachedJWTAuth())
+@query_budget(15)
+def update_post_block(request, slug: str, block_id: int, payload: BlockUpdateSchema):
+    post = _own_post(request, slug)
+    block = get_object_or_404(PostBlock, pk=block_id, post=post)
+    try:
+        with transaction.atomic():
+            changed = update_block(block, payload.content, payload.caption)
+            if payload.position is not None and payload.position != block.position:
+                move_block(post, block, payload.position)
+                changed.append('position')
+            if changed:
+                _blocks_changed(post)
+    except ValueError as error:
+        raise HttpError(400, str(error))
+    if changed:
+        invalidate_post(post.slug)
+    return block
+
+
+@router.delete("/{slug}/blocks/{block_id}", auth=CachedJWTAuth())
+@query_budget(15)
+def delete_post_block(request, slug: str, block_id: int):
+    post = _own_post(request, slug)
+    block = get_object_or_404(PostBlock, pk=block_id, post=post)
+    with transaction.atomic():
+        delete_block(post, block)
+        _blocks_changed(post)
+    invalidate_post(post.slug)
+    return {"success": True}
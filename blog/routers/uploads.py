@@ -0,0 +1,77 @@
+import uuid
+
+from ninja import Router
+from ninja.errors import HttpError
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+
+from ..auth import CachedJWTAuth
+from ..models import Upload
+from ..schemas import UploadCreateSchema, UploadSchema
+from ..uploads import append_chunk, create_upload, discard_upload, finalize_upload
+from ..budgets import query_budget
+
+router = Router()
+
+OFFSET_HEADER = 'Upload-Offset'
+
+
+def _upload_state(response, upload):
+    response[OFFSET_HEADER] = str(upload.offset)
+    response['Upload-Length'] = str(upload.size)
+    return {
+        "id": upload.pk,
+        "filename": upload.filename,
+        "size": upload.size,
+        "offset": upload.offset,
+        "complete": upload.completed_at is not None,
+    }
+
+
+def _own_upload(request, upload_id):
+    return get_object_or_404(Upload, pk=upload_id, owner=request.auth)
+
+
+@router.post("", response={201: UploadSchema}, auth=CachedJWTAuth())
+@query_budget(2)
+def start_upload(request, response: HttpResponse, payload: UploadCreateSchema):
+    upload = create_upload(request.auth, payload.filename, payload.size)
+    response['Location'] = f'/api/uploads/{upload.pk}'
+    return 201, _upload_state(response, upload)
+
+
+@router.get("/{upload_id}", response=UploadSchema, auth=CachedJWTAuth())
+@query_budget(2)
+def upload_status(request, response: HttpResponse, upload_id: uuid.UUID):
+    """Where to resume: the number of bytes safely stored so far."""
+    return _upload_state(response, _own_upload(request, upload_id))
+
+
+@router.patch("/{upload_id}", response=UploadSchema, auth=CachedJWTAuth())
+@query_budget(4)
+def upload_chunk(request, response: HttpResponse, upload_id: uuid.UUID):
+    """
+    Appends the raw request body (Content-Type application/offset+octet-stream)
+    at the offset given in the Upload-Offset header.
+    """
+    upload = _own_upload(request, upload_id)
+    try:
+        offset = int(request.headers[OFFSET_HEADER])
+        length = int(request.headers.get('Content-Length') or 0)
+    except (KeyError, ValueError):
+        raise HttpError(400, f"{OFFSET_HEADER} and Content-Length headers are required")
+    append_chunk(upload, offset, request, length)
+    return _upload_state(response, upload)
+
+
+@router.post("/{upload_id}/finalize", response=UploadSchema, auth=CachedJWTAuth())
+@query_budget(3)
+def complete_upload(request, response: HttpResponse, upload_id: uuid.UUID):
+    return _upload_state(response, finalize_upload(_own_upload(request, upload_id)))
+
+
+@router.delete("/{upload_id}", response={204: None}, auth=CachedJWTAuth())
+@query_budget(3)
+def cancel_upload(request, upload_id: uuid.UUID):
+    discard_upload(_own_upload(request, upload_id))
+    return 204, None
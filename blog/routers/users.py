@@ -1,16 +1,34 @@
 from ninja import Router, File, Form, UploadedFile
-from ninja_jwt.authentication import JWTAuth
-from django.shortcuts import get_object_or_404
+from ..auth import CachedJWTAuth
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from ninja.errors import HttpError
 from typing import List
+from asgiref.sync import sync_to_async
 
-from ..models import Post, VisitedCountry, Profile
-from ..schemas import RegisterSchema, UserProfileSchema, ProfileUpdateSchema, PublicProfileSchema
+from ..models import Post, Profile
+from ..cache import invalidate_posts
+from ..counters import get_profile
+from ..iso3166 import decode_bitmap
+from ..conditional import conditional, profile_version
+from ..replicas import replica_reads
+from ..images import queue_variants
+from ..schemas import (
+    FollowSchema, PostPageSchema, RegisterSchema, UserProfileSchema, ProfileUpdateSchema,
+    PublicProfileSchema,
+)
+from ..budgets import query_budget
+from ..listing import json_response
+from ..export import FORMATS, aarchive_chunks, archive_chunks
+from ..timeline import follow, timeline_page, unfollow
 
 router = Router()
 
 @router.post("/register")
+@query_budget(4)
 def register(request, payload: RegisterSchema):
     if User.objects.filter(username=payload.username).exists():
         return {"error": "Username already taken"}
@@ -22,59 +40,106 @@ def register(request, payload: RegisterSchema):
         email=payload.email,
         password=make_password(payload.password)
     )
+    Profile.objects.create(user=user)
     return {"id": user.id, "username": user.username, "message": "User created successfully"}
 
 
-@router.get("/me", response=UserProfileSchema, auth=JWTAuth())
-def me(request):
-    user = request.auth
-    profile, _ = Profile.objects.get_or_create(user=user)
-
-    visited_countries = list(
-        VisitedCountry.objects
-            .filter(user=user)
-            .values_list('country_code', flat=True)
-    )
+def _private_profile(user, profile):
     return {
         "id": user.id,
         "username": user.username,
         "email": user.email,
         "profile": profile,
-        "stories_count": Post.objects.filter(author=user, is_published=True).count(),
-        "countries_count": len(visited_countries),
-        "visited_countries": visited_countries,
+        "stories_count": profile.stories_count,
+        "countries_count": profile.countries_count,
+        "visited_countries": decode_bitmap(profile.visited_bitmap),
+        "visited_bitmap": profile.visited_bitmap,
     }
 
 
-@router.post("/me/update", response=UserProfileSchema, auth=JWTAuth())
+@router.get("/me", response=UserProfileSchema, auth=CachedJWTAuth())
+@query_budget(2)
+def me(request):
+    user = request.auth
+    return _private_profile(user, get_profile(user))
+
+
+@router.post("/me/update", response=UserProfileSchema, auth=CachedJWTAuth())
+@query_budget(4)
 def update_profile(request, payload: ProfileUpdateSchema = Form(...), avatar: UploadedFile = File(None)):
     user = request.auth
-    profile, _ = Profile.objects.get_or_create(user=user)
+    profile = get_profile(user)
     if payload.bio is not None:
         profile.bio = payload.bio
     if avatar:
-        profile.avatar.save(avatar.name, avatar)
-    profile.save()
-    return me(request)
+        profile.avatar.save(avatar.name, avatar, save=False)
+    profile.save(update_fields=['bio', 'avatar', 'updated_at'])
+    queue_variants(profile, 'avatar')
+    if avatar:
+        # Cached post details embed the author's avatar
+        invalidate_posts(Post.objects.filter(author=user).values_list('slug', flat=True))
+    return _private_profile(user, profile)
+
+
+@router.get("/me/export", auth=CachedJWTAuth())
+# 3 queries plus one blocks prefetch per export.BATCH_SIZE posts
+@query_budget(None)
+def export_archive(request, format: str = 'json'):
+    """Streams all of the user's posts with their blocks, profile and visited countries."""
+    if format not in FORMATS:
+        raise HttpError(400, f"format must be one of: {', '.join(FORMATS)}")
+    user = request.auth
+    # Under ASGI a sync iterator would be read whole into memory before sending
+    chunks = aarchive_chunks if isinstance(request, ASGIRequest) else archive_chunks
+    response = StreamingHttpResponse(chunks(user, format), content_type=FORMATS[format])
+    response['Content-Disposition'] = f'attachment; filename="triptales-{user.username}.{format}"'
+    return response
+
+
+@router.get("/timeline", response=PostPageSchema, auth=CachedJWTAuth())
+@query_budget(4)
+def home_timeline(request, limit: int = None, cursor: str = None):
+    return json_response(timeline_page(request.auth, cursor, limit))
+
+
+def _follow_state(user, following):
+    return {"username": user.username, "following": following,
+            "followers_count": get_profile(user).followers_count}
+
+
+@router.post("/users/{username}/follow", response=FollowSchema, auth=CachedJWTAuth())
+@query_budget(14)
+def follow_user(request, username: str):
+    followee = get_object_or_404(User, username=username)
+    if followee.id == request.auth.id:
+        raise HttpError(400, "You can't follow yourself")
+    follow(request.auth, followee)
+    return _follow_state(followee, True)
+
+
+@router.delete("/users/{username}/follow", response=FollowSchema, auth=CachedJWTAuth())
+@query_budget(9)
+def unfollow_user(request, username: str):
+    followee = get_object_or_404(User, username=username)
+    unfollow(request.auth, followee)
+    return _follow_state(followee, False)
 
 
 @router.get("/users/{username}", response=PublicProfileSchema)
-def get_user_profile(request, username: str):
-    user = get_object_or_404(
+@replica_reads
+@conditional(profile_version)
+@query_budget(2)
+async def get_user_profile(request, username: str):
+    user = await aget_object_or_404(
         User.objects.select_related('profile'),
         username=username
     )
-    profile = getattr(user, 'profile', None)
-
-    visited_countries = list(
-        VisitedCountry.objects
-            .filter(user=user)
-            .values_list('country_code', flat=True)
-    )
+    profile = getattr(user, 'profile', None) or await sync_to_async(get_profile)(user)
     return {
         "username": user.username,
         "profile": profile,
-        "stories_count": Post.objects.filter(author=user, is_published=True).count(),
-        "countries_count": len(visited_countries),
-        "visited_countries": visited_countries,
+        "stories_count": profile.stories_count,
+        "countries_count": profile.countries_count,
+        "visited_countries": decode_bitmap(profile.visited_bitmap),
+        "visited_bitmap": profile.visited_bitmap,
     }
\ No newline at end of file
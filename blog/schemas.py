@@ -1,5 +1,22 @@
 from ninja import Schema
 from typing import List, Optional
+from uuid import UUID
+
+from .images import variant_urls
+
+
+class ImageVariantSchema(Schema):
+    name: str
+    format: str
+    url: str
+    width: int
+    height: int
+
+
+class ImageSchema(Schema):
+    width: int
+    height: int
+    variants: List[ImageVariantSchema]
 
 
 class PostCreateSchema(Schema):
@@ -8,11 +25,26 @@ class PostCreateSchema(Schema):
     continent: str
 
 
+class BlockCreateSchema(Schema):
+    type: str
+    content: Optional[str] = None
+    caption: str = ''
+    position: Optional[int] = None
+
+
+class BlockUpdateSchema(Schema):
+    content: Optional[str] = None
+    caption: Optional[str] = None
+    position: Optional[int] = None
+
+
 class PostBlockSchema(Schema):
+    id: int
     type: str
     position: int
     text_content: Optional[str] = None
     image_url: Optional[str] = None
+    image_variants: Optional[ImageSchema] = None
 
     @staticmethod
     def resolve_image_url(obj):
@@ -20,6 +52,12 @@ class PostBlockSchema(Schema):
             return obj.image_content.url
         return None
 
+    @staticmethod
+    def resolve_image_variants(obj):
+        if obj.image_content:
+            return variant_urls(obj.image_meta, obj.image_content.storage)
+        return None
+
 
 class PostDetailSchema(Schema):
     id: int
@@ -28,7 +66,10 @@ class PostDetailSchema(Schema):
     author: str
     location_name: str
     continent: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     cover_image_url: Optional[str] = None
+    cover_image_variants: Optional[ImageSchema] = None
     created_at: str
     blocks: List[PostBlockSchema]
     author_avatar_url: Optional[str] = None
@@ -43,6 +84,12 @@ class PostDetailSchema(Schema):
             return obj.cover_image.url
         return None
 
+    @staticmethod
+    def resolve_cover_image_variants(obj):
+        if obj.cover_image:
+            return variant_urls(obj.cover_image_meta, obj.cover_image.storage)
+        return None
+
     @staticmethod
     def resolve_created_at(obj):
         return obj.created_at.strftime("%d %B %Y")
@@ -61,8 +108,14 @@ class PostListSchema(Schema):
     author: str
     location_name: str
     continent: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     cover_image_url: Optional[str] = None
+    cover_image_variants: Optional[ImageSchema] = None
     created_at: str
+    excerpt: str = ''
+    word_count: int = 0
+    reading_time: int = 0
 
     @staticmethod
     def resolve_author(obj):
@@ -74,11 +127,59 @@ class PostListSchema(Schema):
             return obj.cover_image.url
         return None
 
+    @staticmethod
+    def resolve_cover_image_variants(obj):
+        if obj.cover_image:
+            return variant_urls(obj.cover_image_meta, obj.cover_image.storage)
+        return None
+
     @staticmethod
     def resolve_created_at(obj):
         return obj.created_at.strftime("%d %B %Y")
 
 
+class PostPageSchema(Schema):
+    items: List[PostListSchema]
+    next: Optional[str] = None
+
+
+class MapClusterSchema(Schema):
+    geohash: str
+    count: int
+    latitude: float
+    longitude: float
+    bounds: List[float]
+
+
+class MapViewSchema(Schema):
+    clustered: bool
+    posts: List[PostListSchema]
+    clusters: List[MapClusterSchema]
+
+
+class NearbyPostSchema(PostListSchema):
+    distance_km: float
+
+
+class FollowSchema(Schema):
+    username: str
+    following: bool
+    followers_count: int
+
+
+class UploadCreateSchema(Schema):
+    filename: str
+    size: int
+
+
+class UploadSchema(Schema):
+    id: UUID
+    filename: str
+    size: int
+    offset: int
+    complete: bool
+
+
 class RegisterSchema(Schema):
     username: str
     email: str
@@ -89,15 +190,43 @@ class CountrySchema(Schema):
     country_code: str
 
 
+class CountrySyncSchema(Schema):
+    countries: Optional[List[str]] = None
+    add: List[str] = []
+    remove: List[str] = []
+
+
+class CountrySyncResultSchema(Schema):
+    added: List[str]
+    removed: List[str]
+    countries_count: int
+    visited_countries: List[str]
+    visited_bitmap: str
+
+
+class TravelerRankSchema(Schema):
+    rank: int
+    username: str
+    countries_count: int
+
+
+class CountryRankSchema(Schema):
+    rank: int
+    country_code: str
+    visitors: int
+
+
 class UserProfileSchema(Schema):
     id: int
     username: str
     email: str
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[ImageSchema] = None
     bio: Optional[str] = None
     stories_count: int
     countries_count: int
     visited_countries: List[str]
+    visited_bitmap: str = ''
 
     @staticmethod
     def resolve_avatar_url(obj):
@@ -110,6 +239,17 @@ class UserProfileSchema(Schema):
             return profile.avatar.url
         return None
 
+    @staticmethod
+    def resolve_avatar_variants(obj):
+        profile = None
+        if isinstance(obj, dict):
+            profile = obj.get('profile')
+        elif hasattr(obj, 'profile'):
+            profile = obj.profile
+        if profile and profile.avatar:
+            return variant_urls(profile.avatar_meta, profile.avatar.storage)
+        return None
+
     @staticmethod
     def resolve_bio(obj):
         profile = None
@@ -129,10 +269,12 @@ class ProfileUpdateSchema(Schema):
 class PublicProfileSchema(Schema):
     username: str
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[ImageSchema] = None
     bio: Optional[str] = None
     stories_count: int
     countries_count: int
     visited_countries: List[str]
+    visited_bitmap: str = ''
 
     @staticmethod
     def resolve_avatar_url(obj):
@@ -141,6 +283,13 @@ class PublicProfileSchema(Schema):
             return profile.avatar.url
         return None
 
+    @staticmethod
+    def resolve_avatar_variants(obj):
+        profile = obj.get('profile') if isinstance(obj, dict) else getattr(obj, 'profile', None)
+        if profile and hasattr(profile, 'avatar') and profile.avatar:
+            return variant_urls(profile.avatar_meta, profile.avatar.storage)
+        return None
+
     @staticmethod
     def resolve_bio(obj):
         profile = obj.get('profile') if isinstance(obj, dict) else getattr(obj, 'profile', None)
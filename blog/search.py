@@ -0,0 +1,107 @@
+import re
+
+from django.db import connection
+from ninja.errors import HttpError
+
+from .models import Post
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .utils import strip_html
+
+FTS_TABLE = 'blog_post_fts'
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Postgres: tsvector column on blog_post, weighted title > location > body
+PG_UPDATE = """
+    UPDATE blog_post SET search_vector =
+        setweight(to_tsvector('simple', %s), 'A') ||
+        setweight(to_tsvector('simple', %s), 'B') ||
+        setweight(to_tsvector('simple', %s), 'C')
+    WHERE id = %s
+"""
+PG_SEARCH = """
+    SELECT id FROM blog_post
+    WHERE is_published AND search_vector @@ to_tsquery('simple', %s)
+    ORDER BY ts_rank(search_vector, to_tsquery('simple', %s)) DESC, created_at DESC
+    LIMIT %s OFFSET %s
+"""
+
+# SQLite: FTS5 virtual table keyed by the post id
+FTS_DELETE = f"DELETE FROM {FTS_TABLE} WHERE rowid = %s"
+FTS_INSERT = f"INSERT INTO {FTS_TABLE} (rowid, title, location, body) VALUES (%s, %s, %s, %s)"
+FTS_SEARCH = f"""
+    SELECT p.id FROM {FTS_TABLE} f JOIN blog_post p ON p.id = f.rowid
+    WHERE {FTS_TABLE} MATCH %s AND p.is_published
+    ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 1.0), p.created_at DESC
+    LIMIT %s OFFSET %s
+"""
+
+
+def _document(post):
+    texts = post.blocks.filter(type='text').values_list('text_content', flat=True)
+    body = ' '.join(strip_html(text) for text in texts if text)
+    return post.title, post.location_name, body
+
+
+def index_post(post):
+    """
+    Refreshes the search entry of a single post. Called on every
+    create/update so queries never have to scan post content.
+    """
+    if connection.vendor == 'postgresql':
+        title, location, body = _document(post)
+        with connection.cursor() as cursor:
+            cursor.execute(PG_UPDATE, [title, location, body, post.id])
+    elif connection.vendor == 'sqlite':
+        title, location, body = _document(post)
+        with connection.cursor() as cursor:
+            cursor.execute(FTS_DELETE, [post.id])
+            cursor.execute(FTS_INSERT, [post.id, title, location, body])
+
+
+def unindex_post(post_id):
+    # The Postgres column goes away with the row itself.
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(FTS_DELETE, [post_id])
+
+
+def search_post_ids(query: str, limit: int, offset: int = 0):
+    """Returns ids of published posts matching every word of the query, best first."""
+    tokens = TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return []
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        sql, params = PG_SEARCH, [tsquery, tsquery, limit, offset]
+    elif connection.vendor == 'sqlite':
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        sql, params = FTS_SEARCH, [match, limit, offset]
+    else:
+        return list(
+            Post.objects
+                .filter(is_published=True, title__icontains=query)
+                .order_by('-created_at')
+                .values_list('id', flat=True)[offset:offset + limit]
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_page(query: str, cursor: str = None, limit: int = None) -> dict:
+    """
+    One page of ranked search results. Relevance order has no stable
+    keyset, so the cursor here is simply the offset of the next page.
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    if cursor and not cursor.isdigit():
+        raise HttpError(400, "Invalid cursor")
+    offset = int(cursor or 0)
+
+    ids = search_post_ids(query, limit + 1, offset)
+    page_ids = ids[:limit]
+    posts = Post.objects.select_related('author').in_bulk(page_ids)
+    return {
+        "items": [posts[post_id] for post_id in page_ids if post_id in posts],
+        "next": str(offset + limit) if len(ids) > limit else None,
+    }
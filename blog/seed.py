@@ -0,0 +1,166 @@
+"""
+Deterministic synthetic data for benchmarks: the same arguments and seed
+always produce the same users, posts, blocks and visited countries.
+"""
+import io
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image
+
+from .content import summarize
+from .counters import reconcile_bitmaps, reconcile_counters
+from .geo import locate
+from .iso3166 import ALPHA3
+from .leaderboards import rebuild_leaderboards
+from .models import Post, PostBlock, Profile, VisitedCountry
+from .search import index_post
+
+USERNAME_PREFIX = 'bench_'
+# Posts are spread over the year before this instant, so reseeding gives
+# identical timestamps (and cursors) no matter when it runs.
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+WORDS = (
+    'morning market harbour old town street food train ride mountain trail '
+    'sunset beach temple museum local guide coffee ferry island village '
+    'night bus hostel rooftop view river bridge castle square festival '
+    'hiking valley lake desert camel spice bazaar cathedral tram walking '
+    'tour breakfast noodles wine tasting vineyard glacier fjord canyon'
+).split()
+PLACES = [
+    ('Lisbon, Portugal', 'Europe'), ('Kyoto, Japan', 'Asia'), ('Marrakesh, Morocco', 'Africa'),
+    ('Cusco, Peru', 'South America'), ('Vancouver, Canada', 'North America'),
+    ('Hobart, Australia', 'Oceania'), ('Tbilisi, Georgia', 'Asia'), ('Bergen, Norway', 'Europe'),
+    ('Hoi An, Vietnam', 'Asia'), ('Oaxaca, Mexico', 'North America'),
+    ('Zanzibar, Tanzania', 'Africa'), ('Ushuaia, Argentina', 'South America'),
+]
+
+
+def _sentence(rng, words):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def _paragraph(rng):
+    return ' '.join(_sentence(rng, rng.randint(6, 16)) for _ in range(rng.randint(2, 6)))
+
+
+def _image_pool(rng, size):
+    """A few small JPEGs stored once; seeded blocks and covers share them."""
+    names = []
+    for index in range(size):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 48), color).save(buffer, format='JPEG')
+        names.append(default_storage.save(f'post_images/bench-{index}.jpg', ContentFile(buffer.getvalue())))
+    return names
+
+
+def flush_dataset():
+    """Deletes every seeded user together with their posts and countries."""
+    users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+    count = users.count()
+    users.delete()
+    return count
+
+
+def seed_dataset(users=100, posts=1000, seed=42, blocks=6, image_ratio=0.3,
+                 max_countries=40, batch_size=500, index=True):
+    """
+    Bulk-creates `users` users with profiles, `posts` published posts with
+    about `blocks` blocks each (`image_ratio` of them images) and a random
+    set of visited countries per user. Derived data (counters, bitmaps,
+    leaderboards, search index) is rebuilt at the end.
+    """
+    rng = random.Random(seed)
+    password = make_password(None)
+    images = _image_pool(rng, 6)
+    image_uses = dict.fromkeys(images, 0)
+
+    with transaction.atomic():
+        created_users = User.objects.bulk_create(
+            [
+                User(username=f'{USERNAME_PREFIX}{seed}_{n:05d}',
+                     email=f'{USERNAME_PREFIX}{seed}_{n:05d}@example.com', password=password)
+                for n in range(users)
+            ],
+            batch_size=batch_size,
+        )
+        if not created_users[0].pk:
+            # Backends that don't return ids from bulk inserts
+            created_users = list(
+                User.objects.filter(username__startswith=f'{USERNAME_PREFIX}{seed}_').order_by('username')
+            )
+        Profile.objects.bulk_create(
+            [Profile(user=user, bio=_sentence(rng, 10)) for user in created_users],
+            batch_size=batch_size,
+        )
+        VisitedCountry.objects.bulk_create(
+            [
+                VisitedCountry(user=user, country_code=code)
+                for user in created_users
+                for code in rng.sample(ALPHA3, min(int(rng.expovariate(1 / 8)), max_countries))
+            ],
+            batch_size=batch_size,
+        )
+
+        # A few prolific authors and a long tail, as on the real site
+        weights = [1 / (rank + 1) for rank in range(len(created_users))]
+        authors = rng.choices(created_users, weights=weights, k=posts)
+        timestamps = sorted(
+            (EPOCH - timedelta(seconds=rng.randrange(365 * 24 * 3600)) for _ in range(posts)),
+            reverse=True,
+        )
+        new_posts, all_blocks = [], []
+        for number, (author, created_at) in enumerate(zip(authors, timestamps)):
+            location, continent = rng.choice(PLACES)
+            title = f"{_sentence(rng, rng.randint(2, 5))[:-1]} in {location.split(',')[0]}"
+            post = Post(
+                author=author, title=title, slug=f'bench-{seed}-{number:07d}',
+                location_name=location, continent=continent, is_published=True,
+            )
+            locate(post)
+            if rng.random() < image_ratio:
+                post.cover_image.name = rng.choice(images)
+                image_uses[post.cover_image.name] += 1
+
+            post_blocks, texts = [], []
+            for position in range(max(1, int(rng.gauss(blocks, blocks / 3)))):
+                if rng.random() < image_ratio:
+                    name = rng.choice(images)
+                    image_uses[name] += 1
+                    post_blocks.append(PostBlock(
+                        type='image', position=position, image_content=name,
+                        image_caption=_sentence(rng, 4),
+                    ))
+                else:
+                    text = _paragraph(rng)
+                    texts.append(text)
+                    post_blocks.append(PostBlock(type='text', position=position, text_content=f'<p>{text}</p>'))
+            for field, value in summarize(texts).items():
+                setattr(post, field, value)
+            new_posts.append((post, created_at, post_blocks))
+
+        Post.objects.bulk_create([post for post, _, _ in new_posts], batch_size=batch_size)
+        for post, created_at, post_blocks in new_posts:
+            # auto_now_add/auto_now overwrite these on insert
+            post.created_at = post.updated_at = created_at
+            for block in post_blocks:
+                block.post = post
+                all_blocks.append(block)
+        Post.objects.bulk_update([post for post, _, _ in new_posts], ['created_at', 'updated_at'], batch_size=batch_size)
+        PostBlock.objects.bulk_create(all_blocks, batch_size=batch_size)
+
+    reconcile_counters()
+    reconcile_bitmaps(batch_size)
+    rebuild_leaderboards()
+    if index:
+        for post, _, _ in new_posts:
+            index_post(post)
+    return {"users": len(created_users), "posts": len(new_posts), "blocks": len(all_blocks)}
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+from .images import VARIANT_DIR, strip_metadata
+from .models import MediaBlob
+
+INCOMING_DIR = '.incoming'
+BLOB_DIR = 'blobs'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores every upload under MEDIA_ROOT/blobs/ by the SHA-256 of its bytes,
+    so re-uploading the same photo (on every update_post, or in another
+    post) never writes it twice. Originals lose their EXIF/XMP on the way
+    in (see images.strip_metadata). Each stored name is recorded in MediaBlob.
+    A blob can back any number of fields, so files are never deleted here;
+    `manage.py gc_media` removes the ones nothing references any more.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content is hashed in _save.
+        return name
+
+    def blob_name(self, digest, name):
+        ext = os.path.splitext(name)[1].lower()
+        return f'{BLOB_DIR}/{digest[:2]}/{digest}{ext}'
+
+    def _hash(self, content):
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+        return digest.hexdigest(), size
+
+    def _spool(self, content):
+        """
+        Streams the upload into a temp file under .incoming/, hashing it on
+        the way, so the content is read only once.
+        """
+        incoming = os.path.join(self.location, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=incoming)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        return digest.hexdigest(), size, tmp_path
+
+    def _save(self, name, content):
+        # Originals are published as uploaded, so their location and camera
+        # metadata go before anything is written; variants are rendered clean
+        if not name.startswith(f'{VARIANT_DIR}/'):
+            content = strip_metadata(content) or content
+        # Uploads Django already spooled to disk are hashed in place and
+        # moved; everything else is copied once into .incoming/
+        on_disk = hasattr(content, 'temporary_file_path')
+        if on_disk:
+            digest, size = self._hash(content)
+            source = content.temporary_file_path()
+        else:
+            digest, size, source = self._spool(content)
+        name = self.blob_name(digest, name)
+        full_path = self.path(name)
+        try:
+            try:
+                # A reused blob counts as new for gc_media's grace period
+                os.utime(full_path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if on_disk:
+                    file_move_safe(source, full_path)
+                else:
+                    # Same filesystem, so readers never observe a half-written blob
+                    os.replace(source, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        finally:
+            if not on_disk and os.path.exists(source):
+                os.unlink(source)
+        MediaBlob.objects.bulk_create(
+            [MediaBlob(name=name, sha256=digest, size=size)], ignore_conflicts=True,
+        )
+        return name
@@ -1,8 +1,48 @@
-from django.test import TestCase, Client
+from django.conf import settings
+from django.test import TestCase, AsyncClient, Client, override_settings
+from django.core.management import call_command
 from django.contrib.auth.models import User
-from .models import Post, Profile, VisitedCountry
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils import timezone
+from django.utils.http import http_date
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .models import (
+    CountryPopularity, Job, MediaBlob, MediaSweep, Post, PostBlock, Profile, TravelerBucket, Upload, VisitedCountry,
+)
+from .cache import get_cache_stats, reset_cache_stats
+from .auth import user_cache
+from .bench import BENCH_PASSWORD, InProcessRunner, build_scenarios, run_bench
+from .budgets import over_budget, route_budgets
+from .seed import seed_dataset
+from .images import process_image, queue_variants
+from .counters import adjust_counters, get_profile, reconcile_counters, refresh_counters
+from .leaderboards import rebuild_leaderboards
+from .blocks import delete_block, move_block
+from .uploads import append_chunk, claim_uploads, create_upload, part_path
+from .jobs import claim, run_job
+from .media_gc import sweep
+from .geo import encode, geocode, locate
+from .iso3166 import decode_bitmap
+from ninja.errors import HttpError
+from ninja_jwt.tokens import AccessToken
+from PIL import Image
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
+import io
 import json
+import os
+import tempfile
+import time
+import unittest
+import uuid
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class TripTalesTestCase(TestCase):
     def setUp(self):
         # 1. Create a test client and user        
@@ -100,4 +140,1188 @@ class TripTalesTestCase(TestCase):
         # Attempt to create a post WITHOUT a token (should be a 401 error)
         response = self.client.post('/api/posts/create', {'title': 'Hack attempt'})
         self.assertEqual(response.status_code, 401)
-        print("✅ Unauthorized Write Protection: OK")
\ No newline at end of file
+        print("✅ Unauthorized Write Protection: OK")
+
+    def test_4_feed_cursor_pagination(self):
+        """Test: Walking the public feed page by page with a cursor"""
+        print("\n--- TEST 4: Feed Cursor Pagination ---")
+
+        for i in range(5):
+            Post.objects.create(
+                author=self.user, title=f'Trip {i}', slug=f'trip-{i}',
+                location_name='Rome, Italy', is_published=True
+            )
+
+        response = self.client.get('/api/posts', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        page = response.json()
+        self.assertEqual([p['slug'] for p in page['items']], ['trip-4', 'trip-3'])
+        self.assertIsNotNone(page['next'])
+
+        seen = [p['slug'] for p in page['items']]
+        while page['next']:
+            page = self.client.get('/api/posts', {'limit': 2, 'cursor': page['next']}).json()
+            seen += [p['slug'] for p in page['items']]
+        self.assertEqual(seen, [f'trip-{i}' for i in reversed(range(5))])
+        print("✅ Cursor Walk: OK")
+
+        # Without limit/cursor the feed keeps returning a plain list
+        response = self.client.get('/api/posts')
+        self.assertEqual(len(response.json()), 5)
+
+        response = self.client.get('/api/posts', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+        print("✅ Invalid Cursor Rejected: OK")
+
+
+    def test_5_post_detail_cache(self):
+        """Test: Post detail is served from cache until the post is updated"""
+        print("\n--- TEST 5: Post Detail Cache ---")
+        Post.objects.create(
+            author=self.user, title='Lisbon', slug='lisbon-cache',
+            location_name='Lisbon, Portugal', is_published=True
+        )
+        reset_cache_stats()
+
+        self.client.get('/api/posts/lisbon-cache')
+        # Only the ETag version probe touches the database
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/posts/lisbon-cache')
+        self.assertEqual(response.json()['title'], 'Lisbon')
+        self.assertEqual(get_cache_stats()['hits'], 1)
+        self.assertEqual(get_cache_stats()['misses'], 1)
+        print("✅ Cache Hit: OK")
+
+        response = self.client.post('/api/posts/lisbon-cache/update', data={
+            'title': 'Lisbon Again',
+            'continent': 'Europe',
+            'location_name': 'Lisbon, Portugal',
+            'blocks_data': '[]',
+        }, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/posts/lisbon-cache')
+        self.assertEqual(response.json()['title'], 'Lisbon Again')
+        print("✅ Invalidate On Update: OK")
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (32, 32), 'olive').save(buffer, 'PNG')
+        avatar = SimpleUploadedFile('me.png', buffer.getvalue(), content_type='image/png')
+        response = self.client.post('/api/me/update', data={'avatar': avatar}, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.profile.refresh_from_db()
+        response = self.client.get('/api/posts/lisbon-cache')
+        self.assertEqual(response.json()['author_avatar_url'], self.profile.avatar.url)
+        print("✅ Invalidate On Avatar Change: OK")
+
+
+    def test_6_block_diff_update(self):
+        """Test: Updating a story only rewrites the blocks that changed"""
+        print("\n--- TEST 6: Block Diff Update ---")
+        post = Post.objects.create(
+            author=self.user, title='Oslo', slug='oslo-blocks',
+            location_name='Oslo, Norway', is_published=True
+        )
+        first = PostBlock.objects.create(post=post, type='text', position=0, text_content='Day one')
+        second = PostBlock.objects.create(post=post, type='text', position=1, text_content='Day two')
+        photo = PostBlock.objects.create(
+            post=post, type='image', position=2,
+            image_content=SimpleUploadedFile('fjord.jpg', b'jpeg-bytes', content_type='image/jpeg')
+        )
+        photo_url = photo.image_content.url
+
+        blocks = [
+            {'type': 'text', 'content': 'Day one'},
+            {'type': 'image', 'existing_url': photo_url},
+            {'type': 'text', 'content': 'Day <b style="color: red">three</b>'},
+        ]
+        response = self.client.post('/api/posts/oslo-blocks/update', data={
+            'title': 'Oslo',
+            'continent': 'Europe',
+            'location_name': 'Oslo, Norway',
+            'blocks_data': json.dumps(blocks),
+        }, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+
+        # The photo keeps its row at its new position; the freed row takes
+        # the new paragraph
+        stored = list(post.blocks.order_by('position'))
+        self.assertEqual([b.pk for b in stored], [first.pk, photo.pk, second.pk])
+        self.assertEqual(stored[1].image_content.name, photo.image_content.name)
+        self.assertEqual(stored[2].text_content, 'Day <b>three</b>')
+        print("✅ Rows Reused In Place: OK")
+
+        # A paragraph added at the top is one INSERT plus position-only
+        # updates for the rows below it
+        blocks.insert(0, {'type': 'text', 'content': 'Prologue'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/posts/oslo-blocks/update', data={
+                'title': 'Oslo', 'continent': 'Europe', 'location_name': 'Oslo, Norway',
+                'blocks_data': json.dumps(blocks),
+            }, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        block_writes = [q['sql'] for q in queries.captured_queries
+                        if q['sql'].startswith(('UPDATE "blog_postblock"', 'INSERT INTO "blog_postblock"'))]
+        self.assertEqual(len(block_writes), 2)
+        self.assertTrue(block_writes[0].startswith('UPDATE "blog_postblock" SET "position" = CASE'))
+        self.assertEqual(
+            list(post.blocks.order_by('position').values_list('pk', flat=True))[1:],
+            [first.pk, photo.pk, second.pk],
+        )
+        print("✅ Moved Rows Keep Content: OK")
+
+
+    def test_7_image_variants(self):
+        """Test: Covers get resized, EXIF-free variants exposed through the API"""
+        print("\n--- TEST 7: Image Variants ---")
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90° clockwise
+        exif[0x8825] = {1: 'N', 2: (35.0, 41.0, 22.0)}  # GPS latitude
+        buffer = io.BytesIO()
+        Image.new('RGB', (1600, 800), 'teal').save(buffer, 'JPEG', exif=exif)
+
+        post = Post.objects.create(
+            author=self.user, title='Tokyo', slug='tokyo-variants',
+            location_name='Tokyo, Japan', is_published=True,
+            cover_image=SimpleUploadedFile('tokyo.jpg', buffer.getvalue(), content_type='image/jpeg')
+        )
+        process_image(Post, post.pk, 'cover_image')
+
+        cover = self.client.get('/api/posts/tokyo-variants').json()['cover_image_variants']
+        self.assertEqual((cover['width'], cover['height']), (800, 1600))
+        thumb = next(v for v in cover['variants'] if v['name'] == 'thumb' and v['format'] == 'webp')
+        self.assertEqual((thumb['width'], thumb['height']), (200, 400))
+        print("✅ Orientation And Sizes: OK")
+
+        post.refresh_from_db()
+        path = next(v['path'] for v in post.cover_image_meta['variants'] if v['format'] == 'jpeg')
+        with post.cover_image.storage.open(path) as fh:
+            self.assertNotIn(0x0112, Image.open(fh).getexif())
+        # The original is served too, so it is stored without EXIF and upright
+        url = self.client.get('/api/posts/tokyo-variants').json()['cover_image_url']
+        self.assertEqual(url, post.cover_image.url)
+        with post.cover_image.open('rb') as fh:
+            original = Image.open(fh)
+            self.assertEqual(len(original.getexif()), 0)
+            self.assertEqual(original.size, (800, 1600))
+
+        # Originals stored before stripping are cleaned up by the backfill
+        legacy = FileSystemStorage(location=post.cover_image.storage.location).save(
+            'covers/legacy.jpg', ContentFile(buffer.getvalue()))
+        Post.objects.filter(pk=post.pk).update(cover_image=legacy)
+        call_command('build_image_variants', strip_originals=True, stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertNotEqual(post.cover_image.name, legacy)
+        self.assertEqual(post.cover_image_meta['source'], post.cover_image.name)
+        with post.cover_image.open('rb') as fh:
+            self.assertEqual(len(Image.open(fh).getexif()), 0)
+        print("✅ EXIF Stripped: OK")
+
+
+    def test_8_content_addressed_media(self):
+        """Test: Identical uploads share one file and leave no temp files behind"""
+        print("\n--- TEST 8: Content-Addressed Media ---")
+        first = default_storage.save('covers/paris.JPG', ContentFile(b'same-bytes'))
+        second = default_storage.save('post_images/copy.jpg', ContentFile(b'same-bytes'))
+        other = default_storage.save('covers/paris.jpg', ContentFile(b'other-bytes'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(MediaBlob.objects.filter(name=first).count(), 1)
+        with default_storage.open(first) as fh:
+            self.assertEqual(fh.read(), b'same-bytes')
+        print("✅ Deduplicated Write: OK")
+
+        incoming = default_storage.path('.incoming')
+        leftovers = [e.name for e in os.scandir(incoming) if e.is_file()] if os.path.isdir(incoming) else []
+        self.assertEqual(leftovers, [])
+        print("✅ Single Pass Spool: OK")
+
+
+    def test_9_search(self):
+        """Test: Searching stories by title, location and block text"""
+        print("\n--- TEST 9: Search ---")
+        for title, location, text in [
+            ('Temples at dawn', 'Kyoto, Japan', '<p>Quiet <b>gardens</b> and tea</p>'),
+            ('Night markets', 'Taipei, Taiwan', '<p>Street food and tea houses</p>'),
+            ('Fjord cruise', 'Bergen, Norway', '<p>Cold wind</p>'),
+        ]:
+            response = self.client.post('/api/posts/create', data={
+                'title': title,
+                'continent': 'Asia',
+                'location_name': location,
+                'blocks_data': json.dumps([{'type': 'text', 'content': text}]),
+            }, **self.auth_headers)
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.get('/api/posts/search', {'q': 'garden'})
+        self.assertEqual([p['title'] for p in response.json()['items']], ['Temples at dawn'])
+        response = self.client.get('/api/posts/search', {'q': 'norway'})
+        self.assertEqual([p['title'] for p in response.json()['items']], ['Fjord cruise'])
+        print("✅ Ranked Matches: OK")
+
+        page = self.client.get('/api/posts/search', {'q': 'tea', 'limit': 1}).json()
+        self.assertEqual(len(page['items']), 1)
+        page = self.client.get('/api/posts/search', {'q': 'tea', 'limit': 1, 'cursor': page['next']}).json()
+        self.assertEqual(len(page['items']), 1)
+        self.assertIsNone(page['next'])
+        print("✅ Paginated Results: OK")
+
+
+    def test_10_profile_counters(self):
+        """Test: Profile stats are kept on the profile row and repairable"""
+        print("\n--- TEST 10: Profile Counters ---")
+        for code in ('FRA', 'ITA', 'FRA'):
+            self.client.post('/api/countries', data=json.dumps({"country_code": code}),
+                             content_type='application/json', **self.auth_headers)
+        response = self.client.post('/api/posts/create', data={
+            'title': 'Alps', 'continent': 'Europe', 'location_name': 'Zermatt, Switzerland',
+            'blocks_data': '[]',
+        }, **self.auth_headers)
+        slug = response.json()['slug']
+
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.stories_count, self.profile.countries_count), (1, 1))
+        response = self.client.get(f'/api/users/{self.user.username}').json()
+        self.assertEqual((response['stories_count'], response['countries_count']), (1, 1))
+        self.client.get('/api/me', **self.auth_headers)
+        # The stats come from the profile row: one SELECT, no COUNTs
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/me', **self.auth_headers).json()
+        self.assertEqual((response['stories_count'], response['countries_count']), (1, 1))
+        print("✅ Incremental Counters: OK")
+
+        self.client.delete(f'/api/posts/{slug}', **self.auth_headers)
+        Profile.objects.filter(pk=self.profile.pk).update(countries_count=7)
+        self.assertEqual(reconcile_counters(), 1)
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.stories_count, self.profile.countries_count), (0, 1))
+        print("✅ Reconcile Drift: OK")
+
+
+    def test_11_bulk_country_sync(self):
+        """Test: Syncing the visited set in one request and reading it back"""
+        print("\n--- TEST 11: Bulk Country Sync ---")
+        response = self.client.put('/api/countries',
+            data=json.dumps({"countries": ["fra", "ITA", "JPN"]}),
+            content_type='application/json', **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['added'], ['FRA', 'ITA', 'JPN'])
+
+        response = self.client.put('/api/countries',
+            data=json.dumps({"add": ["PER"], "remove": ["ITA"]}),
+            content_type='application/json', **self.auth_headers)
+        self.assertEqual(response.json()['visited_countries'], ['FRA', 'JPN', 'PER'])
+        print("✅ Full Set And Diff Sync: OK")
+
+        response = self.client.put('/api/countries',
+            data=json.dumps({"add": ["XYZ"]}),
+            content_type='application/json', **self.auth_headers)
+        self.assertEqual(response.status_code, 400)
+        print("✅ Unknown Code Rejected: OK")
+
+        # ETag version probe + the profile row
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/users/{self.user.username}')
+        self.assertEqual(response.json()['visited_countries'], ['FRA', 'JPN', 'PER'])
+        self.assertEqual(response.json()['countries_count'], 3)
+        print("✅ Profile Reads Bitmap: OK")
+
+        # Rows saved before codes were validated: Natural Earth's -99 placeholder and lowercase codes
+        VisitedCountry.objects.bulk_create(
+            VisitedCountry(user=self.user, country_code=code) for code in ('-99', 'per', 'chl')
+        )
+        Profile.objects.filter(pk=self.profile.pk).update(countries_count=6)
+        migration = import_module('blog.migrations.0021_normalize_country_codes')
+        migration.normalize_country_codes(apps, SimpleNamespace(connection=connection))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.countries_count, 4)
+        self.assertEqual(decode_bitmap(self.profile.visited_bitmap), ['CHL', 'FRA', 'JPN', 'PER'])
+        self.assertEqual(VisitedCountry.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(CountryPopularity.objects.get(country_code='CHL').visitors, 1)
+
+        response = self.client.post('/api/countries', data=json.dumps({"country_code": "XKX"}),
+                                    content_type='application/json', **self.auth_headers)
+        self.assertEqual(response.json()['status'], 'added')
+        self.assertEqual(CountryPopularity.objects.get(country_code='XKX').visitors, 1)
+        print("✅ Invalid Codes Normalized: OK")
+
+
+    def test_12_leaderboards(self):
+        """Test: Traveler and country rankings follow country toggles"""
+        print("\n--- TEST 12: Leaderboards ---")
+        other = User.objects.create_user(username='globetrotter', password='another_pass_456')
+        other_token = self.client.post('/api/token/pair',
+            data=json.dumps({"username": "globetrotter", "password": "another_pass_456"}),
+            content_type='application/json'
+        ).json()['access']
+
+        self.client.put('/api/countries', data=json.dumps({"countries": ["FRA", "ITA", "ESP"]}),
+                        content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {other_token}')
+        for code in ('FRA', 'PRT'):
+            self.client.post('/api/countries', data=json.dumps({"country_code": code}),
+                             content_type='application/json', **self.auth_headers)
+
+        travelers = self.client.get('/api/leaderboards/travelers').json()
+        self.assertEqual([(t['rank'], t['username']) for t in travelers],
+                         [(1, 'globetrotter'), (2, 'test_traveler')])
+        response = self.client.get('/api/leaderboards/travelers/test_traveler').json()
+        self.assertEqual(response['rank'], 2)
+        print("✅ Traveler Ranking: OK")
+
+        countries = self.client.get('/api/leaderboards/countries', {'limit': 1}).json()
+        self.assertEqual(countries, [{'rank': 1, 'country_code': 'FRA', 'visitors': 2}])
+        self.assertEqual(self.client.get('/api/leaderboards/countries/prt').json()['rank'], 2)
+        print("✅ Country Ranking: OK")
+
+        rebuild_leaderboards()
+        self.assertEqual(self.client.get('/api/leaderboards/travelers').json(), travelers)
+        print("✅ Rebuild Matches Incremental: OK")
+
+        # Recounts and late-created profiles move users between buckets too
+        VisitedCountry.objects.bulk_create([VisitedCountry(user=self.user, country_code=code) for code in ('DEU', 'AUT')])
+        refresh_counters(self.user.id)
+        newcomer = User.objects.create_user(username='newcomer', password='pw-newcomer-123')
+        VisitedCountry.objects.create(user=newcomer, country_code='JPN')
+        get_profile(newcomer)
+        travelers = self.client.get('/api/leaderboards/travelers').json()
+        self.assertEqual([(t['rank'], t['username']) for t in travelers],
+                         [(1, 'test_traveler'), (2, 'globetrotter'), (3, 'newcomer')])
+        self.assertEqual(self.client.get('/api/leaderboards/travelers/newcomer').json()['rank'], 3)
+        buckets = list(TravelerBucket.objects.filter(users__gt=0).values_list('countries_count', 'users'))
+        rebuild_leaderboards()
+        self.assertEqual(list(TravelerBucket.objects.filter(users__gt=0).values_list('countries_count', 'users')),
+                         buckets)
+        print("✅ Recount Keeps Buckets: OK")
+
+
+    def test_13_content_summary(self):
+        """Test: Excerpt and reading time are computed at save time"""
+        print("\n--- TEST 13: Content Summary ---")
+        paragraph = '<p style="color: red">' + 'word ' * 450 + '</p><script>alert(1)</script>'
+        response = self.client.post('/api/posts/create', data={
+            'title': 'Long read', 'continent': 'Europe', 'location_name': 'Vienna, Austria',
+            'blocks_data': json.dumps([{'type': 'text', 'content': paragraph}]),
+        }, **self.auth_headers)
+        slug = response.json()['slug']
+
+        block = PostBlock.objects.get(post__slug=slug)
+        self.assertNotIn('style', block.text_content)
+        self.assertNotIn('script', block.text_content)
+        feed = self.client.get('/api/posts').json()
+        self.assertEqual((feed[0]['word_count'], feed[0]['reading_time']), (450, 3))
+        self.assertTrue(feed[0]['excerpt'].endswith('…'))
+        self.assertLessEqual(len(feed[0]['excerpt']), 201)
+        print("✅ Summary On Save: OK")
+
+        Post.objects.filter(slug=slug).update(excerpt='', word_count=0, content_version=0)
+        PostBlock.objects.filter(pk=block.pk).update(text_content='<p style="x">Hi&nbsp;there</p>')
+        call_command('rerender_content', stdout=io.StringIO())
+        post = Post.objects.get(slug=slug)
+        self.assertEqual((post.excerpt, post.word_count), ('Hi there', 2))
+        self.assertEqual(post.blocks.get().text_content, '<p>Hi there</p>')
+        print("✅ Batch Re-render: OK")
+
+
+    def test_14_conditional_get(self):
+        """Test: Unchanged feed, post and profile answer 304 to revalidation"""
+        print("\n--- TEST 14: Conditional GET ---")
+        Post.objects.create(
+            author=self.user, title='Seoul', slug='seoul-etag',
+            location_name='Seoul, South Korea', is_published=True
+        )
+        for url in ('/api/posts', '/api/posts/seoul-etag', f'/api/users/{self.user.username}'):
+            response = self.client.get(url)
+            etag = response.headers['ETag']
+            self.assertNotIn('Last-Modified', response.headers)
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+        print("✅ Not Modified: OK")
+
+        etag = self.client.get('/api/posts').headers['ETag']
+        post = Post.objects.get(slug='seoul-etag')
+        post.title = 'Seoul by night'
+        post.save()
+        response = self.client.get('/api/posts', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+        etag = self.client.get(f'/api/users/{self.user.username}').headers['ETag']
+        response = self.client.post('/api/me/update', data={'bio': 'Back from Seoul'}, **self.auth_headers)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/users/{self.user.username}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['bio'], 'Back from Seoul')
+        print("✅ Changed After Edit: OK")
+
+        # Deletes and counter updates move no timestamp; neither validator may
+        # still match afterwards
+        Post.objects.create(
+            author=self.user, title='Busan', slug='busan-etag',
+            location_name='Busan, South Korea', is_published=True
+        )
+        since = http_date(time.time() + 60)
+        etag = self.client.get('/api/posts').headers['ETag']
+        Post.objects.get(slug='busan-etag').delete()
+        response = self.client.get('/api/posts', HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        url = f'/api/users/{self.user.username}'
+        etag = self.client.get(url).headers['ETag']
+        adjust_counters(self.user.id, countries=1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['countries_count'], 1)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        print("✅ Changed Without Timestamp: OK")
+
+    async def test_15_async_read_path(self):
+        """Test: Public reads run as async views and serve the same payloads"""
+        print("\n--- TEST 15: Async Read Path ---")
+        await Post.objects.acreate(
+            author=self.user, title='Kyoto', slug='kyoto-async',
+            location_name='Kyoto, Japan', is_published=True
+        )
+        client = AsyncClient()
+        response = await client.get('/api/posts')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['slug'] for p in response.json()], ['kyoto-async'])
+
+        response = await client.get('/api/posts', {'limit': 1})
+        self.assertEqual(response.json()['items'][0]['slug'], 'kyoto-async')
+
+        detail = await client.get('/api/posts/kyoto-async')
+        cached = await client.get('/api/posts/kyoto-async')
+        self.assertEqual(detail.json()['title'], 'Kyoto')
+        self.assertEqual(detail.content, cached.content)
+
+        response = await client.get(f'/api/users/{self.user.username}')
+        self.assertEqual(response.json()['stories_count'], 0)
+        response = await client.get(
+            f'/api/users/{self.user.username}', headers={'If-None-Match': response.headers['ETag']}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = await client.get('/api/posts/missing-slug')
+        self.assertEqual(response.status_code, 404)
+        print("✅ Async Handlers: OK")
+
+    def test_16_cached_jwt_auth(self):
+        """Test: Warm requests resolve the user without a query; saves evict it"""
+        print("\n--- TEST 16: Cached JWT Auth ---")
+        self.client.get('/api/me', **self.auth_headers)
+        # Only the profile lookup is left; the user comes from the cache
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/me', **self.auth_headers)
+        self.assertEqual(response.json()['username'], 'test_traveler')
+        print("✅ Cached User: OK")
+
+        self.user.set_password('new_password_456')
+        self.user.save()
+        self.assertIsNone(user_cache.get(self.user.id))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/me', **self.auth_headers)
+        self.assertEqual(response.status_code, 401)
+        print("✅ Evicted On Save: OK")
+
+
+    def test_17_route_metrics(self):
+        """Test: Requests are recorded per route template and exposed to Prometheus"""
+        print("\n--- TEST 17: Route Metrics ---")
+        Post.objects.create(
+            author=self.user, title='Oslo', slug='oslo-metrics',
+            location_name='Oslo, Norway', is_published=True
+        )
+        self.client.get('/api/posts/oslo-metrics')
+
+        response = self.client.get('/api/metrics', **self.auth_headers)
+        self.assertEqual(response.status_code, 403)
+        with override_settings(METRICS_TOKEN='scrape-me'):
+            response = self.client.get('/api/metrics', HTTP_AUTHORIZATION='Bearer scrape-me')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('route="/api/posts/{slug}"', body)
+        self.assertNotIn('oslo-metrics', body)
+        for name in ('request_duration_seconds', 'request_db_queries', 'request_db_seconds',
+                     'response_size_bytes'):
+            self.assertIn(f'triptales_{name}_bucket', body)
+        print("✅ Prometheus Exposition: OK")
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get('/api/metrics', **self.auth_headers).status_code, 200)
+        print("✅ Staff Access: OK")
+
+    def test_18_seed_and_bench(self):
+        """Test: Seeded data is deterministic and the bench harness covers every route"""
+        print("\n--- TEST 18: Seed & Bench ---")
+        result = seed_dataset(users=5, posts=12, seed=3, index=False)
+        self.assertEqual(result['posts'], 12)
+        titles = list(Post.objects.filter(slug__startswith='bench-3-').order_by('slug').values_list('title', flat=True))
+        seeded = Profile.objects.filter(user__username__startswith='bench_3_')
+        self.assertEqual(sum(seeded.values_list('stories_count', flat=True)), 12)
+        Post.objects.filter(slug__startswith='bench-3-').delete()
+        User.objects.filter(username__startswith='bench_3_').delete()
+        seed_dataset(users=5, posts=12, seed=3, index=False)
+        self.assertEqual(
+            titles,
+            list(Post.objects.filter(slug__startswith='bench-3-').order_by('slug').values_list('title', flat=True)),
+        )
+        print("✅ Deterministic Seed: OK")
+
+        report = run_bench(iterations=2, warmup=0, only=['feed_page', 'post_detail', 'me', 'post_create'])
+        self.assertEqual(report['uncovered'], [])
+        for name, stats in report['results'].items():
+            self.assertEqual(stats['errors'], 0, name)
+            self.assertIsNotNone(stats['p95_ms'])
+        self.assertEqual(Post.objects.filter(slug__startswith='bench-3-').count(), 12)
+        print("✅ Bench Report: OK")
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_19_query_budgets(self):
+        """Test: Every route stays within its SQL query budget, whatever the data size"""
+        print("\n--- TEST 19: Query Budgets ---")
+        from .api import api
+        declared = route_budgets()
+        for prefix, router in api._routers:
+            for path, path_view in router.path_operations.items():
+                for operation in path_view.operations:
+                    if not operation.view_func.__module__.startswith('blog.routers'):
+                        continue
+                    self.assertTrue(hasattr(operation.view_func, 'query_budget'), operation.view_func.__name__)
+        # Batched by design: one blocks prefetch per export.BATCH_SIZE posts
+        self.assertIsNone(over_budget('GET', '/api/me/export', 50))
+        print("✅ Budgets Declared: OK")
+
+        self.user.set_password(BENCH_PASSWORD)
+        self.user.save()
+        post = Post.objects.create(
+            author=self.user, title="Harbour walk in Lisbon", slug='budget-post',
+            location_name='Lisbon, Portugal', continent='Europe', is_published=True,
+        )
+        locate(post)
+        post.save()
+        PostBlock.objects.create(post=post, type='text', position=0, text_content='<p>Harbour</p>')
+        PostBlock.objects.create(post=post, type='text', position=1, text_content='<p>Tram</p>')
+        followee = User.objects.create_user(username='budget_followee', password='unused')
+        Post.objects.create(author=followee, title="Dunes", slug='budget-dunes', location_name='Merzouga',
+                            is_published=True)
+        fixture = {
+            "user": self.user, "followee": followee, "post": post, "country": 'FRA', "search": 'Harbour',
+            "blocks": list(post.blocks.order_by('position').values('id', 'type', 'text_content', 'image_caption')),
+        }
+
+        counts, scenarios = {}, {}
+        # Seeded cumulatively: 1, 10 and 100 posts, all owned by the test user
+        for seed, rows in ((1, 1), (2, 9), (3, 90)):
+            seed_dataset(users=rows, posts=rows, seed=seed, index=False)
+            Post.objects.filter(slug__startswith=f'bench-{seed}-').update(author=self.user)
+            runner = InProcessRunner(str(AccessToken.for_user(self.user)))
+            for scenario in build_scenarios(fixture):
+                runner(scenario)  # warm-up: first-use caches
+                user_cache.clear()
+                if scenario.before:
+                    scenario.before()
+                status, _, queries = runner(scenario)
+                self.assertEqual(status, scenario.expected, scenario.name)
+                scenarios[scenario.name] = scenario
+                counts.setdefault(scenario.name, []).append(queries)
+
+        for name, measured in counts.items():
+            scenario = scenarios[name]
+            self.assertEqual(len(set(measured)), 1, f"{scenario.name} queries grow with data: {measured}")
+            budget = declared.get((scenario.method, scenario.route))
+            if budget is not None:
+                self.assertLessEqual(measured[0], budget, scenario.name)
+        print("✅ Constant Query Counts: OK")
+
+    def test_20_projection_list_serialization(self):
+        """Test: List endpoints built from .values() rows match PostListSchema byte for byte"""
+        print("\n--- TEST 20: Projection Serialization ---")
+        from ninja.responses import NinjaJSONEncoder
+        from .schemas import PostListSchema
+        meta = {
+            "source": 'covers/harbour view.jpg', "width": 800, "height": 600,
+            "variants": [{"name": 'w480', "format": 'webp', "path": 'variants/harbour view-480.webp',
+                          "width": 480, "height": 360}],
+        }
+        for n in range(3):
+            post = Post.objects.create(
+                author=self.user, title=f"Story {n}", slug=f'story-{n}', location_name='Porto, Portugal',
+                continent='Europe', is_published=True, excerpt='Tiles and wine', word_count=120 + n,
+                reading_time=1,
+            )
+            if n != 1:
+                post.cover_image.name = 'covers/harbour view.jpg'
+                post.cover_image_meta = meta
+                post.save()
+
+        def expected(posts):
+            return [PostListSchema.from_orm(post).model_dump() for post in posts]
+
+        published = Post.objects.filter(is_published=True).select_related('author').order_by('-created_at', '-id')
+        response = self.client.get('/api/posts')
+        self.assertEqual(response['Content-Type'], 'application/json; charset=utf-8')
+        self.assertEqual(response.content.decode(), json.dumps(expected(published), cls=NinjaJSONEncoder))
+        self.assertIn('/media/covers/harbour%20view.jpg', response.json()[0]['cover_image_url'])
+
+        response = self.client.get('/api/posts/my-posts?limit=2', **self.auth_headers)
+        page = response.json()
+        self.assertEqual(
+            json.dumps(page['items'], cls=NinjaJSONEncoder),
+            json.dumps(expected(published[:2]), cls=NinjaJSONEncoder),
+        )
+        rest = self.client.get(f"/api/posts/my-posts?limit=2&cursor={page['next']}", **self.auth_headers).json()
+        self.assertEqual([item['slug'] for item in rest['items']], ['story-0'])
+        self.assertIsNone(rest['next'])
+        print("✅ Byte-identical Lists: OK")
+
+    def test_21_streaming_export(self):
+        """Test: The archive export streams every post with blocks, profile and countries"""
+        print("\n--- TEST 21: Streaming Export ---")
+        from asgiref.sync import async_to_sync
+        other = User.objects.create_user(username='other_traveler', password='pw-other-123')
+        Post.objects.create(author=other, title='Not mine', slug='not-mine', location_name='Oslo', is_published=True)
+        for n in range(3):
+            post = Post.objects.create(
+                author=self.user, title=f'Trip {n}', slug=f'trip-{n}', location_name='Quito',
+                continent='South America', is_published=n != 2,
+            )
+            PostBlock.objects.create(post=post, type='text', position=1, text_content=f'<p>Day two of {n}</p>')
+            PostBlock.objects.create(post=post, type='text', position=0, text_content=f'<p>Day one of {n}</p>')
+        VisitedCountry.objects.create(user=self.user, country_code='ECU')
+
+        with mock.patch('blog.export.FLUSH_BYTES', 1):
+            response = self.client.get('/api/me/export', **self.auth_headers)
+            self.assertTrue(response.streaming)
+            chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 3)
+        self.assertIn('triptales-test_traveler.json', response['Content-Disposition'])
+        archive = json.loads(b''.join(chunks))
+        self.assertEqual(archive['profile']['username'], 'test_traveler')
+        self.assertEqual(archive['visited_countries'], ['ECU'])
+        self.assertEqual([p['slug'] for p in archive['posts']], ['trip-0', 'trip-1', 'trip-2'])
+        self.assertFalse(archive['posts'][2]['is_published'])
+        self.assertEqual(
+            [b['text_content'] for b in archive['posts'][0]['blocks']],
+            ['<p>Day one of 0</p>', '<p>Day two of 0</p>'],
+        )
+        print("✅ JSON Export: OK")
+
+        response = self.client.get('/api/me/export?format=ndjson', **self.auth_headers)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([line['type'] for line in lines], ['profile', 'countries', 'post', 'post', 'post'])
+
+        async def fetch_async():
+            response = await AsyncClient().get('/api/me/export', headers={'Authorization': f'Bearer {self.token}'})
+            return b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(async_to_sync(fetch_async)()), archive)
+
+        self.assertEqual(self.client.get('/api/me/export?format=xml', **self.auth_headers).status_code, 400)
+        self.assertEqual(self.client.get('/api/me/export').status_code, 401)
+        print("✅ NDJSON & ASGI Export: OK")
+
+    @override_settings(TIMELINE_CELEBRITY_FOLLOWERS=2)
+    def test_22_home_timeline(self):
+        """Test: Follows fan new posts out to timelines, with celebrities merged in on read"""
+        print("\n--- TEST 22: Home Timeline ---")
+        from .models import Follow, TimelineEntry
+        from .timeline import fan_out, follow, unfollow
+        author = User.objects.create_user(username='followed_author', password='pw-author-123')
+        star = User.objects.create_user(username='famous_author', password='pw-star-123')
+        fan = User.objects.create_user(username='other_fan', password='pw-fan-123')
+        Post.objects.create(author=author, title='Older trip', slug='older-trip', location_name='Rome',
+                            is_published=True)
+        Post.objects.create(author=author, title='Draft', slug='draft-trip', location_name='Rome')
+
+        response = self.client.post('/api/users/followed_author/follow', **self.auth_headers)
+        self.assertEqual(response.json(), {"username": 'followed_author', "following": True, "followers_count": 1})
+        self.client.post('/api/users/followed_author/follow', **self.auth_headers)
+        self.assertEqual(Profile.objects.get(user=author).followers_count, 1)
+        self.assertEqual(Profile.objects.get(user=self.user).following_count, 1)
+        self.assertEqual(self.client.post('/api/users/test_traveler/follow', **self.auth_headers).status_code, 400)
+
+        timeline = self.client.get('/api/timeline', **self.auth_headers).json()
+        self.assertEqual([p['slug'] for p in timeline['items']], ['older-trip'])
+        print("✅ Follow & Backfill: OK")
+
+        token = str(AccessToken.for_user(author))
+        response = self.client.post('/api/posts/create', data={
+            "title": 'New trip', "location_name": 'Naples', "continent": 'Europe', "blocks_data": '[]',
+        }, HTTP_AUTHORIZATION=f'Bearer {token}')
+        new_slug = response.json()['slug']
+        self.assertTrue(TimelineEntry.objects.filter(user=self.user, post__slug=new_slug).exists())
+
+        follow(self.user, star)
+        follow(fan, star)
+        famous = Post.objects.create(author=star, title='Famous trip', slug='famous-trip',
+                                     location_name='Paris', is_published=True)
+        self.assertEqual(fan_out(famous), 0)
+        self.assertFalse(TimelineEntry.objects.filter(post=famous).exists())
+        print("✅ Fan-out on Write, Celebrities Skipped: OK")
+
+        slugs, cursor = [], None
+        while True:
+            url = '/api/timeline?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            page = self.client.get(url, **self.auth_headers).json()
+            slugs += [p['slug'] for p in page['items']]
+            cursor = page['next']
+            if not cursor:
+                break
+        self.assertEqual(slugs, ['famous-trip', new_slug, 'older-trip'])
+        print("✅ Merged Cursor Pages: OK")
+
+        # Falling back under the threshold keeps the posts that were never fanned out
+        unfollow(fan, star)
+        later = Post.objects.create(author=star, title='Later trip', slug='later-trip',
+                                    location_name='Nice', is_published=True)
+        self.assertEqual(fan_out(later), 1)
+        timeline = self.client.get('/api/timeline', **self.auth_headers).json()
+        self.assertEqual([p['slug'] for p in timeline['items']], ['later-trip', 'famous-trip', new_slug, 'older-trip'])
+        print("✅ Celebrity Downgrade: OK")
+
+        response = self.client.delete('/api/users/followed_author/follow', **self.auth_headers)
+        self.assertFalse(response.json()['following'])
+        self.assertFalse(Follow.objects.filter(follower=self.user, followee=author).exists())
+        timeline = self.client.get('/api/timeline', **self.auth_headers).json()
+        self.assertEqual([p['slug'] for p in timeline['items']], ['later-trip', 'famous-trip'])
+        self.assertEqual(Profile.objects.get(user=self.user).following_count, 1)
+        self.assertEqual(Profile.objects.get(user=star).followers_count, 1)
+        print("✅ Unfollow: OK")
+
+    def test_23_block_patch_api(self):
+        """Test: Single blocks can be inserted, edited, moved and deleted by id"""
+        print("\n--- TEST 23: Block-level Edits ---")
+        post = Post.objects.create(
+            author=self.user, title='Hanoi', slug='hanoi-blocks', location_name='Hanoi, Vietnam',
+            is_published=True,
+        )
+        # Gaps in the stored positions are closed by the first renumbering
+        for position, word in ((0, 'Alpha'), (1, 'Bravo'), (3, 'Charlie'), (5, 'Delta')):
+            PostBlock.objects.create(post=post, type='text', position=position, text_content=f'<p>{word}</p>')
+        url = '/api/posts/hanoi-blocks/blocks'
+        blocks = self.client.get('/api/posts/hanoi-blocks').json()['blocks']
+        ids = {b['text_content']: b['id'] for b in blocks}
+
+        def stored():
+            return list(post.blocks.order_by('position').values_list('position', 'text_content'))
+
+        response = self.client.patch(
+            f"{url}/{ids['<p>Bravo</p>']}", data=json.dumps({"content": '<p>Bravo <script>x</script>fixed</p>'}),
+            content_type='application/json', **self.auth_headers,
+        )
+        self.assertEqual(response.json()['text_content'], '<p>Bravo fixed</p>')
+        detail = self.client.get('/api/posts/hanoi-blocks').json()
+        self.assertEqual(detail['blocks'][1]['text_content'], '<p>Bravo fixed</p>')
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Alpha Bravo fixed Charlie Delta')
+        print("✅ Edit One Block: OK")
+
+        response = self.client.patch(
+            f"{url}/{ids['<p>Alpha</p>']}", data=json.dumps({"position": 99}),
+            content_type='application/json', **self.auth_headers,
+        )
+        self.assertEqual(response.json()['position'], 3)
+        self.assertEqual(stored(), [
+            (0, '<p>Bravo fixed</p>'), (1, '<p>Charlie</p>'), (2, '<p>Delta</p>'), (3, '<p>Alpha</p>'),
+        ])
+
+        response = self.client.post(url, data={"type": 'text', "content": '<p>Echo</p>', "position": 1},
+                                    **self.auth_headers)
+        self.assertEqual(response.json()['position'], 1)
+        buffer = io.BytesIO()
+        Image.new('RGB', (40, 30), 'navy').save(buffer, 'JPEG')
+        response = self.client.post(url, data={
+            "type": 'image', "caption": 'Old quarter',
+            "image": SimpleUploadedFile('quarter.jpg', buffer.getvalue(), content_type='image/jpeg'),
+        }, **self.auth_headers)
+        self.assertEqual(response.json()['position'], 5)
+        self.assertTrue(response.json()['image_url'])
+
+        self.client.delete(f"{url}/{ids['<p>Charlie</p>']}", **self.auth_headers)
+        self.assertEqual([position for position, _ in stored()], [0, 1, 2, 3, 4])
+        self.assertEqual(
+            [b['text_content'] for b in self.client.get('/api/posts/hanoi-blocks').json()['blocks']],
+            ['<p>Bravo fixed</p>', '<p>Echo</p>', '<p>Delta</p>', '<p>Alpha</p>', None],
+        )
+        self.assertEqual(self.client.get('/api/posts/search?q=echo').json()['items'][0]['slug'], 'hanoi-blocks')
+        # Each edit renumbers under the post's row lock, from the ordering
+        # the previous edit committed
+        stale = post.blocks.get(text_content='<p>Echo</p>')
+        delete_block(post, post.blocks.get(pk=stale.pk))
+        with self.assertRaises(ValueError):
+            move_block(post, stale, 0)
+        self.assertEqual([position for position, _ in stored()], [0, 1, 2, 3])
+        print("✅ Insert, Move & Delete Renumber: OK")
+
+        image_id = post.blocks.get(type='image').id
+        response = self.client.patch(f"{url}/{ids['<p>Delta</p>']}", data=json.dumps({"caption": 'x'}),
+                                     content_type='application/json', **self.auth_headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(f"{url}/{image_id}", data=json.dumps({"caption": 'Lanterns'}),
+                                     content_type='application/json', **self.auth_headers)
+        self.assertEqual(response.json()['image_url'], post.blocks.get(type='image').image_content.url)
+        self.assertEqual(self.client.post(url, data={"type": 'text'}, **self.auth_headers).status_code, 400)
+        other = Post.objects.create(author=self.user, title='Other', slug='other-blocks', location_name='Hue')
+        self.assertEqual(self.client.delete(f'/api/posts/other-blocks/blocks/{image_id}',
+                                            **self.auth_headers).status_code, 404)
+        intruder = User.objects.create_user(username='block_intruder', password='pw-intruder-123')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(intruder)}'}
+        self.assertEqual(self.client.delete(f'{url}/{image_id}', **headers).status_code, 403)
+        self.assertTrue(PostBlock.objects.filter(pk=image_id).exists())
+        self.assertFalse(other.blocks.exists())
+        print("✅ Validation & Ownership: OK")
+
+    def test_24_resumable_uploads(self):
+        """Test: Images upload in resumable chunks and are then referenced by a post"""
+        print("\n--- TEST 24: Resumable Uploads ---")
+        images = []
+        for color in ('olive', 'maroon'):
+            buffer = io.BytesIO()
+            Image.new('RGB', (80, 60), color).save(buffer, 'PNG')
+            images.append(buffer.getvalue())
+
+        def upload(content, chunk):
+            response = self.client.post('/api/uploads', data=json.dumps({"filename": 'photo.png', "size": len(content)}),
+                                        content_type='application/json', **self.auth_headers)
+            self.assertEqual(response.status_code, 201)
+            url = response['Location']
+            for offset in range(0, len(content), chunk):
+                response = self.client.patch(url, data=content[offset:offset + chunk],
+                                             content_type='application/offset+octet-stream',
+                                             HTTP_UPLOAD_OFFSET=str(offset), **self.auth_headers)
+                self.assertEqual(response.status_code, 200)
+            return url
+
+        url = upload(images[0], 100)
+        upload_id = url.rsplit('/', 1)[1]
+        self.assertEqual(self.client.get(url, **self.auth_headers).json()['offset'], len(images[0]))
+        response = self.client.patch(url, data=b'x', content_type='application/offset+octet-stream',
+                                     HTTP_UPLOAD_OFFSET='0', **self.auth_headers)
+        self.assertEqual(response.status_code, 409)
+        print("✅ Chunked Upload & Offset Check: OK")
+
+        # A dropped chunk resumes from the offset the server reports
+        content = images[1]
+        response = self.client.post('/api/uploads', data=json.dumps({"filename": 'cover.png', "size": len(content)}),
+                                    content_type='application/json', **self.auth_headers)
+        cover_url = response['Location']
+        self.client.patch(cover_url, data=content[:50], content_type='application/offset+octet-stream',
+                          HTTP_UPLOAD_OFFSET='0', **self.auth_headers)
+        self.assertEqual(self.client.post(f'{cover_url}/finalize', **self.auth_headers).status_code, 409)
+        resume = int(self.client.get(cover_url, **self.auth_headers)['Upload-Offset'])
+        self.assertEqual(resume, 50)
+        self.client.patch(cover_url, data=content[resume:], content_type='application/offset+octet-stream',
+                          HTTP_UPLOAD_OFFSET=str(resume), **self.auth_headers)
+        for target in (url, cover_url):
+            self.assertTrue(self.client.post(f'{target}/finalize', **self.auth_headers).json()['complete'])
+        print("✅ Resume After Interruption: OK")
+
+        response = self.client.post('/api/posts/create', data={
+            "title": 'Uploaded', "location_name": 'Oslo, Norway', "continent": 'Europe',
+            "blocks_data": json.dumps([
+                {"type": 'text', "content": '<p>Fjords</p>'},
+                {"type": 'image', "upload_id": upload_id, "caption": 'Harbour'},
+            ]),
+            "cover_upload": cover_url.rsplit('/', 1)[1],
+        }, **self.auth_headers)
+        post = Post.objects.get(slug=response.json()['slug'])
+        block = post.blocks.get(type='image')
+        with default_storage.open(block.image_content.name) as stored:
+            self.assertEqual(stored.read(), images[0])
+        with default_storage.open(post.cover_image.name) as stored:
+            self.assertEqual(stored.read(), images[1])
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(self.client.get(url, **self.auth_headers).status_code, 404)
+        print("✅ Post References Uploads: OK")
+
+        url = upload(b'not an image at all', 8)
+        pending = Upload.objects.get()
+        self.assertEqual(self.client.post(f'{url}/finalize', **self.auth_headers).status_code, 400)
+        self.assertFalse(Upload.objects.exists())
+        self.assertFalse(os.path.exists(part_path(pending)))
+        url = upload(images[0], 4096)
+        intruder = User.objects.create_user(username='upload_intruder', password='pw-intruder-123')
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(intruder)}'}
+        self.assertEqual(self.client.get(url, **headers).status_code, 404)
+        response = self.client.post('/api/posts/create', data={
+            "title": 'Borrowed', "location_name": 'Oslo', "continent": 'Europe', "blocks_data": '[]',
+            "cover_upload": url.rsplit('/', 1)[1],
+        }, **headers)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/uploads', data=json.dumps({"filename": 'huge.png', "size": 10 ** 12}),
+                                    content_type='application/json', **self.auth_headers)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.client.delete(url, **self.auth_headers).status_code, 204)
+        self.assertFalse(Upload.objects.exists())
+        print("✅ Validation & Ownership: OK")
+
+        # A writer holding a stale row is checked against the offset stored
+        # by whoever held the lock before it
+        url = upload(images[0], len(images[0]) // 2 + 1)
+        stale = Upload.objects.get()
+        stale.offset = 0
+        with self.assertRaises(HttpError) as raised:
+            append_chunk(stale, 0, io.BytesIO(b'x'), 1)
+        self.assertEqual(raised.exception.status_code, 409)
+        with open(part_path(stale), 'rb') as part:
+            self.assertEqual(part.read(), images[0])
+        self.client.post(f'{url}/finalize', **self.auth_headers)
+        blocks = [{"type": 'image', "upload_id": url.rsplit('/', 1)[1]},
+                  {"type": 'image', "upload_id": str(uuid.uuid4())}]
+        with mock.patch('blog.uploads.open', create=True, wraps=open) as opened:
+            with self.assertRaises(HttpError):
+                claim_uploads(self.user, blocks)
+        opened.assert_not_called()
+        print("✅ Stale Offset & Claim Validation: OK")
+
+        # Part files are copied, so a post that fails after claiming leaves
+        # the upload intact for a retry
+        upload_id = url.rsplit('/', 1)[1]
+        data = {"title": 'Retry', "location_name": 'Oslo, Norway', "continent": 'Europe',
+                "blocks_data": '[]', "cover_upload": upload_id}
+        with mock.patch('blog.routers.posts.fan_out', side_effect=RuntimeError('fan-out down')):
+            with self.assertRaises(RuntimeError):
+                self.client.post('/api/posts/create', data=data, **self.auth_headers)
+        pending = Upload.objects.get()
+        with open(part_path(pending), 'rb') as part:
+            self.assertEqual(part.read(), images[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            slug = self.client.post('/api/posts/create', data=data, **self.auth_headers).json()['slug']
+        with default_storage.open(Post.objects.get(slug=slug).cover_image.name) as stored:
+            self.assertEqual(stored.read(), images[0])
+        self.assertFalse(os.path.exists(part_path(pending)))
+
+        url = upload(images[1], 4096)
+        self.client.post(f'{url}/finalize', **self.auth_headers)
+        os.unlink(part_path(Upload.objects.get()))
+        response = self.client.post('/api/posts/create', data={**data, "cover_upload": url.rsplit('/', 1)[1]},
+                                    **self.auth_headers)
+        self.assertEqual(response.status_code, 400)
+        print("✅ Failed Post Keeps Upload: OK")
+
+    def test_25_job_queue(self):
+        """Test: Post-publish work is queued on commit, deduplicated and retried"""
+        print("\n--- TEST 25: Background Jobs ---")
+        buffer = io.BytesIO()
+        Image.new('RGB', (300, 200), 'orange').save(buffer, 'JPEG')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/posts/create', data={
+                "title": 'Queued', "location_name": 'Cusco, Peru', "continent": 'South America',
+                "blocks_data": '[]', "cover": SimpleUploadedFile('cusco.jpg', buffer.getvalue(), content_type='image/jpeg'),
+            }, **self.auth_headers)
+        post = Post.objects.get(slug=response.json()['slug'])
+        job = Job.objects.get()
+        self.assertEqual((job.task, job.status), ('blog.images.render_image_job', Job.QUEUED))
+        self.assertFalse(post.cover_image_meta)
+        # Saving the same image again while the job waits adds nothing
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_variants(post, 'cover_image')
+        self.assertEqual(Job.objects.count(), 1)
+        print("✅ Enqueued On Commit & Deduplicated: OK")
+
+        claimed = claim('test-worker', 10)
+        self.assertEqual([j.pk for j in claimed], [job.pk])
+        self.assertEqual(claim('other-worker', 10), [])
+        self.assertTrue(run_job(claimed[0]))
+        post.refresh_from_db()
+        self.assertEqual(post.cover_image_meta['source'], post.cover_image.name)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+        print("✅ Claimed & Run: OK")
+
+        broken = Job.objects.create(
+            task='blog.images.render_image_job', args=['blog.Missing', 1, 'cover_image'],
+            max_attempts=2, run_after=timezone.now(),
+        )
+        self.assertFalse(run_job(claim('test-worker', 10)[0]))
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), (Job.QUEUED, 1))
+        self.assertGreater(broken.run_after, timezone.now())
+        self.assertIn('LookupError', broken.last_error)
+        self.assertEqual(claim('test-worker', 10), [])
+        Job.objects.filter(pk=broken.pk).update(run_after=timezone.now())
+        self.assertFalse(run_job(claim('test-worker', 10)[0]))
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), (Job.FAILED, 2))
+        print("✅ Backoff & Give Up: OK")
+
+        self.assertEqual(self.client.get('/api/jobs/stats', **self.auth_headers).status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        stats = self.client.get('/api/jobs/stats', **self.auth_headers).json()
+        self.assertEqual((stats['done'], stats['failed'], stats['queued']), (1, 1, 0))
+        self.assertEqual(stats['tasks']['blog.images.render_image_job']['failed'], 1)
+        call_command('run_workers', burst=True, threads=1, stdout=io.StringIO())
+        print("✅ Stats & Worker Command: OK")
+
+    def test_26_media_gc(self):
+        """Test: Unreferenced media is found in a dry run and reclaimed incrementally"""
+        print("\n--- TEST 26: Media Garbage Collection ---")
+        two_days_ago = time.time() - 2 * 24 * 3600
+
+        def age(name):
+            os.utime(default_storage.path(name), (two_days_ago, two_days_ago))
+            return name
+
+        def image(color):
+            buffer = io.BytesIO()
+            Image.new('RGB', (64, 48), color).save(buffer, 'JPEG')
+            return SimpleUploadedFile(f'{color}.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+        post = Post.objects.create(author=self.user, title='Kept', slug='kept-media', location_name='Riga',
+                                   cover_image=image('crimson'))
+        process_image(Post, post.pk, 'cover_image')
+        post.refresh_from_db()
+        kept = [age(post.cover_image.name)] + [age(v['path']) for v in post.cover_image_meta['variants']]
+        self.profile.avatar.save('face.jpg', image('khaki'))
+        kept.append(age(self.profile.avatar.name))
+        live_upload = create_upload(self.user, 'part.png', 100)
+        kept.append(age(os.path.relpath(part_path(live_upload), default_storage.location)))
+
+        orphans = [age(default_storage.save('covers/replaced.jpg', image('indigo')))]
+        os.makedirs(default_storage.path('covers'), exist_ok=True)
+        for name in ('covers/legacy.jpg', '.incoming/tmp-crashed'):
+            with open(default_storage.path(name), 'wb') as fh:
+                fh.write(b'x' * 1000)
+            orphans.append(age(name))
+        expired = create_upload(self.user, 'stale.png', 100)
+        Upload.objects.filter(pk=expired.pk).update(updated_at=timezone.now() - timedelta(days=2))
+        orphans.append(age(os.path.relpath(part_path(expired), default_storage.location)))
+        fresh = default_storage.save('covers/just-saved.jpg', image('plum'))
+
+        report = sweep(dry_run=True)
+        self.assertEqual(report['orphans'], sorted(orphans))
+        self.assertEqual(report['bytes'], sum(os.path.getsize(default_storage.path(n)) for n in orphans))
+        self.assertTrue(all(default_storage.exists(name) for name in orphans))
+        self.assertEqual(MediaSweep.objects.get().cursor, '')
+        print("✅ Dry Run Report: OK")
+
+        removed, runs = [], 0
+        while True:
+            report = sweep(limit=5)
+            removed += report['orphans']
+            runs += 1
+            if report['complete']:
+                break
+            self.assertTrue(MediaSweep.objects.get().cursor)
+        self.assertGreater(runs, 1)
+        self.assertEqual(sorted(removed), sorted(orphans))
+        self.assertFalse(any(default_storage.exists(name) for name in orphans))
+        self.assertTrue(all(default_storage.exists(name) for name in kept + [fresh]))
+        self.assertFalse(MediaBlob.objects.filter(name=orphans[0]).exists())
+        self.assertEqual(list(Upload.objects.values_list('pk', flat=True)), [live_upload.pk])
+        sweep_state = MediaSweep.objects.get()
+        self.assertEqual((sweep_state.cursor, sweep_state.passes), ('', 1))
+        print("✅ Incremental Sweep: OK")
+
+        out = io.StringIO()
+        call_command('gc_media', dry_run=True, stdout=out)
+        self.assertIn('0 orphaned', out.getvalue())
+        print("✅ Command: OK")
+
+    def test_27_geo_map(self):
+        """Test: Posts are geocoded and found by map viewport or distance"""
+        print("\n--- TEST 27: Map and Nearby ---")
+        self.assertEqual(geocode('Bali, Indonesia'), (-8.3405, 115.0920))
+        self.assertEqual(geocode('a farm near Évora, PORTUGAL'), (39.40, -8.22))
+        self.assertIsNone(geocode('Atlantis'))
+        self.assertEqual(encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        print("✅ Gazetteer: OK")
+
+        def story(slug, location_name, published=True):
+            post = Post(author=self.user, title=slug, slug=slug, location_name=location_name,
+                        is_published=published)
+            locate(post)
+            post.save()
+            return post
+
+        lisbon = story('lisbon', 'Lisbon, Portugal')
+        for slug, location_name in (('sintra', 'Sintra'), ('porto', 'Porto, Portugal'), ('kyoto', 'Kyoto'),
+                                    ('fiji', 'Fiji'), ('tonga', 'Tonga'), ('atlantis', 'Atlantis')):
+            story(slug, location_name)
+        story('draft', 'Lisbon', published=False)
+        self.assertEqual(Post.objects.get(slug='atlantis').geohash, '')
+
+        response = self.client.get('/api/posts/in-bbox?bbox=-10,36,-6,42.5')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data['clustered'])
+        self.assertEqual([p['slug'] for p in data['posts']], ['porto', 'sintra', 'lisbon'])
+        self.assertEqual(data['posts'][2]['latitude'], lisbon.latitude)
+        response = self.client.get('/api/posts/in-bbox?bbox=170,-25,-170,-10')
+        self.assertEqual(sorted(p['slug'] for p in response.json()['posts']), ['fiji', 'tonga'])
+        self.assertEqual(self.client.get('/api/posts/in-bbox?bbox=1,2,3').status_code, 400)
+        self.assertEqual(self.client.get('/api/posts/in-bbox?bbox=-10,50,-6,40').status_code, 400)
+        print("✅ Viewport: OK")
+
+        with override_settings(MAP_MAX_MARKERS=2):
+            data = self.client.get('/api/posts/in-bbox?bbox=-10,36,-6,42.5').json()
+        self.assertTrue(data['clustered'])
+        self.assertEqual(data['posts'], [])
+        self.assertEqual(sum(cluster['count'] for cluster in data['clusters']), 3)
+        for cluster in data['clusters']:
+            west, south, east, north = cluster['bounds']
+            self.assertTrue(south <= cluster['latitude'] <= north and west <= cluster['longitude'] <= east)
+        print("✅ Clustering: OK")
+
+        data = self.client.get('/api/posts/nearby?slug=lisbon&radius_km=400').json()
+        self.assertEqual([p['slug'] for p in data], ['sintra', 'porto'])
+        self.assertLess(data[0]['distance_km'], 30)
+        data = self.client.get(f'/api/posts/nearby?lat={lisbon.latitude}&lon={lisbon.longitude}').json()
+        self.assertEqual([p['slug'] for p in data], ['lisbon', 'sintra'])
+        self.assertEqual(data[0]['distance_km'], 0)
+        self.assertEqual(self.client.get('/api/posts/nearby?slug=atlantis').status_code, 400)
+        self.assertEqual(self.client.get('/api/posts/nearby?lat=95&lon=0').status_code, 400)
+        print("✅ Nearby: OK")
+
+        Post.objects.update(latitude=None, longitude=None, geohash='')
+        call_command('geocode_posts', stdout=io.StringIO())
+        lisbon.refresh_from_db()
+        self.assertEqual(lisbon.geohash, encode(38.7223, -9.1393))
+        self.assertEqual(Post.objects.exclude(geohash='').count(), 7)
+        print("✅ Backfill: OK")
+
+SEPARATE_REPLICA = (
+    'replica' in settings.DATABASES
+    and not settings.DATABASES['replica'].get('TEST', {}).get('MIRROR')
+)
+
+
+@unittest.skipUnless(SEPARATE_REPLICA, "needs a separate 'replica' database (config.replica_settings)")
+class ReplicaRoutingTestCase(TestCase):
+    databases = {'default', 'replica'} if SEPARATE_REPLICA else {'default'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='primary_writer', password='unused')
+        self.auth_headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+        # The replica lags: it only knows an older story by a copy of the author
+        author = User.objects.using('replica').create(id=self.user.id, username='primary_writer')
+        Post.objects.using('replica').create(
+            author=author, title='Old', slug='old-story', location_name='Riga', is_published=True
+        )
+        Post.objects.create(
+            author=self.user, title='New', slug='new-story', location_name='Riga', is_published=True
+        )
+
+    def test_reads_use_replica_until_client_writes(self):
+        """Test: Public reads hit the replica; the writer sticks to the primary"""
+        print("\n--- TEST: Replica Routing ---")
+        client = Client()
+        response = client.get('/api/posts')
+        self.assertEqual([p['slug'] for p in response.json()], ['old-story'])
+        self.assertEqual(client.get('/api/posts/new-story').status_code, 404)
+        print("✅ Reads From Replica: OK")
+
+        response = client.post(
+            '/api/countries', data=json.dumps({"country_code": "LVA"}),
+            content_type='application/json', **self.auth_headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('primary_pin', response.cookies)
+        response = client.get('/api/posts')
+        self.assertEqual([p['slug'] for p in response.json()], ['new-story'])
+        response = client.get(f'/api/users/{self.user.username}')
+        self.assertEqual(response.json()['countries_count'], 1)
+        print("✅ Pinned After Write: OK")
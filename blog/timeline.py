@@ -0,0 +1,127 @@
+"""
+Home timelines. Publishing a post copies a (post, created_at) row into the
+timeline of every follower (fan-out on write), so reading a timeline is a
+range scan over one index. Authors with at least
+TIMELINE_CELEBRITY_FOLLOWERS followers are skipped at publish time, since
+that write would be too large. Whether a post was copied is recorded in
+Post.fanned_out, and the followed authors' posts that weren't are merged
+in when a follower reads the timeline (fan-out on read). Going by the
+post rather than the author's current follower count keeps a post
+visible after its author crosses the threshold in either direction.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists
+
+from .counters import adjust_counters
+from .listing import post_list_rows, serialize_post_list
+from .models import Follow, Post, Profile, TimelineEntry
+from .pagination import encode_cursor, page_size, seek
+
+
+def celebrity_threshold() -> int:
+    return getattr(settings, 'TIMELINE_CELEBRITY_FOLLOWERS', 10000)
+
+
+def fan_out(post) -> int:
+    """
+    Adds a newly published post to its author's followers' timelines.
+    Returns how many followers were written to, or 0 for celebrities.
+    """
+    if not post.is_published:
+        return 0
+    celebrity = Profile.objects.filter(user_id=post.author_id, followers_count__gte=celebrity_threshold())
+    Post.objects.filter(pk=post.pk).update(fanned_out=~Exists(celebrity))
+    # A single INSERT ... SELECT, so the database does the copying whatever
+    # the follower count, and only for the post just marked as fanned out;
+    # both PostgreSQL and SQLite take ON CONFLICT.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TimelineEntry._meta.db_table} (user_id, post_id, created_at) "
+            f"SELECT follower_id, %s, %s FROM {Follow._meta.db_table} WHERE followee_id = %s "
+            f"AND EXISTS (SELECT 1 FROM {Post._meta.db_table} WHERE id = %s AND fanned_out) "
+            "ON CONFLICT DO NOTHING",
+            [post.id, connection.ops.adapt_datetimefield_value(post.created_at), post.author_id, post.id],
+        )
+        return cursor.rowcount
+
+
+def retract(post):
+    """Removes a post from every timeline, e.g. when it's unpublished."""
+    TimelineEntry.objects.filter(post=post).delete()
+    Post.objects.filter(pk=post.pk).update(fanned_out=False)
+
+
+def follow(follower, followee) -> bool:
+    """
+    Starts following; the followee's latest fanned-out posts are copied
+    into the follower's timeline so it isn't empty until their next post
+    (the others are merged in on read anyway). Returns False if the follow
+    already existed.
+    """
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(follower=follower, followee=followee)
+        if not created:
+            return False
+        adjust_counters(follower.id, following=1)
+        adjust_counters(followee.id, followers=1)
+        recent = (
+            Post.objects
+                .filter(author=followee, is_published=True, fanned_out=True)
+                .order_by('-created_at', '-id')
+                .values_list('id', 'created_at')[:getattr(settings, 'TIMELINE_BACKFILL', 50)]
+        )
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user=follower, post_id=post_id, created_at=created_at)
+             for post_id, created_at in recent],
+            ignore_conflicts=True,
+        )
+    return True
+
+
+def unfollow(follower, followee) -> bool:
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(follower=follower, followee=followee).delete()
+        if not deleted:
+            return False
+        adjust_counters(follower.id, following=-1)
+        adjust_counters(followee.id, followers=-1)
+        TimelineEntry.objects.filter(user=follower, post__author=followee).delete()
+    return True
+
+
+def timeline_page(user, cursor: str = None, limit: int = None) -> dict:
+    """
+    One page of the user's home timeline, newest first, in the same shape
+    as the feed's PostPageSchema. Precomputed entries and the followed
+    authors' posts that were never fanned out are each fetched with the
+    same keyset, then merged.
+    """
+    limit = page_size(limit)
+    keys = list(
+        seek(TimelineEntry.objects.filter(user=user), cursor, id_field='post_id')
+            .values_list('created_at', 'post_id')[:limit + 1]
+    )
+    followees = Follow.objects.filter(follower=user).values('followee_id')
+    # Served by the partial post_unfanned_idx, which only holds such posts
+    keys += seek(
+        Post.objects.filter(author__in=followees, is_published=True, fanned_out=False), cursor
+    ).values_list('created_at', 'id')[:limit + 1]
+    # fan_out sets the flag with an UPDATE, so a later full save of a stale
+    # instance can clear it again; the post is then in both lists
+    keys = sorted(set(keys), reverse=True)[:limit + 1]
+
+    next_cursor = None
+    if len(keys) > limit:
+        keys = keys[:limit]
+        created_at, post_id = keys[-1]
+        next_cursor = encode_cursor({"created_at": created_at, "id": post_id})
+
+    rows = {
+        row['id']: row
+        for row in post_list_rows(Post.objects.filter(id__in=[post_id for _, post_id in keys], is_published=True))
+    }
+    return {
+        "items": serialize_post_list(rows[post_id] for _, post_id in keys if post_id in rows),
+        "next": next_cursor,
+    }
@@ -0,0 +1,176 @@
+"""
+Resumable uploads (tus-style): a client creates an upload with its total
+size, appends chunks with PATCH at the offset the server reports, and
+finalizes it once every byte has arrived. The stored offset always says
+how much of the part file is valid, so an interrupted chunk is resumed
+rather than restarted. Posts then refer to finished uploads by id instead
+of carrying the image bytes themselves.
+"""
+import fcntl
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import UnreadablePostError
+from django.utils import timezone
+from ninja.errors import HttpError
+from PIL import Image, UnidentifiedImageError
+
+from .models import Upload
+from .storage import INCOMING_DIR
+
+UPLOAD_DIR = 'uploads'
+READ_SIZE = 64 * 1024
+
+
+def max_upload_size() -> int:
+    return getattr(settings, 'UPLOAD_MAX_BYTES', 50 * 1024 * 1024)
+
+
+def part_path(upload) -> str:
+    return default_storage.path(f'{INCOMING_DIR}/{UPLOAD_DIR}/{upload.pk}.part')
+
+
+def create_upload(owner, filename, size) -> Upload:
+    if size <= 0 or size > max_upload_size():
+        raise HttpError(413, f"Uploads must be between 1 and {max_upload_size()} bytes")
+    upload = Upload.objects.create(owner=owner, filename=os.path.basename(filename)[:255] or 'upload', size=size)
+    path = part_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def append_chunk(upload, offset, stream, length) -> int:
+    """
+    Writes up to `length` bytes from `stream` at `offset`, which must match
+    the stored offset. Whatever arrives before the client drops off is
+    kept, and the new offset returned.
+    """
+    if length > upload.size - offset:
+        raise HttpError(413, "Chunk runs past the declared upload size")
+
+    with open(part_path(upload), 'r+b') as part:
+        try:
+            # One writer per upload; a retry racing a stalled request is refused
+            fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise HttpError(409, "Another chunk is being written to this upload")
+        # The previous writer stores its offset before unlocking, so the row
+        # read now is current; the one loaded by the caller may not be
+        upload.refresh_from_db(fields=['offset', 'completed_at'])
+        if upload.completed_at:
+            raise HttpError(409, "Upload already finalized")
+        if offset != upload.offset:
+            raise HttpError(409, f"Upload is at offset {upload.offset}")
+        # Bytes past the stored offset are from a chunk that never committed
+        part.seek(offset)
+        part.truncate()
+        received = 0
+        try:
+            while received < length:
+                data = stream.read(min(READ_SIZE, length - received))
+                if not data:
+                    break
+                part.write(data)
+                received += len(data)
+        except (OSError, UnreadablePostError):
+            pass
+        part.flush()
+        os.fsync(part.fileno())
+        upload.offset = offset + received
+        Upload.objects.filter(pk=upload.pk).update(offset=upload.offset, updated_at=timezone.now())
+    return upload.offset
+
+
+def finalize_upload(upload) -> Upload:
+    """Checks that every byte arrived and that the file is an image we can read."""
+    if upload.completed_at:
+        return upload
+    if upload.offset != upload.size:
+        raise HttpError(409, f"Upload is incomplete: {upload.offset} of {upload.size} bytes")
+    try:
+        with Image.open(part_path(upload)) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        discard_upload(upload)
+        raise HttpError(400, "Upload is not a valid image")
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['completed_at', 'updated_at'])
+    return upload
+
+
+def discard_upload(upload):
+    path = part_path(upload)
+    upload.delete()
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+def claim_uploads(owner, blocks_list, cover_upload=None):
+    """
+    Resolves `upload_id` references in the editor payload (and the cover)
+    to files ready for save_blocks / FieldFile.save. Returns
+    ({'block_image_<index>': file}, cover file or None, claimed uploads).
+    Call it inside the transaction that saves the post: the uploads stay
+    locked until release_uploads() deletes them, so two posts can't both
+    claim one. The part files are copied into storage, never moved, so a
+    post that fails to save leaves its uploads usable for a retry.
+    """
+    wanted = {}
+    for index, block in enumerate(blocks_list):
+        if block.get('type') == 'image' and block.get('upload_id'):
+            wanted[f'block_image_{index}'] = block['upload_id']
+    if cover_upload:
+        wanted['cover'] = cover_upload
+    if not wanted:
+        return {}, None, []
+    try:
+        wanted = {key: uuid.UUID(str(value)) for key, value in wanted.items()}
+    except ValueError:
+        raise HttpError(400, "Invalid upload id")
+    if len(set(wanted.values())) != len(wanted):
+        raise HttpError(400, "Each upload can only be used once")
+
+    uploads = Upload.objects.select_for_update().in_bulk(list(wanted.values()))
+    for upload_id in wanted.values():
+        upload = uploads.get(upload_id)
+        if upload is None or upload.owner_id != owner.id:
+            raise HttpError(400, f"Unknown upload {upload_id}")
+        if not upload.completed_at:
+            raise HttpError(400, f"Upload {upload_id} is not finalized")
+    # Opened only once every id checks out, so a rejected payload leaks no handles
+    files = {}
+    for key, upload_id in wanted.items():
+        upload = uploads[upload_id]
+        try:
+            files[key] = File(open(part_path(upload), 'rb'), name=upload.filename)
+        except FileNotFoundError:
+            for file in files.values():
+                file.close()
+            raise HttpError(400, f"Upload {upload_id} is no longer available")
+    cover = files.pop('cover', None)
+    return files, cover, list(uploads.values())
+
+
+def release_uploads(uploads, files):
+    """
+    Deletes claimed uploads once the post referencing them is saved; their
+    part files are removed when the transaction commits.
+    """
+    if not uploads:
+        return
+    for file in files:
+        if file is not None:
+            file.close()
+    Upload.objects.filter(pk__in=[upload.pk for upload in uploads]).delete()
+
+    def remove_parts():
+        for upload in uploads:
+            path = part_path(upload)
+            if os.path.exists(path):
+                os.unlink(path)
+    transaction.on_commit(remove_parts)
@@ -1,16 +1,120 @@
 import re
+from html import escape, unescape
+from html.parser import HTMLParser
+
+TAG_RE = re.compile(r'<[^>]*>')
+
+ALLOWED_TAGS = {
+    'p', 'br', 'strong', 'b', 'em', 'i', 'u', 's', 'a', 'span', 'sub', 'sup',
+    'h1', 'h2', 'h3', 'h4', 'ul', 'ol', 'li', 'blockquote', 'pre', 'code',
+}
+VOID_TAGS = {'br'}
+# Tags that separate words in the plain-text rendering
+BLOCK_TAGS = {'p', 'br', 'h1', 'h2', 'h3', 'h4', 'li', 'blockquote', 'pre'}
+# Tags dropped together with everything inside them
+DROP_CONTENT_TAGS = {'script', 'style', 'iframe', 'object', 'template'}
+SAFE_URL_RE = re.compile(r'^(https?:|mailto:|/|#)', re.IGNORECASE)
+
+
+class _QuillSanitizer(HTMLParser):
+    """
+    Single pass over Quill output that keeps only whitelisted tags and
+    attributes and collects the plain text alongside the clean HTML.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.skip_depth = 0
+
+    def _attrs(self, tag, attrs):
+        kept = []
+        for name, value in attrs:
+            if value is None:
+                continue
+            if name == 'class':
+                classes = [c for c in value.split() if c.startswith('ql-')]
+                if classes:
+                    kept.append(('class', ' '.join(classes)))
+            elif tag == 'a' and name == 'href' and SAFE_URL_RE.match(value.strip()):
+                kept.append(('href', value.strip()))
+            elif tag == 'a' and name == 'target' and value == '_blank':
+                kept.append(('target', '_blank'))
+                kept.append(('rel', 'noopener noreferrer'))
+        return ''.join(f' {name}="{escape(value)}"' for name, value in kept)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth += 1
+            return
+        if self.skip_depth or tag not in ALLOWED_TAGS:
+            return
+        self.html.append(f'<{tag}{self._attrs(tag, attrs)}>')
+        if tag in VOID_TAGS:
+            self.text.append(' ')
+        else:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag not in self.open_tags:
+            return
+        # Close anything left open inside this tag so the output stays balanced
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+        if tag in BLOCK_TAGS:
+            self.text.append(' ')
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        data = data.replace('\u00a0', ' ').replace('\u00ad', '')
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def result(self):
+        self.close()
+        while self.open_tags:
+            self.html.append(f'</{self.open_tags.pop()}>')
+        return ''.join(self.html), ' '.join(''.join(self.text).split())
+
+
+def render_quill_html(html: str):
+    """
+    Sanitizes Quill editor HTML against a tag/attribute whitelist and
+    returns (clean_html, plain_text) from the same pass.
+    """
+    if not html:
+        return html, ''
+    parser = _QuillSanitizer()
+    parser.feed(html)
+    return parser.result()
 
 
 def clean_quill_html(html: str) -> str:
     """
     Cleans up HTML from the Quill editor before saving it to the database.
-    Removes &nbsp;, inline styles, and soft hyphens that
-    Quill inserts when copying text from the clipboard.
+    Drops inline styles and anything not whitelisted, and turns &nbsp; and
+    soft hyphens that Quill inserts when copying text from the clipboard
+    into plain spaces/nothing.
     """
+    return render_quill_html(html)[0]
+
+
+def strip_html(html: str) -> str:
+    """Plain text of a stored text block, used for search and excerpts."""
     if not html:
-        return html
-    html = html.replace('&nbsp;', ' ')
-    html = html.replace('\u00a0', ' ')
-    html = re.sub(r'\s*style="[^"]*"', '', html)
-    html = html.replace('\u00ad', '').replace('&shy;', '')
-    return html
\ No newline at end of file
+        return ''
+    # Tags become spaces so adjacent paragraphs don't glue words together
+    return ' '.join(unescape(TAG_RE.sub(' ', html)).split())
@@ -0,0 +1,20 @@
+"""
+Two SQLite databases standing in for a Postgres primary and its replica,
+for exercising replica routing locally:
+
+    python manage.py test blog.tests.ReplicaRoutingTestCase --settings=config.replica_settings
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'primary.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+    },
+}
+DATABASE_REPLICAS = ['replica']
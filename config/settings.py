@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.metrics.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -54,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.replicas.pin_primary_middleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -89,6 +91,39 @@ DATABASES = {
     }
 }
 
+# Read replicas: comma-separated hosts in DB_REPLICA_HOSTS become aliases
+# replica1, replica2, ... Public read endpoints are served from them; a
+# client that just wrote is pinned to the primary for REPLICA_PIN_SECONDS.
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['blog.replicas.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a file
+# directory, Redis or Memcached in production.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'triptales'),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 1000)),
+        },
+    }
+}
+
+POST_DETAIL_CACHE_TIMEOUT = int(os.getenv('POST_DETAIL_CACHE_TIMEOUT', 60 * 60))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -127,6 +162,39 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored once per distinct content under MEDIA_ROOT/blobs/
+STORAGES = {
+    'default': {
+        'BACKEND': 'blog.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Largest file accepted through the resumable /api/uploads protocol; each
+# chunk only has to fit nginx's client_max_body_size
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', 50 * 1024 * 1024))
+# Unfinished uploads untouched for this long are discarded by gc_media
+UPLOAD_EXPIRY_SECONDS = int(os.getenv('UPLOAD_EXPIRY_SECONDS', 24 * 3600))
+# gc_media leaves files younger than this alone, so a file saved just
+# before the row referencing it commits is never collected
+MEDIA_GC_GRACE_SECONDS = int(os.getenv('MEDIA_GC_GRACE_SECONDS', 24 * 3600))
+
+# Background jobs (image variants, ...) run by `manage.py run_workers`.
+# JOB_WORKERS is the thread count per worker process; failed jobs are
+# retried after JOB_BACKOFF_SECONDS, doubling each attempt, and a job
+# running longer than JOB_TIMEOUT seconds is assumed lost and run again.
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+JOB_BACKOFF_SECONDS = int(os.getenv('JOB_BACKOFF_SECONDS', 10))
+JOB_TIMEOUT = int(os.getenv('JOB_TIMEOUT', 600))
+JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', 7))
+
+# Most posts /api/posts/in-bbox returns as markers; denser viewports come
+# back as per-cell clusters instead
+MAP_MAX_MARKERS = int(os.getenv('MAP_MAX_MARKERS', 200))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -142,4 +210,19 @@ CORS_ALLOWED_ORIGINS = [
 NINJA_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=14),
-}
\ No newline at end of file
+}
+# Per-process cache of users resolved from access tokens. Saves evict an entry
+# in the process that made them; other workers pick the change up within the
+# timeout (seconds).
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 1024))
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 60))
+
+# Home timelines: new posts are copied to each follower's timeline unless
+# the author has at least this many followers, in which case followers
+# read them at request time. Following someone backfills their latest posts.
+TIMELINE_CELEBRITY_FOLLOWERS = int(os.getenv('TIMELINE_CELEBRITY_FOLLOWERS', 10000))
+TIMELINE_BACKFILL = int(os.getenv('TIMELINE_BACKFILL', 50))
+
+# Bearer token the Prometheus scraper sends to /api/metrics; staff JWTs
+# are accepted too. Set PROMETHEUS_MULTIPROC_DIR to aggregate across workers.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
@@ -3,6 +3,22 @@ import 'maplibre-gl/dist/maplibre-gl.css';
 import { useMemo } from 'react';
 import './WorldMap.css';
 
+// Natural Earth 3.3.0 sets iso_a3 to -99 for a few territories; these are
+// the codes the API knows them by (Northern Cyprus and Somaliland count
+// as Cyprus and Somalia).
+const ADM0_FALLBACK = { KOS: 'XKX', CYN: 'CYP', SOL: 'SOM' };
+
+const countryCode = (properties) => {
+    if (properties.iso_a3 && properties.iso_a3 !== '-99') return properties.iso_a3;
+    return ADM0_FALLBACK[properties.adm0_a3] || properties.adm0_a3;
+};
+
+const countryCodeExpression = [
+    'match', ['get', 'adm0_a3'],
+    ...Object.entries(ADM0_FALLBACK).flat(),
+    ['get', 'iso_a3']
+];
+
 const WorldMap = ({ visitedCodes = [], onCountryClick }) => {
     
     const countriesLayer = useMemo(() => ({
@@ -11,7 +27,7 @@ const WorldMap = ({ visitedCodes = [], onCountryClick }) => {
         paint: {
             'fill-color': [
                 'case',
-                ['in', ['get', 'iso_a3'], ['literal', visitedCodes]], 
+                ['in', countryCodeExpression, ['literal', visitedCodes]],
                 '#4F7942',        
                 'transparent'      
             ],
@@ -34,9 +50,9 @@ const WorldMap = ({ visitedCodes = [], onCountryClick }) => {
                 onClick={(e) => {
                     if (e.features && e.features.length > 0) {
                         const feature = e.features[0];
-                        const countryCode = feature.properties.iso_a3;
-                        if (countryCode && onCountryClick) {
-                            onCountryClick(countryCode);
+                        const code = countryCode(feature.properties);
+                        if (code && onCountryClick) {
+                            onCountryClick(code);
                         }
                     }
                 }}
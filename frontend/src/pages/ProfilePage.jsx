@@ -111,6 +111,8 @@ const ProfilePage = () => {
                         countries_count: prev.countries_count - 1
                     }));
                 }
+            } else {
+                alert("This country can't be marked on your map");
             }
         } catch (err) { console.error(err); }
     };
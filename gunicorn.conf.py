@@ -0,0 +1,9 @@
+# Loaded automatically by gunicorn from the working directory.
+import os
+
+
+def child_exit(server, worker):
+    # Drop a dead worker's live samples from the merged /api/metrics output
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)